@@ -9,3 +9,7 @@ class CodeDocAppConfig(AppConfig):
     def ready(self):
         from .signals import signal_handlers  # NOQA
         from .signals import project_handlers  # NOQA
+        from .signals import author_handlers  # NOQA
+        from .signals import permission_handlers  # NOQA
+        from .signals import cache_handlers  # NOQA
+        from .signals import search_handlers  # NOQA
@@ -8,15 +8,21 @@ from django.forms import (
     CheckboxSelectMultiple,
     TextInput,
     EmailInput,
+    ModelChoiceField,
+    ChoiceField,
+    DateTimeField,
+    IntegerField,
 )
 from django.contrib.auth.models import User, Group
 from django.core.exceptions import ValidationError
 from django.forms.widgets import HiddenInput
 
-from .models.projects import ProjectSeries
+from .models.projects import Project, ProjectSeries
 from .models.authors import Author
 from .models.artifacts import Artifact
+from .models.revisions import Revision, Branch
 
+import collections
 import os
 import logging
 
@@ -174,6 +180,395 @@ class SeriesEditionForm(ModelForm):
                 self.fields[perm].disabled = True
 
 
+class SeriesPromotionForm(Form):
+    """Form used for promoting the artifacts of a series to another series of the same
+    project."""
+
+    source_series = ModelChoiceField(
+        label="Source series",
+        queryset=ProjectSeries.objects.none(),
+        help_text="The series containing the artifacts to promote",
+    )
+
+    revision = CharField(
+        label="Revision",
+        required=False,
+        help_text="If indicated, only the artifacts of this revision are promoted",
+        widget=TextInput(attrs={"size": 50}),
+    )
+
+    branch = CharField(
+        label="Branch",
+        required=False,
+        help_text="If indicated, only the artifacts of a revision of this branch are promoted",
+        widget=TextInput(attrs={"size": 50}),
+    )
+
+    def __init__(self, series, user, *args, **kwargs):
+        super(SeriesPromotionForm, self).__init__(*args, **kwargs)
+
+        self.series = series
+        self.user = user
+        self.fields["source_series"].queryset = series.project.series.exclude(
+            pk=series.pk
+        ).order_by("series")
+
+    def clean_source_series(self):
+        source_series = self.cleaned_data["source_series"]
+        if not self.user.has_perm("code_doc.series_view", source_series):
+            raise ValidationError(
+                "You do not have access to the series %(value)s",
+                params={"value": source_series.series},
+            )
+        return source_series
+
+    def clean_revision(self):
+        # agnostic to case, same as for the artifacts
+        return self.cleaned_data["revision"].strip().lower() or None
+
+    def clean_branch(self):
+        return self.cleaned_data["branch"].strip() or None
+
+
+class ArtifactFilterForm(Form):
+    """Form used for filtering and sorting the artifacts and revisions tables.
+
+    The form is bound to the query string of the request. The invalid fields are
+    ignored, and :py:meth:`filter_artifacts` and :py:meth:`filter_revisions` can be
+    called whatever the validity of the form.
+    """
+
+    revision = CharField(
+        label="Revision", required=False, widget=TextInput(attrs={"size": 20})
+    )
+
+    branch = CharField(
+        label="Branch", required=False, widget=TextInput(attrs={"size": 20})
+    )
+
+    documentation = ChoiceField(
+        label="Documentation",
+        required=False,
+        choices=(("", "All"), ("1", "Documentation only"), ("0", "No documentation")),
+    )
+
+    sort = ChoiceField(
+        label="Sort",
+        required=False,
+        choices=(("", "Newest first"), ("oldest", "Oldest first")),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super(ArtifactFilterForm, self).__init__(*args, **kwargs)
+        self.is_valid()
+
+    def _get_value(self, name):
+        return getattr(self, "cleaned_data", {}).get(name) or None
+
+    def clean_revision(self):
+        # agnostic to case, same as for the artifacts
+        return self.cleaned_data["revision"].strip().lower() or None
+
+    def clean_branch(self):
+        return self.cleaned_data["branch"].strip() or None
+
+    def get_ordering(self, date_field):
+        """Returns the ordering of a table sorted on date_field, for the keyset
+        pagination"""
+        if self._get_value("sort") == "oldest":
+            return (date_field, "pk")
+        return ("-" + date_field, "-pk")
+
+    def filter_revisions(self, revisions):
+        revision = self._get_value("revision")
+        if revision is not None:
+            revisions = revisions.filter(revision=revision)
+
+        branch = self._get_value("branch")
+        if branch is not None:
+            revisions = revisions.filter(
+                pk__in=Revision.objects.filter(branches__name=branch).values("pk")
+            )
+        return revisions
+
+    def filter_artifacts(self, artifacts):
+        revision = self._get_value("revision")
+        if revision is not None:
+            artifacts = artifacts.filter(revision__revision=revision)
+
+        branch = self._get_value("branch")
+        if branch is not None:
+            artifacts = artifacts.filter(
+                revision__in=Revision.objects.filter(branches__name=branch).values("pk")
+            )
+
+        documentation = self._get_value("documentation")
+        if documentation is not None:
+            artifacts = artifacts.filter(is_documentation=documentation == "1")
+        return artifacts
+
+
+#: the formats of the dates accepted by the APIs (ISO 8601)
+API_DATETIME_INPUT_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+)
+
+
+class APIFieldsForm(Form):
+    """Selection of the fields returned by an API for each object (sparse
+    fieldsets): the parameter ``fields`` is a comma separated list of names of
+    :py:attr:`api_fields`, :py:attr:`default_api_fields` if not given.
+    """
+
+    #: the fields of the objects available in the API, and their model fields
+    api_fields = collections.OrderedDict()
+
+    #: the fields returned when not specified
+    default_api_fields = ()
+
+    fields = CharField(required=False)
+
+    def clean_fields(self):
+        names = [
+            name.strip()
+            for name in self.cleaned_data["fields"].split(",")
+            if name.strip()
+        ]
+        unknown = [name for name in names if name not in self.api_fields]
+        if unknown:
+            raise ValidationError(
+                "Unknown fields %s, available fields: %s"
+                % (", ".join(unknown), ", ".join(self.api_fields))
+            )
+        return names or list(self.default_api_fields)
+
+    def get_api_fields(self):
+        """Returns the names of the returned fields and of their model fields"""
+        names = getattr(self, "cleaned_data", {}).get("fields") or list(
+            self.default_api_fields
+        )
+        return names, [self.api_fields[name] for name in names]
+
+
+class SeriesArtifactsAPIForm(APIFieldsForm, ArtifactFilterForm):
+    """Parameters of the API listing the artifacts of a series: the filters of
+    :py:class:`ArtifactFilterForm`, the minimal upload date and the fields returned
+    for each artifact.
+
+    Contrary to the filters of the pages, the invalid parameters are errors.
+    """
+
+    api_fields = collections.OrderedDict(
+        (
+            ("file", "artifactfile"),
+            ("md5", "md5hash"),
+            ("revision", "revision__revision"),
+            ("upload_date", "upload_date"),
+            ("is_documentation", "is_documentation"),
+            ("description", "description"),
+            ("size", "file_size"),
+        )
+    )
+
+    default_api_fields = ("file", "md5")
+
+    since = DateTimeField(required=False, input_formats=API_DATETIME_INPUT_FORMATS)
+
+    def filter_artifacts(self, artifacts):
+        artifacts = super(SeriesArtifactsAPIForm, self).filter_artifacts(artifacts)
+        since = self._get_value("since")
+        if since is not None:
+            artifacts = artifacts.filter(upload_date__gte=since)
+        return artifacts
+
+
+class APIListForm(APIFieldsForm):
+    """Parameters of the lists of the REST API: the returned fields, the page (see
+    :py:class:`KeysetPaginator <code_doc.utils.pagination.KeysetPaginator>`) and the
+    filters of the objects.
+
+    The filters are the fields of the subclasses, applied on the model fields of
+    :py:attr:`api_filters` by :py:meth:`filter_queryset`.
+    """
+
+    limit = IntegerField(required=False, min_value=1)
+    after = CharField(required=False)
+    before = CharField(required=False)
+
+    #: the filters of the list, as a dictionary {parameter: lookup of the model}
+    api_filters = {}
+
+    def clean(self):
+        cleaned_data = super(APIListForm, self).clean()
+        if cleaned_data.get("after") and cleaned_data.get("before"):
+            raise ValidationError("The cursors after and before are mutually exclusive")
+        return cleaned_data
+
+    def filter_queryset(self, queryset):
+        for name, lookup in self.api_filters.items():
+            value = self.cleaned_data.get(name)
+            if value is not None:
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+
+class ProjectAPIForm(APIListForm):
+    api_fields = collections.OrderedDict(
+        (
+            ("id", "id"),
+            ("name", "name"),
+            ("short_description", "short_description"),
+            ("description", "description_mk"),
+            ("home_page_url", "home_page_url"),
+            ("nb_series", "nb_series"),
+            ("nb_revisions", "nb_revisions"),
+            ("nb_artifacts", "nb_artifacts"),
+            ("total_size", "total_size"),
+            ("last_upload", "last_upload"),
+            ("last_modified", "last_modified"),
+        )
+    )
+
+    default_api_fields = ("id", "name", "short_description")
+
+    topic = IntegerField(required=False)
+
+    def filter_queryset(self, queryset):
+        queryset = super(ProjectAPIForm, self).filter_queryset(queryset)
+        topic = self.cleaned_data.get("topic")
+        if topic is not None:
+            queryset = queryset.filter(
+                pk__in=Project.topics.through.objects.filter(topic=topic).values(
+                    "project"
+                )
+            )
+        return queryset
+
+
+class SeriesAPIForm(APIListForm):
+    api_fields = collections.OrderedDict(
+        (
+            ("id", "id"),
+            ("project", "project"),
+            ("series", "series"),
+            ("description", "description_mk"),
+            ("release_date", "release_date"),
+            ("is_public", "is_public"),
+            ("nb_revisions", "nb_revisions"),
+            ("nb_artifacts", "nb_artifacts"),
+            ("total_size", "total_size"),
+            ("last_upload", "last_upload"),
+            ("last_modified", "last_modified"),
+        )
+    )
+
+    default_api_fields = ("id", "project", "series", "release_date")
+
+    project = IntegerField(required=False)
+
+    api_filters = {"project": "project"}
+
+
+class RevisionAPIForm(APIListForm):
+    api_fields = collections.OrderedDict(
+        (
+            ("id", "id"),
+            ("project", "project"),
+            ("revision", "revision"),
+            ("commit_time", "commit_time"),
+            ("nb_artifacts", "nb_artifacts"),
+        )
+    )
+
+    default_api_fields = ("id", "project", "revision", "commit_time")
+
+    project = IntegerField(required=False)
+    branch = IntegerField(required=False)
+
+    api_filters = {"project": "project"}
+
+    def filter_queryset(self, queryset):
+        queryset = super(RevisionAPIForm, self).filter_queryset(queryset)
+        branch = self.cleaned_data.get("branch")
+        if branch is not None:
+            queryset = queryset.filter(
+                pk__in=Branch.revisions.through.objects.filter(branch=branch).values(
+                    "revision"
+                )
+            )
+        return queryset
+
+
+class BranchAPIForm(APIListForm):
+    api_fields = collections.OrderedDict(
+        (
+            ("id", "id"),
+            ("name", "name"),
+            ("nb_revisions_to_keep", "nb_revisions_to_keep"),
+        )
+    )
+
+    default_api_fields = ("id", "name")
+
+    project = IntegerField(required=False)
+
+    def filter_queryset(self, queryset):
+        queryset = super(BranchAPIForm, self).filter_queryset(queryset)
+        project = self.cleaned_data.get("project")
+        if project is not None:
+            queryset = queryset.filter(
+                pk__in=Branch.revisions.through.objects.filter(
+                    revision__project=project
+                ).values("branch")
+            )
+        return queryset
+
+
+class ArtifactAPIForm(APIListForm):
+    api_fields = collections.OrderedDict(
+        (
+            ("id", "id"),
+            ("project", "project"),
+            ("revision", "revision"),
+            ("file", "artifactfile"),
+            ("md5", "md5hash"),
+            ("upload_date", "upload_date"),
+            ("is_documentation", "is_documentation"),
+            ("description", "description"),
+            ("size", "file_size"),
+        )
+    )
+
+    default_api_fields = ("id", "project", "revision", "file", "md5")
+
+    project = IntegerField(required=False)
+    revision = IntegerField(required=False)
+    series = IntegerField(required=False)
+    since = DateTimeField(required=False, input_formats=API_DATETIME_INPUT_FORMATS)
+
+    api_filters = {
+        "project": "project",
+        "revision": "revision",
+        "since": "upload_date__gte",
+    }
+
+    def filter_queryset(self, queryset):
+        queryset = super(ArtifactAPIForm, self).filter_queryset(queryset)
+        series = self.cleaned_data.get("series")
+        if series is not None:
+            queryset = queryset.filter(
+                pk__in=Artifact.project_series.through.objects.filter(
+                    projectseries=series
+                ).values("artifact")
+            )
+        return queryset
+
+
 class ArtifactEditionForm(ModelForm):
 
     # this one is just a text entry, otherwise the clean method is trying to see if it exists or not
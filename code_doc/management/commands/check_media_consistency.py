@@ -0,0 +1,320 @@
+"""Checks the consistency between the artifacts stored in the database and the files
+stored under ``MEDIA_ROOT/artifacts``.
+
+The scan runs in two phases:
+
+* the *database* phase streams the artifact rows in batches ordered by primary key
+  (keyset pagination) and reports the rows whose file is missing on disk,
+* the *filesystem* phase walks the project directories of the media tree, the
+  artifact directories of a project being listed in parallel, and reports the files
+  that are not referenced by any artifact, the ``deflate`` directories that do not
+  belong to any documentation artifact and the empty directories.
+
+The progress is written to the checkpoint file (if any) after each batch and each
+project directory, which makes it possible to resume an interrupted scan.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+import shutil
+
+from ...models.artifacts import Artifact
+
+logger = logging.getLogger(__name__)
+
+#: the folder of MEDIA_ROOT containing the artifacts, see get_artifact_location
+ARTIFACTS_DIRECTORY = "artifacts"
+
+#: the folder in which the documentation artifacts are deflated, see get_deflation_directory
+DEFLATE_DIRECTORY = "deflate"
+
+#: the counters reported at the end of the scan
+REPORT_CATEGORIES = (
+    "missing_files",
+    "orphan_files",
+    "orphan_deflate_directories",
+    "orphan_directories",
+    "empty_directories",
+)
+
+
+def scan_artifact_directory(path):
+    """Lists the content of an artifact directory (``artifacts/<project>/<md5>``).
+
+    Returns a tuple ``(files, directories)`` of the names of the entries of the directory.
+    The content of the sub-directories (eg. the deflated documentation) is not walked.
+    """
+    files = []
+    directories = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                directories.append(entry.name)
+            else:
+                files.append(entry.name)
+    return path, files, directories
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports (and optionally fixes) the inconsistencies between the artifacts "
+        "of the database and the files of the media tree"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            default=False,
+            help="Removes the orphan files, orphan deflate directories and empty directories",
+        )
+        parser.add_argument(
+            "--delete-missing",
+            action="store_true",
+            default=False,
+            help="Deletes the artifacts whose file is missing from the media tree",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of artifact rows fetched per query",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Number of threads used for accessing the file system",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help="Checkpoint file used for resuming an interrupted scan",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0 or options["workers"] <= 0:
+            raise CommandError("--batch-size and --workers should be positive")
+
+        self.fix = options["fix"]
+        self.delete_missing = options["delete_missing"]
+        self.batch_size = options["batch_size"]
+        self.checkpoint = options["checkpoint"]
+
+        self.state = self._load_checkpoint()
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            self.executor = executor
+
+            if self.state["phase"] == "database":
+                self._check_database()
+                self.state["phase"] = "filesystem"
+                self._save_checkpoint()
+
+            self._check_filesystem()
+
+        for category in REPORT_CATEGORIES:
+            self.stdout.write("%s: %d" % (category, self.state["stats"][category]))
+
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+
+    # checkpoint
+    def _load_checkpoint(self):
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as f:
+                state = json.load(f)
+            logger.info(
+                "[media consistency] resuming from checkpoint %s, phase %s",
+                self.checkpoint,
+                state["phase"],
+            )
+            return state
+
+        return {
+            "phase": "database",
+            "last_pk": 0,
+            "done_directories": [],
+            "stats": dict((category, 0) for category in REPORT_CATEGORIES),
+        }
+
+    def _save_checkpoint(self):
+        if not self.checkpoint:
+            return
+
+        temporary_file = self.checkpoint + ".tmp"
+        with open(temporary_file, "w") as f:
+            json.dump(self.state, f)
+        os.replace(temporary_file, self.checkpoint)
+
+    def _report(self, category, path):
+        self.state["stats"][category] += 1
+        self.stdout.write("[%s] %s" % (category, path))
+
+    # database phase
+    def _check_database(self):
+        """Reports the artifacts whose file does not exist"""
+
+        queryset = Artifact.objects.order_by("pk").values_list("pk", "artifactfile")
+
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=self.state["last_pk"])[: self.batch_size]
+            )
+            if not batch:
+                break
+
+            full_paths = [os.path.join(settings.MEDIA_ROOT, name) for _, name in batch]
+            exists = self.executor.map(os.path.exists, full_paths)
+
+            missing = []
+            for (pk, name), current_exists in zip(batch, exists):
+                if not current_exists:
+                    self._report("missing_files", name)
+                    missing.append(pk)
+
+            if missing and self.delete_missing:
+                Artifact.objects.filter(pk__in=missing).delete()
+
+            self.state["last_pk"] = batch[-1][0]
+            self._save_checkpoint()
+
+    # file system phase
+    def _check_filesystem(self):
+        """Walks the project directories that have not been processed yet"""
+
+        artifacts_root = os.path.join(settings.MEDIA_ROOT, ARTIFACTS_DIRECTORY)
+        if not os.path.isdir(artifacts_root):
+            return
+
+        with os.scandir(artifacts_root) as it:
+            project_directories = sorted(
+                entry.name for entry in it if entry.is_dir(follow_symlinks=False)
+            )
+
+        done_directories = set(self.state["done_directories"])
+        for project_directory in project_directories:
+            if project_directory in done_directories:
+                continue
+
+            self._check_project_directory(
+                os.path.join(ARTIFACTS_DIRECTORY, project_directory)
+            )
+
+            self.state["done_directories"].append(project_directory)
+            self._save_checkpoint()
+
+    def _get_referenced_files(self, relative_directory):
+        """Returns the files referenced by the artifacts stored under relative_directory,
+        as a dictionary {file name: is_documentation}"""
+
+        queryset = (
+            Artifact.objects.filter(
+                artifactfile__startswith=relative_directory + os.sep
+            )
+            .order_by("pk")
+            .values_list("pk", "artifactfile", "is_documentation")
+        )
+
+        referenced = {}
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[: self.batch_size])
+            if not batch:
+                break
+            for _, name, is_documentation in batch:
+                referenced[os.path.normpath(name)] = is_documentation
+            last_pk = batch[-1][0]
+
+        return referenced
+
+    def _check_project_directory(self, relative_directory):
+        """Checks the content of a project directory ``artifacts/<project>``"""
+
+        logger.debug("[media consistency] checking %s", relative_directory)
+
+        referenced = self._get_referenced_files(relative_directory)
+        documentation_directories = set(
+            os.path.dirname(name)
+            for name, is_documentation in referenced.items()
+            if is_documentation
+        )
+
+        project_path = os.path.join(settings.MEDIA_ROOT, relative_directory)
+        _, files, directories = scan_artifact_directory(project_path)
+
+        # files directly under the project directory are not created by code_doc
+        for name in files:
+            self._check_file(os.path.join(relative_directory, name), referenced)
+
+        artifact_paths = [os.path.join(project_path, name) for name in directories]
+        for path, files, directories in self.executor.map(
+            scan_artifact_directory, artifact_paths
+        ):
+            artifact_directory = os.path.relpath(path, settings.MEDIA_ROOT)
+
+            remaining = len(files) + len(directories)
+            for name in files:
+                if not self._check_file(
+                    os.path.join(artifact_directory, name), referenced
+                ):
+                    remaining -= 1
+
+            for name in directories:
+                current = os.path.join(artifact_directory, name)
+                if name == DEFLATE_DIRECTORY:
+                    if artifact_directory in documentation_directories:
+                        continue
+                    self._report("orphan_deflate_directories", current)
+                else:
+                    self._report("orphan_directories", current)
+
+                if self.fix:
+                    self._remove_tree(current)
+                    remaining -= 1
+
+            if remaining == 0:
+                self._check_empty_directory(artifact_directory)
+
+        if not os.listdir(project_path):
+            self._check_empty_directory(relative_directory)
+
+    def _check_file(self, relative_path, referenced):
+        """Reports the file if it is not referenced by any artifact.
+
+        Returns False if the file has been removed, True otherwise.
+        """
+        if os.path.normpath(relative_path) in referenced:
+            return True
+
+        self._report("orphan_files", relative_path)
+        if not self.fix:
+            return True
+
+        try:
+            os.remove(os.path.join(settings.MEDIA_ROOT, relative_path))
+        except OSError as e:
+            logger.error("[media consistency] error removing %s: %s", relative_path, e)
+            return True
+        return False
+
+    def _check_empty_directory(self, relative_path):
+        self._report("empty_directories", relative_path)
+        if not self.fix:
+            return
+
+        try:
+            os.rmdir(os.path.join(settings.MEDIA_ROOT, relative_path))
+        except OSError as e:
+            logger.error("[media consistency] error removing %s: %s", relative_path, e)
+
+    def _remove_tree(self, relative_path):
+        def on_error(function, path, excinfo):
+            logger.error("[media consistency] error removing %s", path)
+
+        shutil.rmtree(os.path.join(settings.MEDIA_ROOT, relative_path), False, on_error)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from ...models.projects import Project
+from ...models.authors import Author
+from ...utils.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Generates the thumbnails of the project icons and author images"
+
+    def handle(self, *args, **options):
+        nb_images = 0
+        for model, field in ((Project, "icon"), (Author, "image")):
+            for name in (
+                model.objects.exclude(**{field: ""})
+                .exclude(**{field: None})
+                .values_list(field, flat=True)
+            ):
+                if generate_thumbnails(name):
+                    nb_images += 1
+        self.stdout.write("thumbnails of %d image(s) generated" % nb_images)
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from ...models.projects import Project, ProjectSeries
+
+
+class Command(BaseCommand):
+    help = "Promotes the artifacts of a series to another series of the same project"
+
+    def add_arguments(self, parser):
+        parser.add_argument("project", help="Name of the project")
+        parser.add_argument("source", help="Name of the series to promote from")
+        parser.add_argument("target", help="Name of the series to promote to")
+        parser.add_argument(
+            "--revision",
+            default=None,
+            help="Promotes only the artifacts of this revision",
+        )
+        parser.add_argument(
+            "--branch",
+            default=None,
+            help="Promotes only the artifacts of a revision of this branch",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(name=options["project"])
+            source = project.series.get(series=options["source"])
+            target = project.series.get(series=options["target"])
+        except (Project.DoesNotExist, ProjectSeries.DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        revision = options["revision"]
+        try:
+            nb_promoted = target.promote_artifacts(
+                source,
+                revision=revision.strip().lower() if revision else None,
+                branch=options["branch"],
+            )
+        except IntegrityError as e:
+            raise CommandError("Error during the promotion: %s" % e)
+
+        self.stdout.write(
+            "%d artifact(s) promoted from %s to %s" % (nb_promoted, source, target)
+        )
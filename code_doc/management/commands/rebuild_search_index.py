@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from ...models.search import UserSearchToken, GroupSearchToken
+from ...utils import search
+
+
+class Command(BaseCommand):
+    help = "Recomputes the search tokens of the users and groups"
+
+    def handle(self, *args, **options):
+        for token_model in (UserSearchToken, GroupSearchToken):
+            nb_tokens = token_model.objects.rebuild()
+            search.invalidate(token_model)
+            self.stdout.write(
+                "%d token(s) computed for the %s"
+                % (nb_tokens, token_model._meta.verbose_name_plural)
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ...models.projects import SeriesAccess
+
+
+class Command(BaseCommand):
+    help = "Recomputes the materialized access rights of the users on the series"
+
+    def handle(self, *args, **options):
+        nb_rows = SeriesAccess.objects.rebuild()
+        self.stdout.write("%d access right(s) computed" % nb_rows)
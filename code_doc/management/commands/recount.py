@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from ...models.projects import Project, ProjectSeries
+from ...models.revisions import Revision
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalised counters maintained by the signals"
+
+    def handle(self, *args, **options):
+        nb_repaired = Revision.objects.recount()
+        self.stdout.write("%d revision(s) repaired" % nb_repaired)
+
+        nb_projects = Project.objects.all().update_counters()
+        nb_series = ProjectSeries.objects.all().update_counters()
+        self.stdout.write(
+            "%d project(s) and %d series recounted" % (nb_projects, nb_series)
+        )
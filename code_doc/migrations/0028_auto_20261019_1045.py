@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-19 10:45
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def compute_revision_counters(apps, schema_editor):
+    Revision = apps.get_model("code_doc", "Revision")
+
+    counters = Revision.objects.annotate(
+        current_nb_artifacts=Count("artifacts", distinct=True),
+        current_nb_series_references=Count("artifacts__project_series"),
+    ).values_list("pk", "current_nb_artifacts", "current_nb_series_references")
+
+    for pk, nb_artifacts, nb_series_references in list(counters):
+        Revision.objects.filter(pk=pk).update(
+            nb_artifacts=nb_artifacts, nb_series_references=nb_series_references
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("code_doc", "0027_auto_20170804_1415")]
+
+    operations = [
+        migrations.AddField(
+            model_name="revision",
+            name="nb_artifacts",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="revision",
+            name="nb_series_references",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(compute_revision_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-19 14:32
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def compute_series_access(apps, schema_editor):
+    # copy of code_doc.models.projects.compute_series_access when this was written
+    ProjectSeries = apps.get_model("code_doc", "ProjectSeries")
+    SeriesAccess = apps.get_model("code_doc", "SeriesAccess")
+
+    # (user lookup, rights granted): the project administrators have all the rights,
+    # the permissions of the series are granted to active users only
+    grants = [("project__administrators", (True, True, True))]
+    for users_relation, groups_relation, rights in (
+        ("view_users", "view_groups", (True, False, False)),
+        (
+            "perms_users_artifacts_add",
+            "perms_groups_artifacts_add",
+            (True, True, False),
+        ),
+        (
+            "perms_users_artifacts_del",
+            "perms_groups_artifacts_del",
+            (False, False, True),
+        ),
+    ):
+        grants.append((users_relation, rights))
+        grants.append((groups_relation + "__user", rights))
+
+    access = {}
+    for user_lookup, rights in grants:
+        conditions = {user_lookup + "__isnull": False}
+        if user_lookup != "project__administrators":
+            conditions[user_lookup + "__is_active"] = True
+
+        pairs = (
+            ProjectSeries.objects.filter(**conditions)
+            .values_list(user_lookup, "pk")
+            .distinct()
+        )
+        for pair in pairs:
+            current = access.setdefault(pair, [False, False, False])
+            for index, right in enumerate(rights):
+                current[index] = current[index] or right
+
+    SeriesAccess.objects.bulk_create(
+        SeriesAccess(
+            user_id=user_id,
+            series_id=series_id,
+            can_view=can_view,
+            can_add=can_add,
+            can_delete=can_delete,
+        )
+        for (user_id, series_id), (can_view, can_add, can_delete) in access.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("code_doc", "0028_auto_20261019_1045"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeriesAccess",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("can_view", models.BooleanField(default=False)),
+                ("can_add", models.BooleanField(default=False)),
+                ("can_delete", models.BooleanField(default=False)),
+                (
+                    "series",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="access",
+                        to="code_doc.ProjectSeries",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="series_access",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={"verbose_name_plural": "Series access"},
+        ),
+        migrations.AlterUniqueTogether(
+            name="seriesaccess", unique_together=set([("user", "series")])
+        ),
+        migrations.RunPython(compute_series_access, migrations.RunPython.noop),
+    ]
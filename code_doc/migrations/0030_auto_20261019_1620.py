@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-19 16:20
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("code_doc", "0029_auto_20261019_1432")]
+
+    operations = [
+        migrations.AlterField(
+            model_name="artifact",
+            name="upload_date",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                help_text="Automatic field that indicates the file upload time",
+                null=True,
+                verbose_name="Upload date",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="revision",
+            name="commit_time",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                db_index=True,
+                help_text="Automatic field that is set when this revision is created",
+                verbose_name="Time of creation",
+            ),
+        ),
+    ]
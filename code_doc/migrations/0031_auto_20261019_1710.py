@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-19 17:10
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def compute_icon_dimensions(apps, schema_editor):
+    from django.core.files.images import get_image_dimensions
+
+    Project = apps.get_model("code_doc", "Project")
+
+    for project in Project.objects.exclude(icon="").exclude(icon=None):
+        try:
+            width, height = get_image_dimensions(project.icon)
+        except (IOError, OSError):
+            continue
+        Project.objects.filter(pk=project.pk).update(
+            icon_width=width, icon_height=height
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("code_doc", "0030_auto_20261019_1620")]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="icon_height",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="icon_width",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(compute_icon_dimensions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-19 17:50
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+import hashlib
+
+
+# copies of the functions of code_doc.models.authors when this was written
+def get_avatar_color(name, brightness_limit=200):
+    hashed = hashlib.md5(name.encode("utf-8")).hexdigest()[:6]
+    r = min(int(hashed[0:2], 16), brightness_limit)
+    g = min(int(hashed[2:4], 16), brightness_limit)
+    b = min(int(hashed[4:6], 16), brightness_limit)
+    return "#%02x%02x%02x" % (r, g, b)
+
+
+def get_gravatar_hash(email):
+    email = email.strip().lower()
+    if not email:
+        return ""
+    return hashlib.md5(email.encode("utf-8")).hexdigest()
+
+
+def compute_avatars(apps, schema_editor):
+    Author = apps.get_model("code_doc", "Author")
+
+    for pk, firstname, lastname, gravatar_email in list(
+        Author.objects.values_list("pk", "firstname", "lastname", "gravatar_email")
+    ):
+        Author.objects.filter(pk=pk).update(
+            avatar_color=get_avatar_color(firstname + lastname),
+            gravatar_hash=get_gravatar_hash(gravatar_email),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("code_doc", "0031_auto_20261019_1710")]
+
+    operations = [
+        migrations.AddField(
+            model_name="author",
+            name="avatar_color",
+            field=models.CharField(blank=True, editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name="author",
+            name="gravatar_hash",
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.RunPython(compute_avatars, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-19 18:30
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+
+import os
+
+
+def compute_counters(apps, schema_editor):
+    Artifact = apps.get_model("code_doc", "Artifact")
+    Project = apps.get_model("code_doc", "Project")
+    ProjectSeries = apps.get_model("code_doc", "ProjectSeries")
+
+    for pk, name in list(Artifact.objects.values_list("pk", "artifactfile")):
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        if name and os.path.exists(path):
+            Artifact.objects.filter(pk=pk).update(file_size=os.path.getsize(path))
+
+    for project in Project.objects.all():
+        artifacts = Artifact.objects.filter(project=project).aggregate(
+            nb_artifacts=models.Count("pk"),
+            total_size=models.Sum("file_size"),
+            last_upload=models.Max("upload_date"),
+        )
+        Project.objects.filter(pk=project.pk).update(
+            nb_artifacts=artifacts["nb_artifacts"],
+            nb_revisions=project.revisions.count(),
+            nb_series=project.series.count(),
+            total_size=artifacts["total_size"] or 0,
+            last_upload=artifacts["last_upload"],
+        )
+
+    for series in ProjectSeries.objects.all():
+        artifacts = series.artifacts.aggregate(
+            nb_artifacts=models.Count("pk"),
+            nb_revisions=models.Count("revision", distinct=True),
+            total_size=models.Sum("file_size"),
+            last_upload=models.Max("upload_date"),
+        )
+        ProjectSeries.objects.filter(pk=series.pk).update(
+            nb_artifacts=artifacts["nb_artifacts"],
+            nb_revisions=artifacts["nb_revisions"],
+            total_size=artifacts["total_size"] or 0,
+            last_upload=artifacts["last_upload"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("code_doc", "0032_auto_20261019_1750")]
+
+    operations = [
+        migrations.AddField(
+            model_name="artifact",
+            name="file_size",
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="nb_artifacts",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="nb_revisions",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="nb_series",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="total_size",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="last_upload",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="projectseries",
+            name="nb_artifacts",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="projectseries",
+            name="nb_revisions",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="projectseries",
+            name="total_size",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="projectseries",
+            name="last_upload",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(compute_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-19 20:00
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+import re
+
+
+# copy of the tokenization of code_doc.utils.search when this was written
+MAX_TOKEN_LENGTH = 100
+
+_word_separators = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def get_search_tokens(value):
+    value = value.strip().lower()
+    if not value:
+        return set()
+    tokens = set(word for word in _word_separators.split(value) if word)
+    tokens.add(value)
+    return set(token[:MAX_TOKEN_LENGTH] for token in tokens)
+
+
+def get_owner_tokens(owners, searched_fields):
+    fields = [field for field, _ in searched_fields]
+    weights = dict(searched_fields)
+
+    tokens = {}
+    for row in owners.values_list("pk", *fields):
+        for field, value in zip(fields, row[1:]):
+            for token in get_search_tokens(value or ""):
+                key = (row[0], token)
+                tokens[key] = min(tokens.get(key, weights[field]), weights[field])
+    return tokens
+
+
+def compute_search_tokens(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Group = apps.get_model("auth", "Group")
+    UserSearchToken = apps.get_model("code_doc", "UserSearchToken")
+    GroupSearchToken = apps.get_model("code_doc", "GroupSearchToken")
+
+    for owner_model, token_model, searched_fields in (
+        (User, UserSearchToken, (("username", 0), ("first_name", 1), ("last_name", 1))),
+        (Group, GroupSearchToken, (("name", 0),)),
+    ):
+        tokens = get_owner_tokens(owner_model.objects.all(), searched_fields)
+        token_model.objects.bulk_create(
+            token_model(owner_id=owner_id, token=token, weight=weight)
+            for (owner_id, token), weight in tokens.items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("auth", "0006_require_contenttypes_0002"),
+        ("code_doc", "0034_auto_20261019_1915"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GroupSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(db_index=True, max_length=100)),
+                ("weight", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_tokens",
+                        to="auth.Group",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="UserSearchToken",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(db_index=True, max_length=100)),
+                ("weight", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_tokens",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name="groupsearchtoken", unique_together=set([("owner", "token")])
+        ),
+        migrations.AlterUniqueTogether(
+            name="usersearchtoken", unique_together=set([("owner", "token")])
+        ),
+        migrations.RunPython(compute_search_tokens, migrations.RunPython.noop),
+    ]
@@ -47,6 +47,25 @@ def get_deflation_directory(instance, without_media_root=False):
     return deflate_directory
 
 
+class ArtifactQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Returns the artifacts that the user is allowed to view: the artifacts of the
+        series visible to the user, and all the artifacts of the projects the user
+        administrates (same rule as :py:meth:`RevisionQuerySet.visible_to
+        <code_doc.models.revisions.RevisionQuerySet.visible_to>`)"""
+        if user.is_superuser:
+            return self.all()
+
+        return self.filter(
+            models.Q(project__in=Project.objects.administrated_by(user))
+            | models.Q(
+                pk__in=Artifact.project_series.through.objects.filter(
+                    projectseries__in=ProjectSeries.objects.visible_to(user)
+                ).values("artifact")
+            )
+        )
+
+
 class Artifact(models.Model):
     """
     An artifact is a downloadable file
@@ -73,6 +92,9 @@ class Artifact(models.Model):
     )
     # the 1024 is important in production, otherwise the filenames get scrubbed
 
+    #: Size of the file in bytes, maintained by the signals. None if unknown
+    file_size = models.BigIntegerField(null=True, blank=True, editable=False)
+
     is_documentation = models.BooleanField(
         default=False,
         help_text=_(
@@ -95,6 +117,7 @@ class Artifact(models.Model):
         _("Upload date"),
         null=True,
         blank=True,
+        db_index=True,
         help_text=_("Automatic field that indicates the file upload time"),
     )
 
@@ -105,6 +128,8 @@ class Artifact(models.Model):
         help_text=_("User/agent uploading the file"),
     )
 
+    objects = ArtifactQuerySet.as_manager()
+
     def get_absolute_url(self):
         kwargs = {
             "project_id": self.revision.project.pk,
@@ -155,7 +180,10 @@ class Artifact(models.Model):
         return md5_1.upper() == md5_2.upper()
 
     def promote_to_series(self, new_series):
-        """Adds a new series to the list of series, this artifact belongs to"""
+        """Adds a new series to the list of series, this artifact belongs to
+
+        .. seealso:: :py:meth:`ProjectSeries.promote_artifacts` for promoting several
+           artifacts at once"""
         self.project_series.add(new_series)
 
     def save(self, *args, **kwargs):
@@ -4,6 +4,7 @@ from django.db import models
 from django.core.urlresolvers import reverse
 from django.conf import settings
 
+import hashlib
 import os
 import logging
 
@@ -27,6 +28,34 @@ def get_author_image_location(instance, filename):
     return os.path.join(media_relative_dir, filename)
 
 
+def get_avatar_color(name, brightness_limit=200):
+    """Returns the background color of the default avatar of an author, derived from
+    the name of the author"""
+    hashed = hashlib.md5(name.encode("utf-8")).hexdigest()[:6]
+    r = min(int(hashed[0:2], 16), brightness_limit)
+    g = min(int(hashed[2:4], 16), brightness_limit)
+    b = min(int(hashed[4:6], 16), brightness_limit)
+    return "#%02x%02x%02x" % (r, g, b)
+
+
+def get_gravatar_hash(email):
+    """Returns the hash identifying the email on Gravatar, empty if no email"""
+    email = email.strip().lower()
+    if not email:
+        return ""
+    return hashlib.md5(email.encode("utf-8")).hexdigest()
+
+
+class AuthorQuerySet(models.QuerySet):
+    def editable_by(self, user):
+        """Returns the authors whose details the user can edit"""
+        if user.is_superuser:
+            return self.all()
+        if user.pk is None:
+            return self.none()
+        return self.filter(django_user=user)
+
+
 class Author(models.Model):
     """An author, may appear in several projects, and is not someone that is
     allowed to login (not a user of Django)."""
@@ -47,6 +76,13 @@ class Author(models.Model):
         blank=True, null=True, upload_to=get_author_image_location
     )
 
+    #: Color of the default avatar and hash of the Gravatar email, maintained by the
+    #: signals for not computing them on each display
+    avatar_color = models.CharField(max_length=7, blank=True, editable=False)
+    gravatar_hash = models.CharField(max_length=32, blank=True, editable=False)
+
+    objects = AuthorQuerySet.as_manager()
+
     class Meta:
         permissions = (("author_edit", "Can edit the Author's details"),)
 
@@ -57,7 +93,9 @@ class Author(models.Model):
         """In order for a Django User to be allowed to edit the details of an Author,
            he has to be a superuser or be the User, this Author is linked to.
         """
-        return user.is_superuser or (hasattr(user, "author") and (user.author == self))
+        return user.is_superuser or (
+            user.pk is not None and self.django_user_id == user.pk
+        )
 
     def get_absolute_url(self):
         return reverse("author", kwargs={"author_id": self.pk})
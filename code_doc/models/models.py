@@ -45,36 +45,3 @@ class Topic(models.Model):
 
     def __str__(self):
         return "%s" % (self.name)
-
-
-def manage_permission_on_object(
-    userobj, user_permissions, group_permissions, default=None
-):
-    """If (in order)
-
-    * userobj is a superuser, then true
-    * userobj is not active, then default. If default is None, then True
-    * no credentials set in the groups user_permissions / group_permissions,
-      the default. If default is None, then True.
-    * userobj in user_permissions, then True
-    * userobj in one of the groups in group_permissions, the True
-    * otherwise False
-
-    """
-    if userobj.is_superuser:
-        return True
-
-    if not userobj.is_active:
-        return default if default is not None else True
-
-    # no permission has been set, so no restriction by default
-    if user_permissions.count() == 0 and group_permissions.count() == 0:
-        return default if default is not None else True
-
-    if user_permissions.filter(id=userobj.id).count() > 0:
-        return True
-
-    return (
-        group_permissions.filter(id__in=[g.id for g in userobj.groups.all()]).count()
-        > 0
-    )
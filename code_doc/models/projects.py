@@ -1,17 +1,169 @@
-from django.db import models
+from django.db import models, connection, transaction, IntegrityError
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 from django.contrib.auth.models import Group
 from django.core.urlresolvers import reverse
 from django.template.defaultfilters import slugify
 from django.conf import settings
 
+import collections
 import logging
 
-from .models import Topic, Copyright, CopyrightHolder, manage_permission_on_object
+from .models import Topic, Copyright, CopyrightHolder
 from .authors import Author
+from ..permissions.cache import get_user_administrated_project_ids
 
 logger = logging.getLogger(__name__)
 
 
+def _aggregate_subquery(queryset, group_field, aggregate, output_field, default=None):
+    """Returns the aggregate of the rows of queryset as a subquery, the rows being
+    grouped on group_field (the field correlated to the outer query with an
+    ``OuterRef``). The subquery is NULL when there is no row, default is used instead
+    if given."""
+    subquery = models.Subquery(
+        queryset.order_by()
+        .values(group_field)
+        .annotate(value=aggregate)
+        .values("value"),
+        output_field=output_field,
+    )
+    if default is None:
+        return subquery
+    return Coalesce(subquery, models.Value(default))
+
+
+def _update_counters(queryset, counters):
+    """Writes the counters of the projects or series of the queryset, in a single
+    ``UPDATE`` incrementing their version
+
+    :param counters: a dictionary {counter field: value or expression}
+    """
+    return queryset.update(
+        version=models.F("version") + 1, last_modified=timezone.now(), **counters
+    )
+
+
+def _add_to_counters(queryset, deltas, last_upload):
+    """Adds the deltas to the counters of the projects or series of the queryset and
+    raises their last upload date"""
+    counters = dict(
+        (field, models.F(field) + delta) for field, delta in deltas.items() if delta
+    )
+    if last_upload is not None:
+        last_upload = models.Value(last_upload, output_field=models.DateTimeField())
+        counters["last_upload"] = Greatest(
+            Coalesce("last_upload", last_upload), last_upload
+        )
+    return _update_counters(queryset, counters)
+
+
+def _exclude_maintained_fields(instance, kwargs):
+    """Prevents the save of an existing instance from writing the fields maintained in
+    the database (eg. the counters), the values of the instance may be outdated
+
+    :param kwargs: the keyword arguments of save, modified in place
+    """
+    if (
+        instance._state.adding
+        or kwargs.get("force_insert")
+        or kwargs.get("update_fields") is not None
+    ):
+        return
+
+    kwargs["update_fields"] = [
+        field.name
+        for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in instance.maintained_fields
+    ]
+
+
+class ProjectQuerySet(models.QuerySet):
+    def administrated_by(self, user):
+        """Returns the projects that the user administrates"""
+        if user.is_superuser:
+            return self.all()
+        if user.pk is None:
+            return self.none()
+        return self.filter(
+            pk__in=Project.administrators.through.objects.filter(
+                user_id=user.pk
+            ).values("project_id")
+        )
+
+    def visible_to(self, user):
+        """Returns the projects that the user is allowed to view, all of them, see
+        :py:meth:`Project.has_user_project_view_permission`"""
+        return self.all()
+
+    def touch(self):
+        """Increments the version and updates the modification date of the projects,
+        which invalidates the validators of the conditional responses (ETag,
+        Last-Modified) of their pages"""
+        return self.update(
+            version=models.F("version") + 1, last_modified=timezone.now()
+        )
+
+    def add_to_counters(self, last_upload=None, **deltas):
+        """Atomically adds the deltas to the counters of the projects, without
+        recomputing them from their content, see :py:meth:`update_counters`.
+
+        :param last_upload: the upload date of the added artifacts, raising the last
+          upload date of the projects, None for leaving it unchanged
+        :param deltas: the values to add to the counters, eg. ``nb_artifacts=1``
+
+        The version of the projects is incremented, see :py:meth:`touch`. Returns the
+        number of updated projects."""
+        return _add_to_counters(self, deltas, last_upload)
+
+    def update_counters(self, fields=None):
+        """Recomputes the counters of the projects (artifacts, revisions, series, size
+        and last upload) from their content.
+
+        :param fields: the names of the counters to recompute, all of them by default
+
+        The counters are computed by subqueries in a single ``UPDATE``, which makes the
+        update atomic and independent of the previous values. The version of the
+        projects is incremented, see :py:meth:`touch`. Returns the number of updated
+        projects."""
+        from .artifacts import Artifact
+        from .revisions import Revision
+
+        artifacts = Artifact.objects.filter(project=models.OuterRef("pk"))
+        counters = dict(
+            nb_artifacts=_aggregate_subquery(
+                artifacts, "project", models.Count("pk"), models.IntegerField(), 0
+            ),
+            nb_revisions=_aggregate_subquery(
+                Revision.objects.filter(project=models.OuterRef("pk")),
+                "project",
+                models.Count("pk"),
+                models.IntegerField(),
+                0,
+            ),
+            nb_series=_aggregate_subquery(
+                ProjectSeries.objects.filter(project=models.OuterRef("pk")),
+                "project",
+                models.Count("pk"),
+                models.IntegerField(),
+                0,
+            ),
+            total_size=_aggregate_subquery(
+                artifacts,
+                "project",
+                models.Sum("file_size"),
+                models.BigIntegerField(),
+                0,
+            ),
+            last_upload=_aggregate_subquery(
+                artifacts, "project", models.Max("upload_date"), models.DateTimeField()
+            ),
+        )
+        if fields is not None:
+            counters = dict((field, counters[field]) for field in fields)
+        return _update_counters(self, counters)
+
+
 class Project(models.Model):
     """A project, may contain several authors"""
 
@@ -26,6 +178,10 @@ class Project(models.Model):
         "text in Markdown", max_length=2500, blank=True, null=True
     )
     icon = models.ImageField(blank=True, null=True, upload_to="project_icons/")
+    #: Dimensions of the icon, stored for not reading the image on each display.
+    #: Maintained by the signals, None if the image cannot be read
+    icon_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    icon_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
     slug = models.SlugField()
 
     #: Authors of the project
@@ -50,6 +206,35 @@ class Project(models.Model):
         "default number of revisions to keep", default=None, blank=True, null=True
     )
 
+    #: Counters of the content of the project, for the listings. Maintained by the
+    #: signals, see :py:meth:`ProjectQuerySet.update_counters`
+    nb_artifacts = models.IntegerField(default=0, editable=False)
+    nb_revisions = models.IntegerField(default=0, editable=False)
+    nb_series = models.IntegerField(default=0, editable=False)
+    #: Total size of the artifacts, in bytes
+    total_size = models.BigIntegerField(default=0, editable=False)
+    #: Upload date of the last artifact
+    last_upload = models.DateTimeField(null=True, blank=True, editable=False)
+
+    #: Version and modification date of the content of the project, the validators of
+    #: the conditional responses. Maintained by the signals, see
+    #: :py:meth:`ProjectQuerySet.touch`
+    version = models.PositiveIntegerField(default=0, editable=False)
+    last_modified = models.DateTimeField(default=timezone.now, editable=False)
+
+    #: the fields updated by the signals, not written by :py:meth:`save`
+    maintained_fields = (
+        "nb_artifacts",
+        "nb_revisions",
+        "nb_series",
+        "total_size",
+        "last_upload",
+        "version",
+        "last_modified",
+    )
+
+    objects = ProjectQuerySet.as_manager()
+
     def __str__(self):
         return "%s" % (self.name)
 
@@ -70,7 +255,7 @@ class Project(models.Model):
 
     def has_user_project_administrate_permission(self, user):
         """Returns true if the user is able to administrate a project"""
-        return user.is_superuser or user in self.administrators.all()
+        return user.is_superuser or self.pk in get_user_administrated_project_ids(user)
 
     def has_user_project_view_permission(self, user):
         """Returns true if the user is able to view the project"""
@@ -89,9 +274,16 @@ class Project(models.Model):
         return self.has_user_project_administrate_permission(user)
 
     def get_number_of_files(self):
-        """Returns the number of files archived for a project"""
-        artifact_counts = [rev.artifacts.count() for rev in self.series.all()]
-        return sum(artifact_counts) if len(artifact_counts) > 0 else 0
+        """Returns the number of files archived for a project
+
+        The counter is read from the database, the listings should use
+        :py:attr:`nb_artifacts` directly."""
+        return (
+            Project.objects.filter(pk=self.pk)
+            .values_list("nb_artifacts", flat=True)
+            .first()
+            or 0
+        )
 
     def get_number_of_series(self):
         """Returns the number of series for a project"""
@@ -103,6 +295,7 @@ class Project(models.Model):
 
     def save(self, *args, **kwargs):
         self.slug = slugify(self.name)
+        _exclude_maintained_fields(self, kwargs)
         super(Project, self).save(*args, **kwargs)  # Call the "real" save() method.
 
 
@@ -126,6 +319,154 @@ class ProjectRepository(models.Model):
         return "[%s] %s" % (self.project.name, self.code_source_url)
 
 
+class ProjectSeriesQuerySet(models.QuerySet):
+    def with_user_access(self, user, right):
+        """Returns the series on which the user has the right.
+
+        :param right: one of the rights of :py:class:`SeriesAccess`, ``"can_view"``,
+          ``"can_add"`` or ``"can_delete"``
+
+        The visibility of the public series is not included, see :py:meth:`visible_to`.
+        """
+        if user.is_superuser:
+            return self.all()
+        if user.pk is None:
+            return self.none()
+        return self.filter(
+            pk__in=SeriesAccess.objects.filter(user=user, **{right: True}).values(
+                "series"
+            )
+        )
+
+    def visible_to(self, user):
+        """Returns the series that the user is allowed to view.
+
+        This is the rule of :py:meth:`ProjectSeries.has_user_series_view_permission`
+        expressed as a single filter on the materialized access rights
+        (:py:class:`SeriesAccess`).
+        """
+        if user.is_superuser:
+            return self.all()
+
+        rule = models.Q(is_public=True)
+        if user.pk is not None:
+            rule |= models.Q(
+                pk__in=SeriesAccess.objects.filter(user=user, can_view=True).values(
+                    "series"
+                )
+            )
+
+        return self.filter(rule)
+
+    def artifact_addable_by(self, user):
+        """Returns the series to which the user can add artifacts"""
+        return self.with_user_access(user, "can_add")
+
+    def artifact_deletable_by(self, user):
+        """Returns the series from which the user can remove artifacts"""
+        return self.with_user_access(user, "can_delete")
+
+    def editable_by(self, user):
+        """Returns the series that the user can edit"""
+        return self.filter(project__in=Project.objects.administrated_by(user))
+
+    def with_last_update(self):
+        """Annotates the series with the upload date of their last artifact
+        (``last_update``) and the id of their last documentation artifact
+        (``last_doc_id``), see :py:func:`get_series_last_updates`.
+
+        The annotations are subqueries on the intermediate table, the other filters
+        of the queryset do not restrict them.
+        """
+        links = ProjectSeries.artifacts.through.objects.filter(
+            projectseries=models.OuterRef("pk")
+        )
+        return self.annotate(
+            last_update=models.Subquery(
+                links.values("projectseries")
+                .annotate(last_update=models.Max("artifact__upload_date"))
+                .values("last_update"),
+                output_field=models.DateTimeField(),
+            ),
+            last_doc_id=models.Subquery(
+                links.filter(artifact__is_documentation=True)
+                .order_by("-artifact__upload_date", "-artifact")
+                .values("artifact")[:1],
+                output_field=models.IntegerField(),
+            ),
+        )
+
+    def with_artifacts_count(self):
+        """Annotates the series with their number of artifacts (``artifacts_count``),
+        with a subquery on the intermediate table"""
+        return self.annotate(
+            artifacts_count=models.Subquery(
+                ProjectSeries.artifacts.through.objects.filter(
+                    projectseries=models.OuterRef("pk")
+                )
+                .values("projectseries")
+                .annotate(count=models.Count("artifact"))
+                .values("count"),
+                output_field=models.IntegerField(),
+            )
+        )
+
+    def touch(self):
+        """Increments the version and updates the modification date of the series, see
+        :py:meth:`ProjectQuerySet.touch`"""
+        return self.update(
+            version=models.F("version") + 1, last_modified=timezone.now()
+        )
+
+    def add_to_counters(self, last_upload=None, **deltas):
+        """Atomically adds the deltas to the counters of the series and increments
+        their version, see :py:meth:`ProjectQuerySet.add_to_counters`. Returns the
+        number of updated series."""
+        return _add_to_counters(self, deltas, last_upload)
+
+    def update_counters(self, fields=None):
+        """Recomputes the counters of the series (artifacts, revisions, size and last
+        upload) from their artifacts and increments their version, in a single
+        ``UPDATE``, see
+        :py:meth:`ProjectQuerySet.update_counters`. Returns the number of updated
+        series."""
+        links = ProjectSeries.artifacts.through.objects.filter(
+            projectseries=models.OuterRef("pk")
+        )
+        counters = dict(
+            nb_artifacts=_aggregate_subquery(
+                links,
+                "projectseries",
+                models.Count("artifact"),
+                models.IntegerField(),
+                0,
+            ),
+            nb_revisions=_aggregate_subquery(
+                links,
+                "projectseries",
+                models.Count("artifact__revision", distinct=True),
+                models.IntegerField(),
+                0,
+            ),
+            total_size=_aggregate_subquery(
+                links,
+                "projectseries",
+                models.Sum("artifact__file_size"),
+                models.BigIntegerField(),
+                0,
+            ),
+            last_upload=_aggregate_subquery(
+                links,
+                "projectseries",
+                models.Max("artifact__upload_date"),
+                models.DateTimeField(),
+            ),
+        )
+        if fields is not None:
+            counters = dict((field, counters[field]) for field in fields)
+        return _update_counters(self, counters)
+
+
 class ProjectSeries(models.Model):
     """A series of a project comes with several artifacts"""
 
@@ -153,6 +494,28 @@ class ProjectSeries(models.Model):
         null=True,
     )
 
+    #: Counters of the content of the series, maintained by the signals, see
+    #: :py:meth:`ProjectSeriesQuerySet.update_counters`
+    nb_artifacts = models.IntegerField(default=0, editable=False)
+    nb_revisions = models.IntegerField(default=0, editable=False)
+    total_size = models.BigIntegerField(default=0, editable=False)
+    last_upload = models.DateTimeField(null=True, blank=True, editable=False)
+
+    #: Version and modification date of the series, see
+    #: :py:meth:`ProjectSeriesQuerySet.touch`
+    version = models.PositiveIntegerField(default=0, editable=False)
+    last_modified = models.DateTimeField(default=timezone.now, editable=False)
+
+    #: the fields updated by the signals, not written by :py:meth:`save`
+    maintained_fields = (
+        "nb_artifacts",
+        "nb_revisions",
+        "total_size",
+        "last_upload",
+        "version",
+        "last_modified",
+    )
+
     # the users and groups allowed to view the artifacts of the revision
     # and also this project series
     view_users = models.ManyToManyField(
@@ -174,6 +537,8 @@ class ProjectSeries(models.Model):
         Group, blank=True, related_name="perms_groups_artifacts_del"
     )
 
+    objects = ProjectSeriesQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = "Project series"
         unique_together = (("project", "series"),)
@@ -187,23 +552,35 @@ class ProjectSeries(models.Model):
     def __str__(self):
         return "[%s @ %s] [%s]" % (self.project.name, self.series, self.release_date)
 
+    def save(self, *args, **kwargs):
+        _exclude_maintained_fields(self, kwargs)
+        super(ProjectSeries, self).save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse(
             "project_series",
-            kwargs={"project_id": self.project.pk, "series_id": self.pk},
+            kwargs={"project_id": self.project_id, "series_id": self.pk},
         )
 
+    def _has_user_access(self, userobj, right):
+        """Returns True if the materialized access rights of the user contain right"""
+        if userobj.is_superuser:
+            return True
+        if userobj.pk is None:
+            return False
+        return SeriesAccess.objects.filter(
+            user=userobj, series=self, **{right: True}
+        ).exists()
+
     def has_user_series_view_permission(self, userobj):
-        """Returns true if the user has view permission on this series, False otherwise"""
-        return (
-            self.is_public
-            or self.project.has_user_project_administrate_permission(userobj)
-            or self.has_user_series_edit_permission(userobj)
-            or self.has_user_series_artifact_add_permission(userobj)
-            or manage_permission_on_object(
-                userobj, self.view_users, self.view_groups, False
-            )
-        )
+        """Returns true if the user has view permission on this series, False otherwise
+
+        The series is visible if it is public, or to the superusers, the administrators
+        of the project, and the active users having the artifact add or the view
+        permission directly or through one of their groups. Contrary to the other
+        objects, a series without any user or group permission is not visible.
+        """
+        return self.is_public or self._has_user_access(userobj, "can_view")
 
     def has_user_series_edit_permission(self, userobj):
         """Returns true if the user has edit permission on this series, False otherwise
@@ -216,27 +593,287 @@ class ProjectSeries(models.Model):
 
     def has_user_series_artifact_add_permission(self, userobj):
         """Returns True if the user can add an artifact to the serie"""
-        return self.project.has_user_project_administrate_permission(
-            userobj
-        ) or manage_permission_on_object(
-            userobj,
-            self.perms_users_artifacts_add,
-            self.perms_groups_artifacts_add,
-            False,
-        )
+        return self._has_user_access(userobj, "can_add")
 
     def has_user_series_artifact_delete_permission(self, userobj):
         """Returns True if the user can remove an artifact from the serie"""
-        return self.project.has_user_project_administrate_permission(
-            userobj
-        ) or manage_permission_on_object(
-            userobj,
-            self.perms_users_artifacts_del,
-            self.perms_groups_artifacts_del,
-            False,
-        )
+        return self._has_user_access(userobj, "can_delete")
 
     def get_all_revisions(self):
         from code_doc.models.artifacts import Artifact
 
         return list(set(map(Artifact.get_revision, self.artifacts.all())))
+
+    def promote_artifacts(self, source_series, revision=None, branch=None):
+        """Adds the artifacts of another series of the project to this series.
+
+        :param source_series: the series containing the artifacts to promote
+        :param revision: if given, only the artifacts of this revision (name) are promoted
+        :param branch: if given, only the artifacts of a revision of this branch (name)
+          are promoted
+        :returns: the number of promoted artifacts
+
+        The artifacts are linked with a single insertion in the intermediate table. The
+        consistency of the projects and the limit on the number of revisions are checked
+        once for the whole set by the m2m_changed signal handlers.
+        """
+        if source_series.project_id != self.project_id:
+            raise IntegrityError("Artifacts can only be promoted within a project")
+
+        artifacts = source_series.artifacts.exclude(pk__in=self.artifacts.values("pk"))
+        if revision is not None:
+            artifacts = artifacts.filter(revision__revision=revision)
+        if branch is not None:
+            artifacts = artifacts.filter(revision__branches__name=branch)
+
+        artifacts_pks = list(artifacts.values_list("pk", flat=True).distinct())
+        if artifacts_pks:
+            self.artifacts.add(*artifacts_pks)
+
+        logger.debug(
+            "[series] %d artifacts promoted from %s to %s",
+            len(artifacts_pks),
+            source_series,
+            self,
+        )
+        return len(artifacts_pks)
+
+    #: the relations defining the access rights to the series, see :py:meth:`clone`
+    permission_relations = (
+        "view_users",
+        "view_groups",
+        "perms_users_artifacts_add",
+        "perms_groups_artifacts_add",
+        "perms_users_artifacts_del",
+        "perms_groups_artifacts_del",
+    )
+
+    def clone(self, series, release_date=None):
+        """Creates a new series of the project from this one.
+
+        :param series: the name of the new series
+        :param release_date: the release date of the new series, defaults to the one
+          of this series
+        :returns: the new series
+
+        The description, visibility, revision limit and the permissions are copied.
+        The artifacts are shared with this series and not copied: the links are
+        inserted directly from the intermediate tables (``INSERT ... SELECT``), which
+        makes the number of queries independent of the size of the series. The m2m
+        signals are not sent for those insertions, the counters and the access rights
+        are updated here instead. The project and the revision limit being the same as this series,
+        no other check is needed.
+        """
+        from .revisions import Revision
+
+        with transaction.atomic():
+            new_series = ProjectSeries.objects.create(
+                project_id=self.project_id,
+                series=series,
+                release_date=release_date
+                if release_date is not None
+                else self.release_date,
+                is_public=self.is_public,
+                description_mk=self.description_mk,
+                nb_revisions_to_keep=self.nb_revisions_to_keep,
+            )
+
+            for relation in self.permission_relations + ("artifacts",):
+                _copy_m2m_links(getattr(ProjectSeries, relation), self, new_series)
+            SeriesAccess.objects.update_for(series=[new_series.pk])
+            ProjectSeries.objects.filter(pk=new_series.pk).update_counters()
+
+            references = (
+                self.artifacts.exclude(revision=None)
+                .values("revision")
+                .annotate(nb_references=models.Count("pk"))
+                .values_list("revision", "nb_references")
+            )
+            Revision.objects.add_to_counter("nb_series_references", dict(references))
+
+        logger.debug("[series] %s cloned to %s", self, new_series)
+        return new_series
+
+
+def get_series_last_updates(series):
+    """Returns the last updates of the series for the templates
+
+    :param series: a list of series annotated by
+      :py:meth:`ProjectSeriesQuerySet.with_last_update`
+    :returns: a dictionary ``{series: {"last_update": date, "last_doc": artifact}}``
+      in the order of series, the keys being absent if the series does not contain
+      any (documentation) artifact
+
+    The documentation artifacts are fetched with a single query.
+    """
+    from .artifacts import Artifact
+
+    last_docs = Artifact.objects.in_bulk(
+        [current.last_doc_id for current in series if current.last_doc_id is not None]
+    )
+
+    last_updates = collections.OrderedDict()
+    for current in series:
+        last_updates[current] = {}
+        if current.last_update is not None:
+            last_updates[current]["last_update"] = current.last_update
+        if current.last_doc_id is not None:
+            last_updates[current]["last_doc"] = last_docs[current.last_doc_id]
+
+    return last_updates
+
+
+def _copy_m2m_links(descriptor, source, target):
+    """Copies the links of source to target in the intermediate table of a many to many
+    relation, with a single query.
+
+    :param descriptor: the descriptor of the relation on the model of source and target
+    """
+    through = descriptor.through
+    if descriptor.reverse:
+        source_field = descriptor.field.m2m_reverse_name()
+        target_field = descriptor.field.m2m_field_name()
+    else:
+        source_field = descriptor.field.m2m_field_name()
+        target_field = descriptor.field.m2m_reverse_name()
+
+    source_column = through._meta.get_field(source_field).column
+    target_column = through._meta.get_field(target_field).column
+
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO {table} ({source}, {target}) "
+            "SELECT %s, {target} FROM {table} WHERE {source} = %s".format(
+                table=quote_name(through._meta.db_table),
+                source=quote_name(source_column),
+                target=quote_name(target_column),
+            ),
+            [target.pk, source.pk],
+        )
+
+
+def compute_series_access(series_model, series_ids=None, user_ids=None):
+    """Computes the access rights of the users on the series from the permission
+    relations.
+
+    :param series_model: the series model
+    :param series_ids: if given, restricts the computation to those series
+    :param user_ids: if given, restricts the computation to those users
+    :returns: a dictionary ``{(user id, series id): [can_view, can_add, can_delete]}``
+      containing only the pairs having at least one right
+
+    The superusers and the public series are not materialized, see
+    :py:meth:`ProjectSeries.has_user_series_view_permission` for the rules.
+    """
+    series = series_model.objects.all()
+    if series_ids is not None:
+        series = series.filter(pk__in=series_ids)
+
+    # (user lookup, rights granted): the project administrators have all the rights,
+    # the permissions of the series are granted to active users only
+    grants = [("project__administrators", (True, True, True))]
+    for users_relation, groups_relation, rights in (
+        ("view_users", "view_groups", (True, False, False)),
+        (
+            "perms_users_artifacts_add",
+            "perms_groups_artifacts_add",
+            (True, True, False),
+        ),
+        (
+            "perms_users_artifacts_del",
+            "perms_groups_artifacts_del",
+            (False, False, True),
+        ),
+    ):
+        grants.append((users_relation, rights))
+        grants.append((groups_relation + "__user", rights))
+
+    access = {}
+    for user_lookup, rights in grants:
+        # a single filter call, for using the same join on the relation
+        conditions = {user_lookup + "__isnull": False}
+        if user_lookup != "project__administrators":
+            conditions[user_lookup + "__is_active"] = True
+        if user_ids is not None:
+            conditions[user_lookup + "__in"] = user_ids
+
+        pairs = series.filter(**conditions).values_list(user_lookup, "pk").distinct()
+        for pair in pairs:
+            current = access.setdefault(pair, [False, False, False])
+            for index, right in enumerate(rights):
+                current[index] = current[index] or right
+
+    return access
+
+
+class SeriesAccessQuerySet(models.QuerySet):
+    def update_for(self, series=None, users=None):
+        """Recomputes the access rights of the given series and/or users.
+
+        :param series: an iterable or a queryset of series ids, all series if None
+        :param users: an iterable or a queryset of user ids, all users if None
+
+        The number of queries does not depend on the number of series or users.
+        """
+        with transaction.atomic():
+            rows = self.all()
+            if series is not None:
+                series = list(series)
+                rows = rows.filter(series__in=series)
+            if users is not None:
+                users = list(users)
+                rows = rows.filter(user__in=users)
+            rows.delete()
+
+            access = compute_series_access(ProjectSeries, series, users)
+            self.bulk_create(
+                SeriesAccess(
+                    user_id=user_id,
+                    series_id=series_id,
+                    can_view=can_view,
+                    can_add=can_add,
+                    can_delete=can_delete,
+                )
+                for (user_id, series_id), (
+                    can_view,
+                    can_add,
+                    can_delete,
+                ) in access.items()
+            )
+
+        return len(access)
+
+    def rebuild(self):
+        """Recomputes the whole table"""
+        return self.update_for()
+
+
+class SeriesAccess(models.Model):
+    """Materialized access rights of a user on a series.
+
+    This table is derived from the project administrators and the permission relations
+    of the series and is maintained by the signals, see
+    :py:mod:`code_doc.signals.permission_handlers`. It can be rebuilt with the
+    ``rebuild_series_access`` command.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="series_access"
+    )
+    series = models.ForeignKey(
+        ProjectSeries, on_delete=models.CASCADE, related_name="access"
+    )
+
+    can_view = models.BooleanField(default=False)
+    can_add = models.BooleanField(default=False)
+    can_delete = models.BooleanField(default=False)
+
+    objects = SeriesAccessQuerySet.as_manager()
+
+    class Meta:
+        unique_together = (("user", "series"),)
+        verbose_name_plural = "Series access"
+
+    def __str__(self):
+        return "[%s] %s" % (self.user_id, self.series_id)
@@ -1,13 +1,89 @@
 from django.core.urlresolvers import reverse
 from django.db import models
+from django.db.models import Case, Count, F, IntegerField, Value, When
 
 import logging
 
-from .projects import Project
+from .projects import Project, ProjectSeries
 
 logger = logging.getLogger(__name__)
 
 
+class RevisionQuerySet(models.QuerySet):
+    def add_to_counter(self, field, deltas):
+        """Atomically adds the deltas to the counter field of the revisions.
+
+        :param field: the name of the counter field
+        :param deltas: a dictionary {revision id: value to add}
+        """
+        deltas = dict((pk, delta) for pk, delta in deltas.items() if delta)
+        if not deltas:
+            return 0
+
+        return self.filter(pk__in=deltas.keys()).update(
+            **{
+                field: F(field)
+                + Case(
+                    *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+                    default=Value(0),
+                    output_field=IntegerField()
+                )
+            }
+        )
+
+    def visible_to(self, user):
+        """Returns the revisions that the user is allowed to view, see
+        :py:meth:`Revision.has_user_revision_view_permission`"""
+        if user.is_superuser:
+            return self.all()
+
+        return self.filter(
+            models.Q(project__in=Project.objects.administrated_by(user))
+            | models.Q(
+                pk__in=Revision.objects.filter(
+                    artifacts__project_series__in=ProjectSeries.objects.visible_to(user)
+                ).values("pk")
+            )
+        )
+
+    def recount(self):
+        """Recomputes the counters of the revisions from the artifacts and their series.
+
+        Returns the number of revisions whose counters were wrong."""
+        current = self.annotate(
+            current_nb_artifacts=Count("artifacts", distinct=True),
+            current_nb_series_references=Count("artifacts__project_series"),
+        ).values_list(
+            "pk",
+            "nb_artifacts",
+            "nb_series_references",
+            "current_nb_artifacts",
+            "current_nb_series_references",
+        )
+
+        nb_repaired = 0
+        for pk, nb_artifacts, nb_references, real_artifacts, real_references in list(
+            current
+        ):
+            if nb_artifacts == real_artifacts and nb_references == real_references:
+                continue
+            logger.warning(
+                "[revision] repairing counters of revision %d: artifacts %d -> %d, "
+                "series references %d -> %d",
+                pk,
+                nb_artifacts,
+                real_artifacts,
+                nb_references,
+                real_references,
+            )
+            Revision.objects.filter(pk=pk).update(
+                nb_artifacts=real_artifacts, nb_series_references=real_references
+            )
+            nb_repaired += 1
+
+        return nb_repaired
+
+
 class Revision(models.Model):
     """A Revision is a collection of artifacts, that were produced by the same
        state of the Project's code."""
@@ -17,22 +93,35 @@ class Revision(models.Model):
     commit_time = models.DateTimeField(
         "Time of creation",
         auto_now_add=True,
+        db_index=True,
         help_text="Automatic field that is set when this revision is created",
     )
 
+    #: Number of artifacts of this revision, maintained by the signals
+    nb_artifacts = models.IntegerField(default=0, editable=False)
+
+    #: Number of links between the artifacts of this revision and the series, maintained
+    #: by the signals. The revision is not referenced by any series if this is 0.
+    nb_series_references = models.IntegerField(default=0, editable=False)
+
+    objects = RevisionQuerySet.as_manager()
+
     def __str__(self):
         return "[%s] %s" % (self.project.name, self.revision)
 
+    def is_referenced(self):
+        """Returns True if at least one series references an artifact of this revision.
+
+        The counter is read from the database as the signals update it there."""
+        return Revision.objects.filter(pk=self.pk, nb_series_references__gt=0).exists()
+
     def get_all_referencing_series(self):
-        list_of_series = []
-        for artifact in self.artifacts.all():
-            list_of_series += artifact.project_series.all()
-        return list(set(list_of_series))
+        return list(ProjectSeries.objects.filter(artifacts__revision=self).distinct())
 
     def get_absolute_url(self):
         return reverse(
             "project_revision",
-            kwargs={"project_id": self.project.pk, "revision_id": self.id},
+            kwargs={"project_id": self.project_id, "revision_id": self.id},
         )
 
     class Meta:
@@ -47,14 +136,20 @@ class Revision(models.Model):
         """Returns true if the user has view permission on this revision, False otherwise"""
 
         # Access to one of the series grants access to the revision
-        series_access = False
-        for series in self.get_all_referencing_series():
-            if series.has_user_series_view_permission(userobj):
-                series_access = True
-                break
-
-        return series_access or self.project.has_user_project_administrate_permission(
-            userobj
+        return (
+            userobj.is_superuser
+            or Revision.objects.filter(pk=self.pk).visible_to(userobj).exists()
+        )
+
+
+class BranchQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Returns the branches containing at least one revision that the user is
+        allowed to view"""
+        return self.filter(
+            pk__in=Branch.revisions.through.objects.filter(
+                revision__in=Revision.objects.visible_to(user)
+            ).values("branch")
         )
 
 
@@ -73,3 +168,5 @@ class Branch(models.Model):
         null=True,
     )
     revisions = models.ManyToManyField(Revision, related_name="branches")
+
+    objects = BranchQuerySet.as_manager()
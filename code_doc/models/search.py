@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.db import models, transaction
+from django.db.models import Case, F, IntegerField, Min, Value, When
+
+from ..utils.search import get_words, get_prefix_range, compute_search_tokens
+
+
+class SearchTokenQuerySet(models.QuerySet):
+    def starting_with(self, prefix):
+        """Returns the tokens starting with prefix"""
+        lower, upper = get_prefix_range(prefix)
+        return self.filter(token__gte=lower, token__lt=upper)
+
+    def search(self, term, limit):
+        """Returns the names of the owners of the tokens matching all the words of term,
+        at most limit of them.
+
+        The owners are ranked on their best token matching the first word: the exact
+        names first, then the names starting with the word, then the exact and
+        starting other values (eg. first name of a user), the ties being ordered by
+        name.
+        """
+        words = get_words(term)
+        if not words:
+            return []
+
+        tokens = self.starting_with(words[0])
+        for word in words[1:]:
+            tokens = tokens.filter(owner__in=self.starting_with(word).values("owner"))
+
+        name = "owner__" + self.model.name_field
+        rows = (
+            tokens.values(name)
+            .annotate(
+                rank=Min(
+                    F("weight") * 2
+                    + Case(
+                        When(token=words[0], then=Value(0)),
+                        default=Value(1),
+                        output_field=IntegerField(),
+                    )
+                )
+            )
+            .order_by("rank", name)
+            .values_list(name, flat=True)
+        )
+        return list(rows[:limit])
+
+    def update_for(self, owners=None):
+        """Recomputes the tokens of the owners (an iterable or a queryset of ids), of
+        all the owners if None"""
+        owner_model = self.model._meta.get_field("owner").related_model
+
+        with transaction.atomic():
+            rows = self.all()
+            owner_objects = owner_model.objects.all()
+            if owners is not None:
+                owners = list(owners)
+                rows = rows.filter(owner__in=owners)
+                owner_objects = owner_objects.filter(pk__in=owners)
+            rows.delete()
+
+            new_tokens = compute_search_tokens(
+                owner_objects, self.model.searched_fields
+            )
+            self.bulk_create(
+                self.model(owner_id=owner_id, token=token, weight=weight)
+                for (owner_id, token), weight in new_tokens.items()
+            )
+
+        return len(new_tokens)
+
+    def rebuild(self):
+        """Recomputes the whole table"""
+        return self.update_for()
+
+
+class SearchToken(models.Model):
+    """A token of a searched value of an object, see :py:mod:`code_doc.utils.search`.
+
+    The tables of tokens are maintained by the signals, see
+    :py:mod:`code_doc.signals.search_handlers`. They can be rebuilt with the
+    ``rebuild_search_index`` command.
+    """
+
+    token = models.CharField(max_length=100, db_index=True)
+
+    #: the importance of the searched value, 0 for the name of the object
+    weight = models.PositiveSmallIntegerField(default=0)
+
+    #: the field of the owners returned by the searches
+    name_field = None
+
+    #: the searched fields of the owners and their weights
+    searched_fields = ()
+
+    objects = SearchTokenQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return "[%s] %s" % (self.owner_id, self.token)
+
+
+class UserSearchToken(SearchToken):
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="search_tokens"
+    )
+
+    name_field = "username"
+    searched_fields = (("username", 0), ("first_name", 1), ("last_name", 1))
+
+    class Meta:
+        unique_together = (("owner", "token"),)
+
+
+class GroupSearchToken(SearchToken):
+    owner = models.ForeignKey(
+        Group, on_delete=models.CASCADE, related_name="search_tokens"
+    )
+
+    name_field = "name"
+    searched_fields = (("name", 0),)
+
+    class Meta:
+        unique_together = (("owner", "token"),)
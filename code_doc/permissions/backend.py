@@ -2,6 +2,8 @@ from __future__ import unicode_literals
 
 import logging
 
+from . import cache
+
 _project_permission_prefix = "code_doc"
 
 # logger for this file
@@ -30,14 +32,32 @@ class CodedocPermissionBackend(object):
         if perm not in self.objects_permission_handlers[type(obj)]:
             return False
 
-        func = getattr(obj, get_permission_handler_name(perm.split(".")[1]))
-        assert func is not None
+        # the decisions are memoized for the duration of the request
+        current_cache = cache.get_cache()
+        if current_cache is not None:
+            key = cache.get_decision_key(user, perm, obj)
+            if key in current_cache.decisions:
+                return current_cache.decisions[key]
+
+        # then in the cache shared between the requests
+        shared_key = cache.get_shared_key(user, perm, obj)
+        decision = None
+        if shared_key is not None:
+            decision = cache.get_shared_decision(shared_key)
+
+        if decision is None:
+            func = getattr(obj, get_permission_handler_name(perm.split(".")[1]))
+            assert func is not None
+
+            # returning False will continue the iteration over the permission backends
+            decision = bool(func(user))
 
-        if func(user):
-            return True
+            if shared_key is not None:
+                cache.set_shared_decision(shared_key, decision)
 
-        # returning False will continue the iteration over the permission backends
-        return False
+        if current_cache is not None:
+            current_cache.decisions[key] = decision
+        return decision
         # raise PermissionDenied
 
     def _populate_permissions(self, user, obj):
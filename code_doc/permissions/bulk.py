@@ -0,0 +1,124 @@
+"""Evaluation of the permissions of a user on many objects at once.
+
+:py:func:`permissions_for` computes a :py:class:`PermissionMatrix` with one query per
+permission and type of object, using the batch filters of the querysets (eg.
+:py:meth:`ProjectSeriesQuerySet.visible_to
+<code_doc.models.projects.ProjectSeriesQuerySet.visible_to>`). The views compute the
+matrix once and pass it to the templates under the ``permissions`` context variable,
+the template tags falling back to the permission methods of the objects for the
+decisions that are not in the matrix.
+"""
+
+from . import cache
+
+import logging
+
+# logger for this file
+logger = logging.getLogger(__name__)
+
+
+def _get_batch_filters():
+    """Returns the queryset methods filtering the objects on which a user has a
+    permission, as a dictionary ``{(model, permission): method name}``"""
+    from ..models.projects import Project, ProjectSeries
+    from ..models.revisions import Revision
+    from ..models.authors import Author
+
+    return {
+        (Project, "code_doc.project_administrate"): "administrated_by",
+        (Project, "code_doc.project_series_add"): "administrated_by",
+        (Project, "code_doc.project_series_delete"): "administrated_by",
+        (Project, "code_doc.project_artifact_add"): "administrated_by",
+        (ProjectSeries, "code_doc.series_view"): "visible_to",
+        (ProjectSeries, "code_doc.series_edit"): "editable_by",
+        (ProjectSeries, "code_doc.series_artifact_add"): "artifact_addable_by",
+        (ProjectSeries, "code_doc.series_artifact_delete"): "artifact_deletable_by",
+        (Revision, "code_doc.revision_view"): "visible_to",
+        (Author, "code_doc.author_edit"): "editable_by",
+    }
+
+
+class PermissionMatrix(object):
+    """The decisions of the permissions of a user on a set of objects"""
+
+    def __init__(self, user):
+        self.user = user
+        self.decisions = {}
+
+    @staticmethod
+    def _get_key(obj, perm):
+        return type(obj), obj.pk, perm
+
+    def set(self, obj, perm, decision):
+        self.decisions[self._get_key(obj, perm)] = decision
+
+    def get(self, obj, perm):
+        """Returns the decision for the permission perm on obj, None if it has not
+        been computed"""
+        return self.decisions.get(self._get_key(obj, perm))
+
+    def has_perm(self, obj, perm, fallback):
+        """Returns the decision for the permission perm on obj, calls fallback (the
+        permission method of obj) if the decision has not been computed"""
+        decision = self.get(obj, perm)
+        if decision is None:
+            return fallback(self.user)
+        return decision
+
+
+def permissions_for(user, objects, perms):
+    """Computes the permissions of the user on the objects
+
+    :param user: the user
+    :param objects: the objects, possibly of different types
+    :param perms: the permissions to evaluate, with the application prefix (eg.
+      ``"code_doc.series_view"``). The permissions that do not exist for a type
+      of object are ignored
+    :returns: a :py:class:`PermissionMatrix`
+
+    The decisions are also stored in the permission cache of the request (if any),
+    making the later calls to ``user.has_perm`` dictionary lookups.
+    """
+    from .backend import CodedocPermissionBackend
+
+    matrix = PermissionMatrix(user)
+    batch_filters = _get_batch_filters()
+    handlers = CodedocPermissionBackend.objects_permission_handlers
+
+    objects_per_type = {}
+    for obj in objects:
+        objects_per_type.setdefault(type(obj), {})[obj.pk] = obj
+
+    for model, current_objects in objects_per_type.items():
+        for perm in perms:
+            if perm not in handlers.get(model, ()):
+                continue
+
+            batch_filter = batch_filters.get((model, perm))
+            if batch_filter is None:
+                for obj in current_objects.values():
+                    matrix.set(obj, perm, user.has_perm(perm, obj))
+                continue
+
+            granted = set(
+                getattr(
+                    model.objects.filter(pk__in=list(current_objects)), batch_filter
+                )(user).values_list("pk", flat=True)
+            )
+            for pk, obj in current_objects.items():
+                matrix.set(obj, perm, pk in granted)
+
+    current_cache = cache.get_cache()
+    if current_cache is not None:
+        for current_objects in objects_per_type.values():
+            for obj in current_objects.values():
+                for perm in perms:
+                    decision = matrix.get(obj, perm)
+                    if decision is not None:
+                        key = cache.get_decision_key(user, perm, obj)
+                        current_cache.decisions[key] = decision
+
+    logger.debug(
+        "[permissions] %d decisions computed for %s", len(matrix.decisions), user
+    )
+    return matrix
@@ -0,0 +1,149 @@
+"""Request scoped cache of the permission decisions.
+
+The cache is activated by :py:class:`PermissionCacheMiddleware
+<code_doc.permissions.middleware.PermissionCacheMiddleware>` for the duration of a
+request, and is otherwise inactive: outside of a request (management commands,
+tests manipulating the models directly) every check hits the database.
+
+The cache stores
+
+* the decisions of the permission backend, keyed by ``(user, permission, object)``,
+* the ids of the projects administrated by a user, fetched once per request.
+
+The cache is cleared whenever one of the relations defining the permissions changes,
+see :py:mod:`code_doc.signals.permission_handlers`.
+
+The decisions on the projects and the series can also be stored in a cache shared
+between the requests and the processes, configured by the ``CODEDOC_PERMISSION_CACHE``
+setting (see :py:mod:`code_doc.utils.cache`). Its entries depend on the versions of
+the user, the project and the series, bumped by the same signal handlers.
+"""
+
+import threading
+
+from ..utils import cache as shared_cache
+
+#: the setting containing the alias of the shared cache of the permissions
+PERMISSION_CACHE_SETTING = "CODEDOC_PERMISSION_CACHE"
+
+_local = threading.local()
+
+
+class PermissionCache(object):
+    """Storage for the permissions computed during a request"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.decisions = {}
+        self.administrated_project_ids = {}
+
+
+def activate():
+    """Activates the cache for the current thread"""
+    _local.cache = PermissionCache()
+
+
+def deactivate():
+    """Deactivates the cache for the current thread"""
+    _local.cache = None
+
+
+def get_cache():
+    """Returns the active cache of the current thread, None if not active"""
+    return getattr(_local, "cache", None)
+
+
+def clear():
+    """Empties the active cache (if any)"""
+    cache = get_cache()
+    if cache is not None:
+        cache.clear()
+
+
+def get_decision_key(user, perm, obj):
+    return user.pk, perm, type(obj), obj.pk
+
+
+def get_user_administrated_project_ids(user):
+    """Returns the set of ids of the projects administrated by the user"""
+    from ..models.projects import Project
+
+    if user.pk is None:
+        return set()
+
+    def fetch():
+        return set(
+            Project.objects.filter(administrators=user).values_list("id", flat=True)
+        )
+
+    cache = get_cache()
+    if cache is None:
+        return fetch()
+
+    if user.pk not in cache.administrated_project_ids:
+        cache.administrated_project_ids[user.pk] = fetch()
+    return cache.administrated_project_ids[user.pk]
+
+
+def _get_version_scopes(user, obj):
+    """Returns the objects on which the permissions of the user on obj depend, None if
+    the permissions on obj are not stored in the shared cache"""
+    from ..models.projects import Project, ProjectSeries
+
+    if isinstance(obj, ProjectSeries):
+        scopes = [("series", obj.pk), ("project", obj.project_id)]
+    elif isinstance(obj, Project):
+        scopes = [("project", obj.pk)]
+    else:
+        return None
+
+    return scopes + [("user", user.pk)]
+
+
+def get_shared_key(user, perm, obj):
+    """Returns the key of the decision in the shared cache, None if the shared cache is
+    not used for this decision"""
+    cache = shared_cache.get_shared_cache(PERMISSION_CACHE_SETTING)
+    if cache is None:
+        return None
+
+    scopes = _get_version_scopes(user, obj)
+    if scopes is None:
+        return None
+
+    versions = shared_cache.get_versions(cache, scopes)
+    return "code_doc:permission:%s:%s:%s:%s:%s" % (
+        user.pk,
+        perm,
+        type(obj).__name__,
+        obj.pk,
+        ":".join(str(version) for version in versions),
+    )
+
+
+def get_shared_decision(key):
+    """Returns the decision stored in the shared cache, None if not available"""
+    decision = shared_cache.get_shared_cache(PERMISSION_CACHE_SETTING).get(key)
+    shared_cache.record_access("permissions", decision is not None)
+    return decision
+
+
+def set_shared_decision(key, decision):
+    shared_cache.get_shared_cache(PERMISSION_CACHE_SETTING).set(key, decision, None)
+
+
+def invalidate_shared(series=(), projects=(), users=()):
+    """Invalidates the decisions of the shared cache depending on the objects
+
+    :param series: ids of the series
+    :param projects: ids of the projects
+    :param users: ids of the users
+    """
+    shared_cache.bump_versions(
+        PERMISSION_CACHE_SETTING,
+        [("series", pk) for pk in series]
+        + [("project", pk) for pk in projects]
+        + [("user", pk) for pk in users],
+    )
@@ -0,0 +1,17 @@
+from django.utils.deprecation import MiddlewareMixin
+
+from . import cache
+
+
+class PermissionCacheMiddleware(MiddlewareMixin):
+    """Activates the permission cache for the duration of a request"""
+
+    def process_request(self, request):
+        cache.activate()
+
+    def process_response(self, request, response):
+        cache.deactivate()
+        return response
+
+    def process_exception(self, request, exception):
+        cache.deactivate()
@@ -0,0 +1,44 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from ..models.authors import Author, get_avatar_color, get_gravatar_hash
+from ..utils.thumbnails import generate_thumbnails, delete_thumbnails
+
+
+@receiver(pre_save, sender=Author)
+def callback_author_pre_save(sender, instance, raw, **kwargs):
+    """Computes the avatar details of the author, and stores the previous image for
+    updating the thumbnails"""
+    instance.avatar_color = get_avatar_color(instance.firstname + instance.lastname)
+    instance.gravatar_hash = get_gravatar_hash(instance.gravatar_email)
+
+    instance._previous_image = None
+    if not raw and instance.pk is not None:
+        instance._previous_image = (
+            Author.objects.filter(pk=instance.pk)
+            .values_list("image", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Author)
+def callback_author_image_changed(sender, instance, raw, **kwargs):
+    """Generates the thumbnails of a new image"""
+    if raw:
+        return
+
+    previous_image = getattr(instance, "_previous_image", None) or None
+    current_image = instance.image.name or None
+    if previous_image == current_image:
+        return
+
+    if previous_image is not None:
+        delete_thumbnails(previous_image)
+    if current_image is not None:
+        generate_thumbnails(current_image)
+
+
+@receiver(post_delete, sender=Author)
+def callback_author_image_deleted(sender, instance, **kwargs):
+    if instance.image:
+        delete_thumbnails(instance.image.name)
@@ -0,0 +1,113 @@
+"""Invalidates the cached fragments of the templates (see
+:py:mod:`code_doc.utils.fragment_cache`) when the objects they display change."""
+
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from ..models.models import Topic, Copyright, CopyrightHolder
+from ..models.authors import Author
+from ..models.projects import Project, ProjectSeries, ProjectRepository
+from ..models.revisions import Revision
+from ..models.artifacts import Artifact
+from ..utils import fragment_cache
+
+
+def _get_dependencies(instance):
+    """Returns the ``(model name, pk)`` of the objects whose fragments display
+    instance"""
+    dependencies = [(instance._meta.model_name, instance.pk)]
+    if isinstance(instance, (ProjectSeries, ProjectRepository, Revision, Artifact)):
+        dependencies.append(("project", instance.project_id))
+    if isinstance(instance, Artifact):
+        dependencies.append(("revision", instance.revision_id))
+    return dependencies
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=ProjectSeries)
+@receiver(post_save, sender=ProjectRepository)
+@receiver(post_save, sender=Revision)
+@receiver(post_save, sender=Artifact)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Topic)
+@receiver(post_save, sender=Copyright)
+@receiver(post_save, sender=CopyrightHolder)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=ProjectSeries)
+@receiver(post_delete, sender=ProjectRepository)
+@receiver(post_delete, sender=Revision)
+@receiver(post_delete, sender=Artifact)
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Topic)
+@receiver(post_delete, sender=Copyright)
+@receiver(post_delete, sender=CopyrightHolder)
+def callback_invalidate_fragments(sender, instance, **kwargs):
+    fragment_cache.invalidate(_get_dependencies(instance))
+
+
+def callback_project_relation_changed(sender, instance, action, reverse, **kwargs):
+    """The authors, topics, administrators and copyright holders are displayed with
+    the projects"""
+    if not action.startswith("post_") or not fragment_cache.is_enabled():
+        return
+
+    if not reverse:
+        dependencies = [("project", instance.pk)]
+    elif kwargs["pk_set"] is not None:
+        dependencies = [("project", pk) for pk in kwargs["pk_set"]]
+    else:
+        # clear of the projects of an object, they are not known anymore
+        dependencies = [
+            ("project", pk) for pk in Project.objects.values_list("pk", flat=True)
+        ]
+    if reverse:
+        dependencies.append((instance._meta.model_name, instance.pk))
+    fragment_cache.invalidate(dependencies)
+
+
+for relation in ("authors", "topics", "administrators", "copyright_holder"):
+    m2m_changed.connect(
+        callback_project_relation_changed, sender=getattr(Project, relation).through
+    )
+
+
+@receiver(m2m_changed, sender=Artifact.project_series.through)
+def callback_series_artifacts_changed(sender, instance, action, reverse, **kwargs):
+    """The number of artifacts and the last update of the series are displayed in the
+    page of the project"""
+    if not action.startswith("post_") or not fragment_cache.is_enabled():
+        return
+
+    series = [instance.pk] if reverse else kwargs["pk_set"]
+    if series is None:
+        # clear from an artifact, the series are not known anymore
+        series = [fragment_cache.ALL_OBJECTS]
+    fragment_cache.invalidate(
+        [("projectseries", pk) for pk in series] + [("project", instance.project_id)]
+    )
+
+
+def invalidate_access_rights(series=None, users=None, projects=()):
+    """Invalidates the fragments depending on the access rights of the users, see
+    :py:func:`permissions_changed
+    <code_doc.signals.permission_handlers.permissions_changed>`"""
+    if not fragment_cache.is_enabled():
+        return
+
+    dependencies = [("project", pk) for pk in projects]
+    if series is not None:
+        dependencies += [("projectseries", pk) for pk in series]
+        dependencies += [
+            ("project", pk)
+            for pk in ProjectSeries.objects.filter(pk__in=series)
+            .values_list("project_id", flat=True)
+            .distinct()
+        ]
+    if users is not None:
+        dependencies += [("user", pk) for pk in users]
+    if series is None and users is None:
+        dependencies += [
+            ("project", pk) for pk in Project.objects.values_list("pk", flat=True)
+        ]
+
+    fragment_cache.invalidate(dependencies)
@@ -0,0 +1,178 @@
+"""Maintains the materialized access rights of the series (:py:class:`SeriesAccess
+<code_doc.models.projects.SeriesAccess>`) and invalidates the cached permissions (of
+the request and shared) and fragments when one of the relations defining the
+permissions changes."""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import (
+    pre_save,
+    post_save,
+    pre_delete,
+    post_delete,
+    m2m_changed,
+)
+from django.dispatch import receiver
+
+from ..models.projects import Project, ProjectSeries, SeriesAccess
+from ..permissions import cache
+from .cache_handlers import invalidate_access_rights
+
+import logging
+
+# logger for this file
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+#: the fields of the users on which their rights depend
+USER_STATUS_FIELDS = ("is_active", "is_superuser")
+
+
+def clear_permission_cache(sender, **kwargs):
+    """Invalidates the permissions computed during the current request"""
+    cache.clear()
+
+
+def _get_group_users(group_ids):
+    return list(User.objects.filter(groups__in=group_ids).values_list("pk", flat=True))
+
+
+def permissions_changed(series=None, users=None, projects=()):
+    """Updates the access rights and invalidates the cached permissions
+
+    :param series: the ids of the series whose permissions changed
+    :param users: the ids of the users whose permissions changed
+    :param projects: the ids of the projects whose permissions changed
+    """
+    cache.clear()
+    if series is not None:
+        series = list(series)
+    if users is not None:
+        users = list(users)
+
+    SeriesAccess.objects.update_for(series=series, users=users)
+    cache.invalidate_shared(series=series or (), users=users or (), projects=projects)
+    invalidate_access_rights(series=series, users=users, projects=projects)
+
+
+def callback_series_permissions_changed(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    """Updates the access rights after a change of the permission relations of a series"""
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        permissions_changed(series=[instance.pk])
+    elif isinstance(instance, Group):
+        permissions_changed(users=_get_group_users([instance.pk]))
+    else:
+        permissions_changed(users=[instance.pk])
+
+
+for relation in ProjectSeries.permission_relations:
+    m2m_changed.connect(
+        callback_series_permissions_changed,
+        sender=getattr(ProjectSeries, relation).through,
+    )
+
+
+@receiver(m2m_changed, sender=Project.administrators.through)
+def callback_project_administrators_changed(
+    sender, instance, action, reverse, **kwargs
+):
+    """Updates the access rights after a change of the administrators of a project"""
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        permissions_changed(
+            series=instance.series.values_list("pk", flat=True), projects=[instance.pk]
+        )
+    else:
+        permissions_changed(users=[instance.pk])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def callback_user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Updates the access rights after a change of the groups of a user"""
+    if reverse and action == "pre_clear":
+        # the members of the group are not available after the clear
+        instance._access_users = _get_group_users([instance.pk])
+        return
+
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        permissions_changed(users=[instance.pk])
+    elif action == "post_clear":
+        permissions_changed(users=instance._access_users)
+    else:
+        permissions_changed(users=pk_set)
+
+
+@receiver(post_save, sender=ProjectSeries)
+def callback_series_saved(sender, instance, raw, **kwargs):
+    """Grants the rights of the project administrators on a series, the visibility of
+    the series may also have changed"""
+    if not raw:
+        permissions_changed(series=[instance.pk])
+
+
+def _get_user_status(user):
+    return tuple(getattr(user, field) for field in USER_STATUS_FIELDS)
+
+
+@receiver(pre_save, sender=User)
+def callback_user_pre_save(sender, instance, raw, update_fields, **kwargs):
+    """Stores the status of the user before the save, the frequent saves of the other
+    fields (eg. ``last_login``) do not change the rights"""
+    instance._previous_status = None
+    if raw or instance.pk is None:
+        return
+
+    if update_fields is not None and not set(update_fields) & set(USER_STATUS_FIELDS):
+        instance._previous_status = _get_user_status(instance)
+        return
+
+    instance._previous_status = (
+        User.objects.filter(pk=instance.pk).values_list(*USER_STATUS_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def callback_user_saved(sender, instance, created, raw, **kwargs):
+    """The rights given by the permissions of the series depend on the user status"""
+    if created or raw:
+        return
+
+    if getattr(instance, "_previous_status", None) == _get_user_status(instance):
+        return
+
+    permissions_changed(users=[instance.pk])
+
+
+@receiver(pre_delete, sender=Group)
+def callback_group_delete(sender, instance, **kwargs):
+    # the memberships are deleted without sending m2m_changed
+    instance._access_users = _get_group_users([instance.pk])
+
+
+@receiver(post_delete, sender=Group)
+def callback_group_deleted(sender, instance, **kwargs):
+    permissions_changed(users=instance._access_users)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def callback_project_changed(sender, instance, **kwargs):
+    clear_permission_cache(sender)
+    cache.invalidate_shared(projects=[instance.pk])
+
+
+@receiver(post_delete, sender=ProjectSeries)
+def callback_series_deleted(sender, instance, **kwargs):
+    clear_permission_cache(sender)
+    cache.invalidate_shared(series=[instance.pk])
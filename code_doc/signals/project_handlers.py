@@ -1,10 +1,80 @@
-from django.db.models.signals import pre_save
+from django.core.files.images import get_image_dimensions
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
-from ..models.projects import ProjectRepository
+from ..models.models import Topic
+from ..models.projects import Project, ProjectSeries, ProjectRepository
+from ..utils.markdown_rendering import render_markdown
+from ..utils.thumbnails import generate_thumbnails, delete_thumbnails
+
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(pre_save, sender=ProjectRepository)
 def repository_cleanup_url(sender, instance, **kwargs):
     """Cleans up the URL of the repository prior to saving"""
     instance.code_source_url = instance.code_source_url.strip()
+
+
+@receiver(pre_save, sender=Project)
+def callback_project_icon_pre_save(sender, instance, raw, **kwargs):
+    """Stores the dimensions of a new icon, and the previous icon of the project for
+    updating the thumbnails"""
+    instance._previous_icon = None
+    if raw:
+        return
+
+    if instance.pk is not None:
+        instance._previous_icon = (
+            Project.objects.filter(pk=instance.pk)
+            .values_list("icon", flat=True)
+            .first()
+        )
+
+    if not instance.icon:
+        instance.icon_width = instance.icon_height = None
+    elif instance.icon.name != instance._previous_icon or instance.icon_width is None:
+        try:
+            instance.icon_width, instance.icon_height = get_image_dimensions(
+                instance.icon
+            )
+        except (IOError, OSError) as e:
+            logger.error(
+                "[project icon] cannot read the icon of %s: %s", instance.name, e
+            )
+            instance.icon_width = instance.icon_height = None
+
+
+@receiver(post_save, sender=Project)
+def callback_project_icon_changed(sender, instance, raw, **kwargs):
+    """Generates the thumbnails of a new icon"""
+    if raw:
+        return
+
+    previous_icon = getattr(instance, "_previous_icon", None) or None
+    current_icon = instance.icon.name or None
+    if previous_icon == current_icon:
+        return
+
+    if previous_icon is not None:
+        delete_thumbnails(previous_icon)
+    if current_icon is not None:
+        generate_thumbnails(current_icon)
+
+
+@receiver(post_delete, sender=Project)
+def callback_project_icon_deleted(sender, instance, **kwargs):
+    if instance.icon:
+        delete_thumbnails(instance.icon.name)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=ProjectSeries)
+@receiver(post_save, sender=Topic)
+def callback_description_changed(sender, instance, raw, **kwargs):
+    """Renders the description in advance, for populating the cache of the rendered
+    Markdown"""
+    if not raw and instance.description_mk:
+        render_markdown(instance.description_mk)
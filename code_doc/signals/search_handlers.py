@@ -0,0 +1,40 @@
+"""Maintains the search tokens of the users and groups (see
+:py:mod:`code_doc.utils.search`) and invalidates the cached search results when they
+change."""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models.search import UserSearchToken, GroupSearchToken
+from ..utils import search
+
+User = get_user_model()
+
+
+def _update_tokens(token_model, instance, update_fields):
+    searched_fields = set(field for field, _ in token_model.searched_fields)
+    if update_fields is not None and not searched_fields.intersection(update_fields):
+        # eg. the last login of a user
+        return
+
+    token_model.objects.update_for([instance.pk])
+    search.invalidate(token_model)
+
+
+@receiver(post_save, sender=User)
+def callback_user_search_tokens(sender, instance, update_fields=None, **kwargs):
+    _update_tokens(UserSearchToken, instance, update_fields)
+
+
+@receiver(post_save, sender=Group)
+def callback_group_search_tokens(sender, instance, update_fields=None, **kwargs):
+    _update_tokens(GroupSearchToken, instance, update_fields)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+def callback_search_owner_deleted(sender, instance, **kwargs):
+    # the tokens are deleted in cascade
+    search.invalidate(UserSearchToken if sender is User else GroupSearchToken)
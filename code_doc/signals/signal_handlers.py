@@ -6,13 +6,15 @@ from django.db.models.signals import (
     post_delete,
     m2m_changed,
 )
+from django.db.models import Count, Min
 from django.dispatch import receiver
 
 from django.conf import settings
 
 from ..models.authors import Author
-from ..models.projects import ProjectSeries
-from ..models.revisions import Revision
+from ..models.models import Copyright, CopyrightHolder
+from ..models.projects import Project, ProjectSeries, ProjectRepository
+from ..models.revisions import Revision, Branch
 from ..models.artifacts import Artifact, get_deflation_directory
 
 import logging
@@ -58,6 +60,24 @@ def linkToAuthor(sender, **kwargs):
             user_instance.save()
 
 
+def _count_series_references_per_revision(links):
+    """Returns the number of artifact/series links per revision, as a dictionary
+    {revision id: number of links}
+
+    :param links: a queryset over Artifact.project_series.through
+    """
+    return dict(
+        links.filter(artifact__revision__isnull=False)
+        .order_by()
+        .values_list("artifact__revision")
+        .annotate(nb_links=Count("pk"))
+    )
+
+
+def _negate(deltas):
+    return dict((pk, -delta) for pk, delta in deltas.items())
+
+
 @receiver(m2m_changed, sender=Artifact.project_series.through)
 def callback_check_revision_references(sender, action, reverse, instance, **kwargs):
     """If an artifact is removed from a series, we have to check if the
@@ -65,6 +85,11 @@ def callback_check_revision_references(sender, action, reverse, instance, **kwar
 
        If an artifact is added to a series, a revision is implicitely "added" to
        to this series
+
+       The number of series references of the revisions is updated accordingly.
+
+       All the artifacts/series of the change are processed together, the number of
+       queries does not depend on the size of pk_set.
     """
 
     logger.debug("[signal artifact-serie] m2m_changed / artifact %s", instance)
@@ -78,32 +103,44 @@ def callback_check_revision_references(sender, action, reverse, instance, **kwar
         # modified series.artifact.
         if action == "pre_add":
             # checking integrity for all added artifacts
-            proj = project_series.project
-            for pk in changed_artifacts_pks:
-                artifact = Artifact.objects.get(pk=pk)
-                if artifact.project != proj:
-                    raise IntegrityError
+            if (
+                Artifact.objects.filter(pk__in=changed_artifacts_pks)
+                .exclude(project_id=project_series.project_id)
+                .exists()
+            ):
+                raise IntegrityError
+
+        elif action in ("pre_remove", "pre_clear"):
+            # the links are counted before their removal, pk_set may contain
+            # artifacts that do not belong to the series
+            links = sender.objects.filter(projectseries=project_series)
+            if changed_artifacts_pks is not None:
+                links = links.filter(artifact__in=changed_artifacts_pks)
+            Revision.objects.add_to_counter(
+                "nb_series_references",
+                _negate(_count_series_references_per_revision(links)),
+            )
 
         elif action == "post_remove":
             # Removing artifacts: we have to check if the
-            # revision is still referenced.
-            for pk in changed_artifacts_pks:
-                artifact = Artifact.objects.get(pk=pk)
-                artifact_revision = artifact.revision
-
-                if (
-                    artifact_revision
-                    and len(artifact_revision.get_all_referencing_series()) == 0
-                ):
-                    artifact_revision.delete()
-
-                if artifact.project_series.count() == 0:
-                    artifact.delete()
+            # revisions are still referenced.
+            removed_artifacts = Artifact.objects.in_bulk(list(changed_artifacts_pks))
+            cleanup_unreferenced_artifacts(removed_artifacts.values())
 
         elif action == "post_add":
-            for pk in changed_artifacts_pks:
-                artifact = Artifact.objects.get(pk=pk)
-                limits_artifact_numbers(artifact)
+            references = _count_series_references_per_revision(
+                sender.objects.filter(
+                    projectseries=project_series, artifact__in=changed_artifacts_pks
+                )
+            )
+            Revision.objects.add_to_counter("nb_series_references", references)
+
+            nb_with_revision = sum(references.values())
+            limits_series_artifact_numbers(
+                project_series,
+                with_revision=nb_with_revision > 0,
+                without_revision=nb_with_revision < len(changed_artifacts_pks),
+            )
 
     else:
         # We modified the forward relationship which means we
@@ -113,25 +150,81 @@ def callback_check_revision_references(sender, action, reverse, instance, **kwar
         if action == "pre_add":
             # We want to add a Series to an Artifact, we need to check that
             # this Series belongs to the same Project that the Artifact does
-            proj = artifact.project
-            added_series_pks = kwargs["pk_set"]
-            for pk in added_series_pks:
-                series = ProjectSeries.objects.get(pk=pk)
-                if series.project != proj:
-                    raise IntegrityError
+            if (
+                ProjectSeries.objects.filter(pk__in=kwargs["pk_set"])
+                .exclude(project_id=artifact.project_id)
+                .exists()
+            ):
+                raise IntegrityError
+
+        elif action in ("pre_remove", "pre_clear"):
+            if artifact.revision_id is not None:
+                links = sender.objects.filter(artifact=artifact)
+                if kwargs["pk_set"] is not None:
+                    links = links.filter(projectseries__in=kwargs["pk_set"])
+                Revision.objects.add_to_counter(
+                    "nb_series_references", {artifact.revision_id: -links.count()}
+                )
 
         elif action == "post_add":
-            limits_artifact_numbers(artifact)
+            if artifact.revision_id is not None:
+                Revision.objects.add_to_counter(
+                    "nb_series_references",
+                    {artifact.revision_id: len(kwargs["pk_set"])},
+                )
+
+            for serie in ProjectSeries.objects.filter(
+                pk__in=kwargs["pk_set"]
+            ).select_related("project"):
+                limits_series_artifact_numbers(
+                    serie,
+                    with_revision=artifact.revision_id is not None,
+                    without_revision=artifact.revision_id is None,
+                )
 
         elif action == "post_remove":
             # clean up revision if it does not contain any artifact
             # only in case of the deletion of an artifact
-            revision = artifact.revision
-            if revision and len(revision.get_all_referencing_series()) == 0:
-                revision.delete()
+            cleanup_unreferenced_artifacts([artifact])
+
 
-            if artifact.project_series.count() == 0:
-                artifact.delete()
+def cleanup_unreferenced_artifacts(artifacts):
+    """Deletes the revisions that are not referenced by any series anymore, and
+    the artifacts that do not belong to any series.
+
+    :param artifacts: the artifacts that have been removed from some series
+    """
+    artifacts_pks = [artifact.pk for artifact in artifacts]
+    revisions_pks = set(
+        artifact.revision_id for artifact in artifacts if artifact.revision_id
+    )
+
+    # deleting a revision also deletes its artifacts
+    if revisions_pks:
+        Revision.objects.filter(
+            pk__in=revisions_pks, nb_series_references__lte=0
+        ).delete()
+
+    for artifact in (
+        Artifact.objects.filter(pk__in=artifacts_pks)
+        .annotate(nb_series=Count("project_series"))
+        .filter(nb_series=0)
+    ):
+        artifact.delete()
+
+
+@receiver(pre_delete, sender=ProjectSeries)
+def callback_series_revision_references(sender, instance, using, **kwargs):
+    """The links between the deleted series and its artifacts are removed without
+    m2m_changed signal, the revision counters are updated here"""
+    Revision.objects.add_to_counter(
+        "nb_series_references",
+        _negate(
+            _count_series_references_per_revision(
+                Artifact.project_series.through.objects.filter(projectseries=instance)
+            )
+        ),
+    )
 
 
 # Relation between Branches and Revisions
@@ -199,98 +292,54 @@ def enforce_revision_limit_for_branch(branch):
         branch.revisions.remove(revision_to_remove)
 
 
-def limits_artifact_numbers(artifact):
-    """Contains the logic for removing the revisions from series or branches
-    when their respective limit is reached"""
-
-    # logger.debug('[signals.limits_artifact_numbers] artifact %s', artifact)
-
-    project = artifact.project
-    proj_nb_revisions_to_keep = project.nb_revisions_to_keep
-
-    if artifact.revision is not None:
-        # we are in the mode where we limit the revisions
-
-        for serie in artifact.project_series.all():
-
-            # these two numbers serve the same purpose
-            if (
-                serie.nb_revisions_to_keep is not None
-                or proj_nb_revisions_to_keep is not None
-            ):
-
-                nb_revisions_limit = (
-                    serie.nb_revisions_to_keep
-                    if serie.nb_revisions_to_keep is not None
-                    else proj_nb_revisions_to_keep
-                )
-
-                if nb_revisions_limit > 0:
-                    # get all revisions of this serie
-                    all_artifacts = Artifact.objects.filter(project_series=serie)
+def limits_series_artifact_numbers(serie, with_revision, without_revision):
+    """Removes the oldest revisions or artifacts of a series when its limit is reached.
 
-                    # we do not delete our own revision
-                    all_serie_revision = (
-                        Revision.objects.filter(artifacts__in=all_artifacts)
-                        .distinct()
-                        .order_by("commit_time")
-                    )
+    :param with_revision: if True, the number of revisions of the series is limited
+    :param without_revision: if True, the number of artifacts of the series is limited
+      (artifacts without revision are considered on their own revision)
+    """
 
-                    nb_current_revisions = all_serie_revision.count()
-                    if nb_current_revisions > nb_revisions_limit:
-                        for rev_to_remove in all_serie_revision[
-                            : (nb_current_revisions - nb_revisions_limit)
-                        ]:
-                            artifacts_to_prune = serie.artifacts.filter(
-                                revision=rev_to_remove
-                            ).all()
-                            # logger.debug('[signals.limits_artifact_numbers] artifacts %s removed, all %s',
-                            #             artifacts_to_prune.all(),
-                            #             all_artifacts.all())
+    # these two numbers serve the same purpose
+    nb_revisions_limit = (
+        serie.nb_revisions_to_keep
+        if serie.nb_revisions_to_keep is not None
+        else serie.project.nb_revisions_to_keep
+    )
 
-                            for art in artifacts_to_prune:
-                                serie.artifacts.remove(art)
+    if nb_revisions_limit is None:
+        return
 
-                            # serie.artifacts.remove(*artifacts_to_prune)
+    if with_revision and nb_revisions_limit > 0:
+        # get all revisions of this serie
+        all_serie_revision = (
+            Revision.objects.filter(artifacts__project_series=serie)
+            .distinct()
+            .order_by("commit_time")
+        )
 
-                    pass
+        nb_current_revisions = all_serie_revision.count()
+        if nb_current_revisions > nb_revisions_limit:
+            revisions_to_remove = list(
+                all_serie_revision[: (nb_current_revisions - nb_revisions_limit)]
+            )
+            artifacts_to_prune = list(
+                serie.artifacts.filter(revision__in=revisions_to_remove)
+            )
+            serie.artifacts.remove(*artifacts_to_prune)
 
-    else:
+    if without_revision:
         # we filter the number of artifacts without revision instead
-        for serie in artifact.project_series.all():
-
-            # these two numbers serve the same purpose
-            if (
-                serie.nb_revisions_to_keep is not None
-                or proj_nb_revisions_to_keep is not None
-            ):
-                all_artifacts = Artifact.objects.filter(project_series=serie).order_by(
-                    "upload_date"
-                )
-
-                nb_current_artifacts = all_artifacts.count()
-                nb_artifacts_limit = (
-                    serie.nb_revisions_to_keep
-                    if serie.nb_revisions_to_keep is not None
-                    else proj_nb_revisions_to_keep
-                )
-
-                if nb_current_artifacts > nb_artifacts_limit:
-                    artifacts_to_prune = all_artifacts[
-                        : (nb_current_artifacts - nb_artifacts_limit)
-                    ]
-                    # logger.debug('[signals.limits_artifact_numbers] artifacts %s removed, all %s',
-                    #             artifacts_to_prune.all(),
-                    #             all_artifacts.all())
-
-                    # for art in artifacts_to_prune:
-                    #    art.project_series.remove(serie)
-                    serie.artifacts.remove(*artifacts_to_prune)
-
-            pass  # if
-        pass  # for
+        all_artifacts = Artifact.objects.filter(project_series=serie).order_by(
+            "upload_date"
+        )
 
-    pass  # if artifact.revision
+        nb_current_artifacts = all_artifacts.count()
+        if nb_current_artifacts > nb_revisions_limit:
+            artifacts_to_prune = list(
+                all_artifacts[: (nb_current_artifacts - nb_revisions_limit)]
+            )
+            serie.artifacts.remove(*artifacts_to_prune)
 
 
 # Artifacts
@@ -432,3 +481,472 @@ def callback_artifact_delete(sender, instance, using, **kwargs):
                 parent_directory,
                 e,
             )
+
+
+# Revision counters
+@receiver(pre_save, sender=Artifact)
+def callback_artifact_revision_change(sender, instance, **kwargs):
+    """Keeps track of the previous revision of an artifact being updated, and of the
+    values counted by its project and series (see :py:data:`COUNTED_ARTIFACT_FIELDS`)
+    """
+    previous = None
+    if instance.pk is not None:
+        previous = (
+            Artifact.objects.filter(pk=instance.pk)
+            .values_list(*COUNTED_ARTIFACT_FIELDS)
+            .first()
+        )
+
+    instance._previous_counted_values = previous
+    instance._previous_revision_id = previous[0] if previous else None
+
+
+@receiver(post_save, sender=Artifact)
+def callback_artifact_revision_counters(sender, instance, created, **kwargs):
+    """Updates the counters of the revisions after an artifact has been created or moved
+    to another revision"""
+    previous_revision_id = getattr(instance, "_previous_revision_id", None)
+    if previous_revision_id == instance.revision_id:
+        return
+
+    nb_links = 0 if created else instance.project_series.count()
+    for field, delta in (("nb_artifacts", 1), ("nb_series_references", nb_links)):
+        deltas = {}
+        if previous_revision_id is not None:
+            deltas[previous_revision_id] = -delta
+        if instance.revision_id is not None:
+            deltas[instance.revision_id] = delta
+        Revision.objects.add_to_counter(field, deltas)
+
+
+@receiver(pre_delete, sender=Artifact)
+def callback_artifact_delete_revision_counters(sender, instance, using, **kwargs):
+    """The links between the deleted artifact and its series are removed without
+    m2m_changed signal, the counters of its revision are updated here"""
+    if instance.revision_id is None:
+        return
+
+    Revision.objects.add_to_counter("nb_artifacts", {instance.revision_id: -1})
+    Revision.objects.add_to_counter(
+        "nb_series_references", {instance.revision_id: -instance.project_series.count()}
+    )
+
+
+# Project and series counters. The deltas of the changes are added to the counters,
+# which are recomputed only for the changes that the deltas cannot follow.
+
+#: the fields of the artifacts counted by their project and series, the revision first
+COUNTED_ARTIFACT_FIELDS = ("revision_id", "project_id", "file_size", "upload_date")
+
+
+def update_content_counters(project_pks=(), series_pks=()):
+    """Recomputes the counters of the projects and series, see
+    :py:meth:`ProjectQuerySet.update_counters
+    <code_doc.models.projects.ProjectQuerySet.update_counters>`"""
+    project_pks = [pk for pk in project_pks if pk is not None]
+    series_pks = list(series_pks)
+    if project_pks:
+        Project.objects.filter(pk__in=project_pks).update_counters()
+    if series_pks:
+        ProjectSeries.objects.filter(pk__in=series_pks).update_counters()
+
+
+def update_last_upload(queryset, upload_date):
+    """Recomputes the last upload date of the projects or series after the removal of
+    artifacts uploaded at upload_date, for those whose last upload may have changed"""
+    if upload_date is not None:
+        queryset.filter(last_upload__lte=upload_date).update_counters(
+            fields=["last_upload"]
+        )
+
+
+def add_to_series_counters(nb_revisions, **deltas):
+    """Adds the deltas to the counters of the series, see
+    :py:meth:`ProjectSeriesQuerySet.add_to_counters
+    <code_doc.models.projects.ProjectSeriesQuerySet.add_to_counters>`
+
+    :param nb_revisions: a dictionary {series id: number of revisions to add}, giving
+      the series to update
+    """
+    series_pks_per_delta = {}
+    for series_pk, delta in nb_revisions.items():
+        series_pks_per_delta.setdefault(delta, []).append(series_pk)
+
+    for delta, series_pks in series_pks_per_delta.items():
+        ProjectSeries.objects.filter(pk__in=series_pks).add_to_counters(
+            nb_revisions=delta, **deltas
+        )
+
+
+@receiver(pre_save, sender=Artifact)
+def callback_artifact_file_size(sender, instance, raw, **kwargs):
+    """Stores the size of the file of the artifact, when it is uploaded"""
+    if raw:
+        return
+
+    if not instance.artifactfile:
+        instance.file_size = None
+    elif not instance.artifactfile._committed or instance.file_size is None:
+        try:
+            instance.file_size = instance.artifactfile.size
+        except (IOError, OSError):
+            instance.file_size = None
+
+
+@receiver(post_save, sender=Artifact)
+def callback_artifact_content_counters(sender, instance, created, raw, **kwargs):
+    """Updates the counters of the project and of the series of the saved artifact. A
+    new artifact does not belong to any series yet.
+
+    The counters are recomputed when a counted value of an existing artifact changes,
+    its project and series are only touched otherwise."""
+    if raw:
+        return
+
+    if created:
+        Project.objects.filter(pk=instance.project_id).add_to_counters(
+            nb_artifacts=1,
+            total_size=instance.file_size or 0,
+            last_upload=instance.upload_date,
+        )
+        return
+
+    previous = getattr(instance, "_previous_counted_values", None)
+    series = ProjectSeries.objects.filter(artifacts=instance)
+    if previous == tuple(getattr(instance, field) for field in COUNTED_ARTIFACT_FIELDS):
+        Project.objects.filter(pk=instance.project_id).touch()
+        series.touch()
+    else:
+        update_content_counters(
+            project_pks=set([instance.project_id, previous and previous[1]]),
+            series_pks=series.values_list("pk", flat=True),
+        )
+
+
+@receiver(pre_delete, sender=Artifact)
+def callback_artifact_delete_content_counters(sender, instance, using, **kwargs):
+    """Keeps track of the series of the artifact being deleted, its links are removed
+    without m2m_changed signal.
+
+    The artifacts deleted together (eg. with their revision) are all processed here
+    before being deleted: the series losing the revision of the artifact are left to
+    the first artifact of this revision in each series, see
+    :py:func:`callback_artifact_deleted_content_counters`."""
+    if instance.revision_id is None:
+        instance._counters_series_pks = list(
+            instance.project_series.values_list("pk", flat=True)
+        )
+        instance._counters_first_of_revision = []
+        return
+
+    # the links of the revision in the series of the artifact
+    first_artifacts = dict(
+        Artifact.project_series.through.objects.filter(
+            projectseries__artifacts=instance, artifact__revision=instance.revision_id
+        )
+        .order_by()
+        .values_list("projectseries")
+        .annotate(first_artifact=Min("artifact"))
+    )
+    instance._counters_series_pks = list(first_artifacts)
+    instance._counters_first_of_revision = [
+        series_pk
+        for series_pk, first_artifact in first_artifacts.items()
+        if first_artifact == instance.pk
+    ]
+
+
+@receiver(post_delete, sender=Artifact)
+def callback_artifact_deleted_content_counters(sender, instance, using, **kwargs):
+    """Subtracts the deleted artifact from the counters of its project and series. The
+    series whose first artifact of the revision was this one lose the revision if none
+    of its artifacts is left in the series."""
+    size = instance.file_size or 0
+    projects = Project.objects.filter(pk=instance.project_id)
+    projects.add_to_counters(nb_artifacts=-1, total_size=-size)
+    update_last_upload(projects, instance.upload_date)
+
+    series_pks = getattr(instance, "_counters_series_pks", [])
+    if not series_pks:
+        return
+
+    lost_revision = set(getattr(instance, "_counters_first_of_revision", []))
+    if lost_revision:
+        lost_revision -= set(
+            Artifact.project_series.through.objects.filter(
+                projectseries__in=lost_revision, artifact__revision=instance.revision_id
+            ).values_list("projectseries", flat=True)
+        )
+    add_to_series_counters(
+        dict((pk, -1 if pk in lost_revision else 0) for pk in series_pks),
+        nb_artifacts=-1,
+        total_size=-size,
+    )
+    update_last_upload(
+        ProjectSeries.objects.filter(pk__in=series_pks), instance.upload_date
+    )
+
+
+@receiver(m2m_changed, sender=Artifact.project_series.through)
+def callback_series_content_counters(
+    sender, action, reverse, instance, pk_set, **kwargs
+):
+    """Updates the counters of the series whose artifacts change.
+
+    The deltas are added before the change of the links: the handlers of the
+    ``post_*`` actions may remove or delete other artifacts of the series. Only the last
+    upload date of the series is recomputed after a removal."""
+    if reverse:
+        update_series_counters_of_artifacts(sender, action, instance, pk_set)
+    else:
+        update_series_counters_of_artifact(sender, action, instance, pk_set)
+
+
+def update_series_counters_of_artifacts(through, action, series, pk_set):
+    """Updates the counters of a series whose artifacts are added or removed, see
+    :py:func:`callback_series_content_counters`"""
+    if action == "post_clear":
+        ProjectSeries.objects.filter(pk=series.pk).update_counters()
+        return
+    if action == "post_remove":
+        update_last_upload(
+            ProjectSeries.objects.filter(pk=series.pk),
+            getattr(series, "_counters_removed_upload", None),
+        )
+        return
+
+    series_links = through.objects.filter(projectseries=series)
+    if action == "pre_add":
+        sign = 1
+        changed = Artifact.objects.filter(pk__in=pk_set).values_list(
+            "revision", "file_size", "upload_date"
+        )
+    elif action == "pre_remove":
+        sign = -1
+        changed = series_links.filter(artifact__in=pk_set).values_list(
+            "artifact__revision", "artifact__file_size", "artifact__upload_date"
+        )
+        series_links = series_links.exclude(artifact__in=pk_set)
+    else:
+        return
+
+    changed = list(changed)
+    series._counters_removed_upload = None
+    if not changed:
+        return
+
+    revisions = set(revision for revision, _, _ in changed if revision is not None)
+    if revisions:
+        revisions -= set(
+            series_links.filter(artifact__revision__in=revisions).values_list(
+                "artifact__revision", flat=True
+            )
+        )
+    upload_dates = [upload for _, _, upload in changed if upload is not None]
+    last_upload = max(upload_dates) if upload_dates else None
+    if sign < 0:
+        series._counters_removed_upload = last_upload
+        last_upload = None
+
+    ProjectSeries.objects.filter(pk=series.pk).add_to_counters(
+        nb_artifacts=sign * len(changed),
+        nb_revisions=sign * len(revisions),
+        total_size=sign * sum(size or 0 for _, size, _ in changed),
+        last_upload=last_upload,
+    )
+
+
+def update_series_counters_of_artifact(through, action, artifact, pk_set):
+    """Updates the counters of the series to or from which an artifact is added or
+    removed, see :py:func:`callback_series_content_counters`"""
+    if action in ("post_remove", "post_clear"):
+        update_last_upload(
+            ProjectSeries.objects.filter(
+                pk__in=getattr(artifact, "_counters_series_pks", [])
+            ),
+            artifact.upload_date,
+        )
+        return
+
+    if action == "pre_add":
+        sign = 1
+        series_pks = set(pk_set)
+    elif action in ("pre_remove", "pre_clear"):
+        sign = -1
+        series_links = through.objects.filter(artifact=artifact)
+        if pk_set is not None:
+            series_links = series_links.filter(projectseries__in=pk_set)
+        series_pks = set(series_links.values_list("projectseries", flat=True))
+        artifact._counters_series_pks = series_pks
+    else:
+        return
+
+    if not series_pks:
+        return
+
+    # the series keeping or already having another artifact of the revision
+    other_revision_pks = series_pks
+    if artifact.revision_id is not None:
+        other_revision_pks = set(
+            through.objects.filter(
+                projectseries__in=series_pks, artifact__revision=artifact.revision_id
+            )
+            .exclude(artifact=artifact)
+            .values_list("projectseries", flat=True)
+        )
+    add_to_series_counters(
+        dict((pk, 0 if pk in other_revision_pks else sign) for pk in series_pks),
+        nb_artifacts=sign,
+        total_size=sign * (artifact.file_size or 0),
+        last_upload=artifact.upload_date if sign > 0 else None,
+    )
+
+
+@receiver(post_save, sender=Revision)
+@receiver(post_save, sender=ProjectSeries)
+def callback_project_content_added(sender, instance, created, raw, **kwargs):
+    """Updates the counters of the project of a new revision or series"""
+    if created and not raw:
+        Project.objects.filter(pk=instance.project_id).add_to_counters(
+            **{"nb_revisions" if sender is Revision else "nb_series": 1}
+        )
+
+
+@receiver(post_delete, sender=Revision)
+@receiver(post_delete, sender=ProjectSeries)
+def callback_project_content_deleted(sender, instance, using, **kwargs):
+    Project.objects.filter(pk=instance.project_id).add_to_counters(
+        **{"nb_revisions" if sender is Revision else "nb_series": -1}
+    )
+
+
+# Versions of the projects and series, for the conditional responses. The changes of
+# content are already covered by the update of the counters.
+@receiver(post_save, sender=Project)
+def callback_project_touch(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        Project.objects.filter(pk=instance.pk).touch()
+
+
+@receiver(post_save, sender=ProjectSeries)
+def callback_series_touch(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        ProjectSeries.objects.filter(pk=instance.pk).touch()
+
+
+@receiver(post_save, sender=ProjectRepository)
+@receiver(post_delete, sender=ProjectRepository)
+def callback_repository_touch(sender, instance, **kwargs):
+    Project.objects.filter(pk=instance.project_id).touch()
+
+
+@receiver(post_save, sender=Author)
+def callback_author_touch(sender, instance, created, raw, **kwargs):
+    """The authors are displayed on the page of their projects"""
+    if not created and not raw:
+        Project.objects.filter(authors=instance).touch()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def callback_administrator_touch(
+    sender, instance, created, raw, update_fields, **kwargs
+):
+    """The administrators are displayed by name on the page of their projects"""
+    if created or raw:
+        return
+    if update_fields is not None and "username" not in update_fields:
+        return
+    Project.objects.filter(administrators=instance).touch()
+
+
+# the projects are touched before the deletions, the memberships of the copyright
+# holders being deleted before post_delete
+@receiver(post_save, sender=Copyright)
+@receiver(pre_delete, sender=Copyright)
+def callback_copyright_touch(sender, instance, raw=False, **kwargs):
+    """The copyright is displayed on the page of its projects"""
+    if not raw:
+        Project.objects.filter(copyright=instance).touch()
+
+
+@receiver(post_save, sender=CopyrightHolder)
+@receiver(pre_delete, sender=CopyrightHolder)
+def callback_copyright_holder_touch(sender, instance, raw=False, **kwargs):
+    """The copyright holders are displayed on the page of their projects"""
+    if not raw:
+        Project.objects.filter(copyright_holder=instance).touch()
+
+
+def callback_project_relation_touch(sender, instance, action, reverse, **kwargs):
+    """The authors, topics, administrators and copyright holders are displayed on the
+    page of the projects"""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        # the projects of a clear are not known anymore after the clear
+        return
+
+    if not reverse:
+        Project.objects.filter(pk=instance.pk).touch()
+    elif kwargs["pk_set"] is not None:
+        Project.objects.filter(pk__in=kwargs["pk_set"]).touch()
+    else:
+        related_field = next(
+            field
+            for field in sender._meta.concrete_fields
+            if field.name != "project" and field.related_model is type(instance)
+        )
+        Project.objects.filter(
+            pk__in=sender.objects.filter(**{related_field.name: instance}).values(
+                "project"
+            )
+        ).touch()
+
+
+for relation in ("authors", "topics", "administrators", "copyright_holder"):
+    m2m_changed.connect(
+        callback_project_relation_touch, sender=getattr(Project, relation).through
+    )
+
+
+def touch_series_of_revisions(revisions):
+    """Touches the series containing the artifacts of the revisions (ids or a
+    queryset)"""
+    ProjectSeries.objects.filter(
+        pk__in=Artifact.project_series.through.objects.filter(
+            artifact__revision__in=revisions
+        ).values("projectseries")
+    ).touch()
+
+
+@receiver(post_save, sender=Revision)
+def callback_revision_touch(sender, instance, created, raw, **kwargs):
+    """The revisions are displayed on the pages of the series of their artifacts"""
+    if not created and not raw:
+        touch_series_of_revisions([instance.pk])
+
+
+@receiver(m2m_changed, sender=Branch.revisions.through)
+def callback_branch_revisions_touch(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """The artifacts and revisions of the series are filtered by branch"""
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        # the revisions of a clear are not known anymore after the clear
+        return
+
+    if reverse:
+        touch_series_of_revisions([instance.pk])
+    elif pk_set is not None:
+        touch_series_of_revisions(pk_set)
+    else:
+        touch_series_of_revisions(
+            sender.objects.filter(branch=instance).values("revision")
+        )
+
+
+@receiver(post_save, sender=Branch)
+@receiver(pre_delete, sender=Branch)
+def callback_branch_touch(sender, instance, raw=False, created=False, **kwargs):
+    """The series are filtered by the name of the branch, and the memberships of a
+    deleted branch are removed without m2m_changed"""
+    if not raw and not created:
+        touch_series_of_revisions(instance.revisions.values("pk"))
@@ -1,38 +1,35 @@
 from django import template
 from ..models.authors import Author
-
-import hashlib
+from ..utils.thumbnails import get_thumbnail_name
+from .gravatar import get_gravatar_url
 
 register = template.Library()
 
 
 @register.inclusion_tag("code_doc/tags/author_image_tag.html")
-def author_image(author_id, size=None):
-    author = Author.objects.get(pk=author_id)
+def author_image(author, size=None):
+    """Displays the avatar of an author
+
+    :param author: the author, or its id (costs a query)
+    :param size: the size of the displayed avatar
+
+    The avatar details are read from the fields of the author and the uploaded image
+    is served from the closest thumbnail, the image file is not opened.
+    """
+    if not isinstance(author, Author):
+        author = Author.objects.get(pk=author)
+
+    size = size if size is not None else 64
     return {
-        "uploaded_image": author.image if author.image is not None else None,
-        "gravatar_email": author.gravatar_email
-        if author.gravatar_email != ""
+        "uploaded_image": get_thumbnail_name(author.image.name, size)
+        if author.image
+        else None,
+        "gravatar_url": get_gravatar_url(author.gravatar_hash, size)
+        if author.gravatar_hash
         else None,
         "author_initial": (
             author.firstname[0] if author.firstname != "" else author.email[0]
         ).upper(),
-        "background_color": _hash_string_to_color_hex(
-            author.firstname + author.lastname, 200
-        ),
-        "size": size if size is not None else 64,
+        "background_color": author.avatar_color,
+        "size": size,
     }
-
-
-def _hash_string_to_color_hex(str_author, brightness_limit):
-    hashed = hashlib.md5(str_author.encode("utf-8")).hexdigest()[:6]
-    r = int(hashed[0:2], 16)
-    g = int(hashed[2:4], 16)
-    b = int(hashed[4:6], 16)
-
-    r = min(r, brightness_limit)
-    g = min(g, brightness_limit)
-    b = min(b, brightness_limit)
-
-    result = "#%02x%02x%02x" % (r, g, b)
-    return result
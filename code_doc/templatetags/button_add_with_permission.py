@@ -6,56 +6,125 @@ register = template.Library()
 logger = logging.getLogger(__name__)
 
 
-@register.inclusion_tag("code_doc/tags/button_add_with_permission_tag.html")
-def button_add_series_with_permission(user, project):
+def _has_permission(context, obj, perm, fallback, user):
+    """Reads the decision from the permission matrix computed by the view, if any (see
+    :py:func:`code_doc.permissions.bulk.permissions_for`), otherwise calls fallback"""
+    matrix = context.get("permissions")
+    if matrix is None or matrix.user != user:
+        return fallback(user)
+    return matrix.has_perm(obj, perm, fallback)
+
+
+@register.inclusion_tag(
+    "code_doc/tags/button_add_with_permission_tag.html", takes_context=True
+)
+def button_add_series_with_permission(context, user, project):
     logger.debug("[templatetag|button series] User %s ", user)
     return {
-        "permission_ok": project.has_user_project_series_add_permission(user),
+        "permission_ok": _has_permission(
+            context,
+            project,
+            "code_doc.project_series_add",
+            project.has_user_project_series_add_permission,
+            user,
+        ),
         "user": user,
         "next": reverse_lazy("project_series_add", args=[project.id]),
     }
 
 
-@register.inclusion_tag("code_doc/tags/button_add_with_permission_tag.html")
-def button_add_artifact_with_permission(user, series):
+@register.inclusion_tag(
+    "code_doc/tags/button_add_with_permission_tag.html", takes_context=True
+)
+def button_add_artifact_with_permission(context, user, series):
     project = series.project
     logger.debug("[templatetag|button artifact] User %s ", user)
     return {
-        "permission_ok": series.has_user_series_artifact_add_permission(user),
+        "permission_ok": _has_permission(
+            context,
+            series,
+            "code_doc.series_artifact_add",
+            series.has_user_series_artifact_add_permission,
+            user,
+        ),
         "user": user,
         "text": "Add",
         "next": reverse_lazy("project_artifacts_add", args=[project.id, series.id]),
     }
 
 
-@register.inclusion_tag("code_doc/tags/button_add_with_permission_tag.html")
-def button_remove_artifact_with_permission(user, series):
+@register.inclusion_tag(
+    "code_doc/tags/button_add_with_permission_tag.html", takes_context=True
+)
+def button_promote_artifacts_with_permission(context, user, series):
+    project = series.project
+    logger.debug("[templatetag|button promote] User %s ", user)
+    return {
+        "permission_ok": _has_permission(
+            context,
+            series,
+            "code_doc.series_artifact_add",
+            series.has_user_series_artifact_add_permission,
+            user,
+        ),
+        "user": user,
+        "text": "Promote",
+        "next": reverse_lazy("project_series_promote", args=[project.id, series.id]),
+    }
+
+
+@register.inclusion_tag(
+    "code_doc/tags/button_add_with_permission_tag.html", takes_context=True
+)
+def button_remove_artifact_with_permission(context, user, series):
     project = series.project
     logger.debug("[templatetag|button artifact] User %s ", user)
     return {
-        "permission_ok": series.has_user_series_artifact_delete_permission(user),
+        "permission_ok": _has_permission(
+            context,
+            series,
+            "code_doc.series_artifact_delete",
+            series.has_user_series_artifact_delete_permission,
+            user,
+        ),
         "user": user,
         "text": "Remove",
         "next": reverse_lazy("project_artifacts_add", args=[project.id, series.id]),
     }
 
 
-@register.inclusion_tag("code_doc/tags/button_edit_with_permission_tag.html")
-def button_edit_series_with_permission(user, series):
+@register.inclusion_tag(
+    "code_doc/tags/button_edit_with_permission_tag.html", takes_context=True
+)
+def button_edit_series_with_permission(context, user, series):
     project = series.project
     logger.debug("[templatetag|button series] User %s ", user)
     return {
-        "permission_ok": series.has_user_series_edit_permission(user),
+        "permission_ok": _has_permission(
+            context,
+            series,
+            "code_doc.series_edit",
+            series.has_user_series_edit_permission,
+            user,
+        ),
         "user": user,
         "next": reverse_lazy("project_series_edit", args=[project.id, series.id]),
     }
 
 
-@register.inclusion_tag("code_doc/tags/button_edit_with_permission_tag.html")
-def button_edit_author_with_permission(user, author):
+@register.inclusion_tag(
+    "code_doc/tags/button_edit_with_permission_tag.html", takes_context=True
+)
+def button_edit_author_with_permission(context, user, author):
     logger.debug("[templatetag|button author] User %s editing Author %s", user, author)
     return {
-        "permission_ok": author.has_user_author_edit_permission(user),
+        "permission_ok": _has_permission(
+            context,
+            author,
+            "code_doc.author_edit",
+            author.has_user_author_edit_permission,
+            user,
+        ),
         "user": user,
         "next": reverse_lazy("author_edit", args=[author.id]),
     }
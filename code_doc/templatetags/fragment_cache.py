@@ -0,0 +1,71 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..utils.fragment_cache import get_fragment_key, get_fragment, set_fragment
+
+register = template.Library()
+
+
+class CachedFragmentNode(template.Node):
+    def __init__(self, nodelist, name, dependencies, vary_on, per_user):
+        self.nodelist = nodelist
+        self.name = name
+        self.dependencies = dependencies
+        self.vary_on = vary_on
+        self.per_user = per_user
+
+    def render(self, context):
+        dependencies = [dependency.resolve(context) for dependency in self.dependencies]
+        key = get_fragment_key(
+            self.name.resolve(context),
+            [dependency for dependency in dependencies if dependency is not None],
+            context.get("user"),
+            vary_on=[value.resolve(context) for value in self.vary_on],
+            per_user=self.per_user,
+        )
+        if key is None:
+            return self.nodelist.render(context)
+
+        content = get_fragment(key)
+        if content is None:
+            content = self.nodelist.render(context)
+            set_fragment(key, content)
+        return mark_safe(content)
+
+
+@register.tag
+def cachedfragment(parser, token):
+    """Caches the rendering of a fragment of template, see
+    :py:mod:`code_doc.utils.fragment_cache`::
+
+      {% cachedfragment "name" project "author" vary_on page_obj.number per_user %}
+        ...
+      {% endcachedfragment %}
+
+    The arguments following the name are the model instances and model names the
+    fragment depends on, followed by the other values it depends on after
+    ``vary_on``. ``per_user`` stores the fragment for each authenticated user.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            "'%s' tag requires at least the name of the fragment" % bits[0]
+        )
+
+    per_user = False
+    dependencies = []
+    vary_on = []
+    current = dependencies
+    for bit in bits[2:]:
+        if bit == "per_user":
+            per_user = True
+        elif bit == "vary_on":
+            current = vary_on
+        else:
+            current.append(parser.compile_filter(bit))
+
+    nodelist = parser.parse(("endcachedfragment",))
+    parser.delete_first_token()
+    return CachedFragmentNode(
+        nodelist, parser.compile_filter(bits[1]), dependencies, vary_on, per_user
+    )
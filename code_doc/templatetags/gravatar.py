@@ -11,12 +11,24 @@
 
 
 from django import template
-import urllib
-import hashlib
+from django.utils.http import urlencode
+
+from ..models.authors import get_gravatar_hash
 
 register = template.Library()
 
 
+def get_gravatar_url(email_hash, size=40, default="retro"):
+    """Returns the URL of the Gravatar image identified by email_hash, see
+    :py:func:`get_gravatar_hash <code_doc.models.authors.get_gravatar_hash>`"""
+    return (
+        "https://www.gravatar.com/avatar/"
+        + email_hash
+        + "?"
+        + urlencode({"d": default, "s": str(size)})
+    )
+
+
 class GravatarUrlNode(template.Node):
     def __init__(self, email):
         self.email = template.Variable(email)
@@ -27,17 +39,7 @@ class GravatarUrlNode(template.Node):
         except template.VariableDoesNotExist:
             return ""
 
-        default = "retro"
-        size = 40
-
-        gravatar_url = (
-            "https://www.gravatar.com/avatar/"
-            + hashlib.md5(email.lower()).hexdigest()
-            + "?"
-        )
-        gravatar_url += urllib.urlencode({"d": default, "s": str(size)})
-
-        return gravatar_url
+        return get_gravatar_url(get_gravatar_hash(email))
 
 
 @register.tag
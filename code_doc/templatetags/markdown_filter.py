@@ -3,7 +3,7 @@ from django import template
 register = template.Library()
 
 
-import markdown
+from ..utils.markdown_rendering import render_markdown
 
 # from markdown.extensions.wikilinks import WikiLinkExtension
 
@@ -15,13 +15,7 @@ logger = logging.getLogger(__name__)
 
 @register.filter(is_safe=False)
 def markd(text):
-    if text is None:
-        return text
-    return markdown.markdown(
-        text,
-        extensions=["codehilite", "toc", "fenced_code", "admonition"],
-        safe_mode=False,
-    )
+    return render_markdown(text)
 
 
 class MkNode(template.Node):
@@ -30,11 +24,7 @@ class MkNode(template.Node):
 
     def render(self, context):
         output = self.nodelist.render(context)
-        return markdown.markdown(
-            output,
-            extensions=["codehilite", "toc", "fenced_code", "admonition"],
-            safe_mode=False,
-        )
+        return render_markdown(output)
 
 
 @register.tag
@@ -1,26 +1,37 @@
 from django import template
 from ..models.projects import Project
+from ..utils.thumbnails import get_thumbnail_name
 
 register = template.Library()
 
 
 @register.inclusion_tag("code_doc/tags/project_image_tag.html")
-def project_image(project_id, size=None, class_="media-object"):
-    project = Project.objects.get(pk=project_id)
-
-    im = project.icon
-    if im:
-        if im.width > im.height:
-            size_x = size
-            size_y = im.height * size_x / im.width
-        else:
-            size_y = size
-            size_x = im.width * size_y / im.height
-    else:
-        size_x = size_y = size
+def project_image(project, size=None, class_="media-object"):
+    """Displays the icon of a project
+
+    :param project: the project, or its id (costs a query)
+    :param size: the largest dimension of the displayed icon
+
+    The dimensions of the icon are read from the project and the image is served from
+    the closest thumbnail, the icon file is not opened.
+    """
+    if not isinstance(project, Project):
+        project = Project.objects.get(pk=project)
+
+    image = None
+    size_x = size_y = size
+    if project.icon:
+        image = get_thumbnail_name(project.icon.name, size)
+
+        width, height = project.icon_width, project.icon_height
+        if size is not None and width and height:
+            if width > height:
+                size_y = height * size // width
+            else:
+                size_x = width * size // height
 
     return {
-        "image": project.icon,
+        "image": image,
         "size_x": size_x,
         "size_y": size_y,
         "additional_class": class_,
@@ -0,0 +1,186 @@
+"""Tests on the REST API over the projects, series, revisions and artifacts"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+
+from ..models.projects import Project, ProjectSeries
+from ..models.artifacts import Artifact
+from ..models.revisions import Revision, Branch
+
+import datetime
+import json
+
+
+class RESTAPITest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user")
+        self.admin = User.objects.create_user(username="admin")
+
+        self.project = Project.objects.create(name="test_project")
+        self.project.administrators.add(self.admin)
+        self.other_project = Project.objects.create(name="other_project")
+
+        self.public_series = ProjectSeries.objects.create(
+            series="public_series",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+            is_public=True,
+        )
+        self.restricted_series = ProjectSeries.objects.create(
+            series="restricted_series",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+        )
+
+        self.branch = Branch.objects.create(name="master")
+        self.other_branch = Branch.objects.create(name="develop")
+
+        # 5 public artifacts and 1 restricted artifact, in their own revision
+        self.artifacts = []
+        for index in range(6):
+            revision = Revision.objects.create(
+                revision="rev%d" % index, project=self.project
+            )
+            revision.branches.add(self.branch if index < 5 else self.other_branch)
+            artifact = Artifact.objects.create(
+                project=self.project,
+                revision=revision,
+                md5hash="%d" % index,
+                artifactfile="file%d" % index,
+            )
+            artifact.project_series.add(
+                self.public_series if index < 5 else self.restricted_series
+            )
+            self.artifacts.append(artifact)
+
+    def get_json(self, url, status=200, **parameters):
+        response = self.client.get(url, parameters)
+        self.assertEqual(response.status_code, status)
+        return json.loads(response.content.decode("utf-8"))
+
+    def get_ids(self, resource, **parameters):
+        data = self.get_json(reverse("api_v1_%s_list" % resource), **parameters)
+        return [obj["id"] for obj in data["results"]]
+
+    def test_list(self):
+        url = reverse("api_v1_project_list")
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "application/json")
+        # compact JSON
+        self.assertNotIn(b", ", response.content)
+        self.assertEqual(
+            json.loads(response.content.decode("utf-8")),
+            {
+                "results": [
+                    {
+                        "id": self.project.id,
+                        "name": "test_project",
+                        "short_description": None,
+                    },
+                    {
+                        "id": self.other_project.id,
+                        "name": "other_project",
+                        "short_description": None,
+                    },
+                ],
+                "next": None,
+                "previous": None,
+            },
+        )
+
+        # sparse fieldsets
+        data = self.get_json(url, fields="name,nb_artifacts")
+        self.assertEqual(
+            data["results"][0], {"name": "test_project", "nb_artifacts": 6}
+        )
+
+        data = self.get_json(url, status=400, fields="name,password")
+        self.assertIn("fields", data["errors"])
+
+    def test_pagination(self):
+        """The whole list is walked page by page, each page being read with a single
+        query"""
+        url = reverse("api_v1_artifact_list")
+        self.client.force_login(self.admin)
+
+        ids = []
+        data = self.get_json(url, limit=2)
+        self.assertIsNone(data["previous"])
+        pages = [data]
+        while data["next"] is not None:
+            # the session, the user and the page
+            with self.assertNumQueries(3):
+                response = self.client.get(data["next"])
+            data = json.loads(response.content.decode("utf-8"))
+            pages.append(data)
+        for data in pages:
+            ids += [obj["id"] for obj in data["results"]]
+        self.assertEqual(ids, [art.id for art in self.artifacts])
+        self.assertEqual([len(data["results"]) for data in pages], [2, 2, 2])
+
+        # backward
+        data = self.get_json(pages[-1]["previous"])
+        self.assertEqual(data, pages[1])
+
+        # invalid parameters
+        self.get_json(url, status=400, after="invalid")
+        self.get_json(url, status=400, limit=0)
+        self.get_json(url, status=400, after=pages[0]["next"], before="any")
+
+    def test_permissions(self):
+        """The lists and objects are filtered on the permissions of the user"""
+        public_ids = [art.id for art in self.artifacts[:5]]
+        all_ids = [art.id for art in self.artifacts]
+
+        # anonymous user
+        self.assertEqual(self.get_ids("series"), [self.public_series.id])
+        self.assertEqual(self.get_ids("artifact"), public_ids)
+        self.assertEqual(len(self.get_ids("revision")), 5)
+        self.assertEqual(self.get_ids("branch"), [self.branch.id])
+
+        restricted_url = reverse("api_v1_series", args=[self.restricted_series.id])
+        self.get_json(restricted_url, status=404)
+        self.get_json(
+            reverse("api_v1_artifact", args=[self.artifacts[5].id]), status=404
+        )
+
+        # user allowed to view the series
+        self.restricted_series.view_users.add(self.user)
+        self.client.force_login(self.user)
+        self.assertEqual(
+            self.get_ids("series"), [self.public_series.id, self.restricted_series.id]
+        )
+        self.assertEqual(self.get_ids("artifact"), all_ids)
+        self.assertEqual(self.get_ids("branch"), [self.branch.id, self.other_branch.id])
+        self.assertEqual(
+            self.get_json(restricted_url, fields="series,is_public"),
+            {"series": "restricted_series", "is_public": False},
+        )
+
+        # administrator of the project
+        self.client.force_login(self.admin)
+        self.assertEqual(len(self.get_ids("revision")), 6)
+
+    def test_filters(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(
+            self.get_ids("artifact", series=self.restricted_series.id),
+            [self.artifacts[5].id],
+        )
+        self.assertEqual(
+            self.get_ids("artifact", revision=self.artifacts[0].revision_id),
+            [self.artifacts[0].id],
+        )
+        self.assertEqual(self.get_ids("artifact", project=self.other_project.id), [])
+        self.assertEqual(
+            self.get_ids("revision", branch=self.other_branch.id),
+            [self.artifacts[5].revision_id],
+        )
+        self.assertEqual(
+            self.get_ids("series", project=self.project.id),
+            [self.public_series.id, self.restricted_series.id],
+        )
+        self.assertEqual(self.get_ids("branch", project=self.other_project.id), [])
+        self.get_json(reverse("api_v1_artifact_list"), status=400, series="one")
@@ -0,0 +1,217 @@
+"""Tests on the download of the artifacts and of their documentation"""
+
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.urlresolvers import reverse
+from django.template.loader import render_to_string
+
+from ..models.projects import Project, ProjectSeries
+from ..models.artifacts import Artifact, get_deflation_directory
+from ..models.revisions import Revision
+
+import datetime
+import os
+import shutil
+import tempfile
+
+
+class ArtifactDownloadTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.user = User.objects.create_user(username="user")
+        self.project = Project.objects.create(name="test_project")
+        self.series = ProjectSeries.objects.create(
+            series="restricted_series",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+        )
+        self.other_series = ProjectSeries.objects.create(
+            series="public_series",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+            is_public=True,
+        )
+
+        self.artifact = Artifact.objects.create(
+            project=self.project,
+            artifactfile=SimpleUploadedFile("artifact.txt", b"artifact content"),
+        )
+        self.artifact.project_series.add(self.series)
+
+        # deflated documentation
+        documentation = os.path.join(get_deflation_directory(self.artifact), "html")
+        os.makedirs(documentation)
+        with open(os.path.join(documentation, "index.html"), "w") as f:
+            f.write("<html>documentation</html>")
+        Artifact.objects.filter(pk=self.artifact.pk).update(
+            is_documentation=True, documentation_entry_file="html/index.html"
+        )
+
+        self.download_url = reverse(
+            "project_artifacts_download",
+            args=[self.project.id, self.series.id, self.artifact.id],
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def get_documentation_url(self, path, series=None):
+        return reverse(
+            "project_artifacts_documentation",
+            args=[self.project.id, (series or self.series).id, self.artifact.id, path],
+        )
+
+    def test_download(self):
+        """The file is sent by Django to the users allowed to view the series"""
+        # redirected to the login page
+        response = self.client.get(self.download_url)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        self.series.view_users.add(self.user)
+        self.client.force_login(self.user)
+        response = self.client.get(self.download_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"artifact content")
+        self.assertEqual(response["Content-Length"], "16")
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertEqual(
+            response["Content-Disposition"],
+            "attachment; filename=\"artifact.txt\"; filename*=UTF-8''artifact.txt",
+        )
+        self.assertIn("private", response["Cache-Control"])
+        response.close()
+
+        response = self.client.get(
+            self.download_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+        # the artifact should be in the series of the url
+        response = self.client.get(
+            reverse(
+                "project_artifacts_download",
+                args=[self.project.id, self.other_series.id, self.artifact.id],
+            )
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_download_unicode_name(self):
+        """The non-ASCII names are sent in UTF-8, with an ASCII fallback"""
+        artifact = Artifact.objects.create(
+            project=self.project,
+            artifactfile=SimpleUploadedFile("r\u00e9sum\u00e9.txt", b"content"),
+        )
+        artifact.project_series.add(self.series)
+        self.series.view_users.add(self.user)
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse(
+                "project_artifacts_download",
+                args=[self.project.id, self.series.id, artifact.id],
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Content-Disposition"],
+            "attachment; filename=\"resume.txt\"; filename*=UTF-8''r%C3%A9sum%C3%A9.txt",
+        )
+        response.close()
+
+    def test_documentation(self):
+        self.series.view_users.add(self.user)
+        self.client.force_login(self.user)
+
+        response = self.client.get(self.get_documentation_url("html/index.html"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/html")
+        self.assertFalse(response.has_header("Content-Disposition"))
+        self.assertEqual(
+            b"".join(response.streaming_content), b"<html>documentation</html>"
+        )
+        response.close()
+
+        # entry file of the documentation
+        response = self.client.get(self.get_documentation_url(""))
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+        for path in ("html/missing.html", "../artifact.txt", "html"):
+            response = self.client.get(self.get_documentation_url(path))
+            self.assertEqual(response.status_code, 404)
+
+    def test_links(self):
+        """The pages link to the files through the download views"""
+        self.series.view_users.add(self.user)
+        self.client.force_login(self.user)
+        documentation_url = self.get_documentation_url("html/index.html")
+
+        response = self.client.get(
+            reverse("project_series", args=[self.project.id, self.series.id])
+        )
+        self.assertContains(response, self.download_url)
+        self.assertContains(response, documentation_url)
+
+        response = self.client.get(reverse("project", args=[self.project.id]))
+        self.assertContains(response, documentation_url)
+
+        admin = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse("project_artifacts_add", args=[self.project.id, self.series.id])
+        )
+        self.assertContains(response, self.download_url)
+        self.assertNotContains(response, self.artifact.artifactfile.url)
+        content = render_to_string(
+            "code_doc/artifacts/artifact_remove.html",
+            {
+                "project": self.project,
+                "series": self.series,
+                "object": self.artifact,
+                "artifacts": [self.artifact],
+            },
+        )
+        self.assertIn(self.download_url, content)
+        self.assertNotIn(self.artifact.artifactfile.url, content)
+        self.client.force_login(self.user)
+
+        revision = Revision.objects.create(revision="rev", project=self.project)
+        Artifact.objects.filter(pk=self.artifact.pk).update(revision=revision)
+        response = self.client.get(
+            reverse("project_revision", args=[self.project.id, revision.id])
+        )
+        self.assertContains(response, self.download_url)
+        self.assertContains(response, documentation_url)
+
+    def test_front_end_server(self):
+        """The file is sent by the front-end server"""
+        self.series.view_users.add(self.user)
+        self.client.force_login(self.user)
+        relative_path = self.artifact.artifactfile.name
+
+        with self.settings(
+            CODEDOC_SENDFILE_BACKEND="x-accel-redirect",
+            CODEDOC_SENDFILE_URL="/protected/",
+        ):
+            response = self.client.get(self.download_url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response["X-Accel-Redirect"], "/protected/" + relative_path
+            )
+            self.assertEqual(response.content, b"")
+
+        with self.settings(CODEDOC_SENDFILE_BACKEND="x-sendfile"):
+            response = self.client.get(self.get_documentation_url("html/index.html"))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response["X-Sendfile"],
+                os.path.join(
+                    get_deflation_directory(self.artifact), "html", "index.html"
+                ),
+            )
@@ -1,8 +1,11 @@
 # this file tests the correct behaviour of the authentication backend
 # this one is used for permissions management
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.test import Client
+from django.test import override_settings
+from django.core.cache import cache as default_cache
+from django.db import transaction
 from django.contrib.auth.models import User
 from django.contrib.auth.models import Group
 from django.contrib.auth.models import AnonymousUser
@@ -13,6 +16,7 @@ from ..models.projects import Project, ProjectSeries
 from ..models.authors import Author
 from ..models.revisions import Revision
 from ..models.artifacts import Artifact
+from ..permissions import cache as permission_cache
 
 
 class AuthenticationBackendTest(TestCase):
@@ -139,3 +143,146 @@ class PermissionBackendTest(TestCase):
         # anon user cannot access corresponding revision
         self.art1.project_series = [public_series]
         self.assertTrue(anon_user.has_perm("code_doc.revision_view", self.revision))
+
+    def test_permission_cache(self):
+        """Checks the memoization of the permissions during a request"""
+        from ..permissions import cache
+
+        user2 = User.objects.create_user(username="user2", password="user2")
+        group = Group.objects.create(name="group1")
+        user2.groups.add(group)
+        self.new_series.view_users.add(self.first_user)
+
+        cache.activate()
+        try:
+            self.assertFalse(user2.has_perm("code_doc.series_view", self.new_series))
+            with self.assertNumQueries(0):
+                self.assertFalse(
+                    user2.has_perm("code_doc.series_view", self.new_series)
+                )
+                self.assertFalse(
+                    user2.has_perm("code_doc.series_view", self.new_series)
+                )
+
+            # the administrated projects are fetched once
+            self.assertFalse(user2.has_perm("code_doc.series_edit", self.new_series))
+            with self.assertNumQueries(0):
+                self.assertFalse(
+                    user2.has_perm("code_doc.project_administrate", self.project)
+                )
+            self.assertEqual(
+                cache.get_cache().administrated_project_ids, {user2.pk: set()}
+            )
+
+            # the rights on the series are read from the access table
+            with self.assertNumQueries(1):
+                self.assertFalse(
+                    user2.has_perm("code_doc.series_artifact_add", self.new_series)
+                )
+
+            # changing the permissions invalidates the cache
+            self.new_series.view_groups.add(group)
+            self.assertTrue(user2.has_perm("code_doc.series_view", self.new_series))
+
+            self.project.administrators.add(user2)
+            self.assertTrue(
+                user2.has_perm("code_doc.series_artifact_delete", self.new_series)
+            )
+        finally:
+            cache.deactivate()
+
+        # no memoization outside of a request
+        self.project.administrators.remove(user2)
+        self.assertFalse(
+            user2.has_perm("code_doc.series_artifact_delete", self.new_series)
+        )
+        with self.assertNumQueries(1):
+            self.assertFalse(
+                user2.has_perm("code_doc.project_administrate", self.project)
+            )
+
+    def test_shared_permission_cache(self):
+        """Checks the permission cache shared between the requests"""
+        from ..utils.cache import get_statistics, reset_statistics
+
+        user2 = User.objects.create_user(username="user2", password="user2")
+        group = Group.objects.create(name="group1")
+
+        default_cache.clear()
+        reset_statistics()
+
+        with override_settings(CODEDOC_PERMISSION_CACHE="default"):
+            self.assertFalse(user2.has_perm("code_doc.series_view", self.new_series))
+            self.assertEqual(get_statistics()["permissions"], {"hits": 0, "misses": 1})
+
+            # the permission is not computed again
+            self.assertFalse(user2.has_perm("code_doc.series_view", self.new_series))
+            self.assertEqual(get_statistics()["permissions"], {"hits": 1, "misses": 1})
+
+            # any change of the relations defining the permissions is visible
+            self.new_series.view_groups.add(group)
+            self.assertFalse(user2.has_perm("code_doc.series_view", self.new_series))
+            user2.groups.add(group)
+            self.assertTrue(user2.has_perm("code_doc.series_view", self.new_series))
+            group.user_set.remove(user2)
+            self.assertFalse(user2.has_perm("code_doc.series_view", self.new_series))
+
+            self.project.administrators.add(user2)
+            self.assertTrue(
+                user2.has_perm("code_doc.series_artifact_delete", self.new_series)
+            )
+            self.assertTrue(
+                user2.has_perm("code_doc.project_administrate", self.project)
+            )
+            self.project.administrators.remove(user2)
+            self.assertFalse(
+                user2.has_perm("code_doc.project_administrate", self.project)
+            )
+
+            self.new_series.is_public = True
+            self.new_series.save()
+            self.assertTrue(user2.has_perm("code_doc.series_view", self.new_series))
+
+            user2.is_superuser = True
+            user2.save()
+            self.assertTrue(
+                user2.has_perm("code_doc.project_administrate", self.project)
+            )
+
+            # a lost version does not give access to the entries stored before
+            user2.is_superuser = False
+            user2.save()
+            default_cache.delete("code_doc:version:user:%d" % user2.pk)
+            self.assertFalse(
+                user2.has_perm("code_doc.project_administrate", self.project)
+            )
+
+        self.assertEqual(get_statistics()["permissions"]["hits"], 1)
+
+
+@override_settings(CODEDOC_PERMISSION_CACHE="default")
+class SharedPermissionCacheTransactionTest(TransactionTestCase):
+    def setUp(self):
+        default_cache.clear()
+        self.user = User.objects.create_user(username="user")
+        self.project = Project.objects.create(name="test_project")
+        self.series = ProjectSeries.objects.create(
+            series="series", project=self.project, release_date=datetime.datetime.now()
+        )
+        self.series.view_users.add(self.user)
+
+    def test_revocation_in_transaction(self):
+        """A decision computed by a concurrent request before the commit of the change
+        of the rights is not served after the commit"""
+        self.assertTrue(self.user.has_perm("code_doc.series_view", self.series))
+
+        with transaction.atomic():
+            self.series.view_users.remove(self.user)
+
+            # concurrent request reading the committed rights
+            key = permission_cache.get_shared_key(
+                self.user, "code_doc.series_view", self.series
+            )
+            permission_cache.set_shared_decision(key, True)
+
+        self.assertFalse(self.user.has_perm("code_doc.series_view", self.series))
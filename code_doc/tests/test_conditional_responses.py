@@ -0,0 +1,259 @@
+"""Tests on the conditional responses (ETag, Last-Modified) of the APIs and pages"""
+
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+
+from ..models.projects import Project, ProjectSeries
+from ..models.authors import Author
+from ..models.artifacts import Artifact
+from ..models.revisions import Revision, Branch
+from ..models.models import Copyright, CopyrightHolder
+
+import datetime
+import json
+
+
+class ConditionalResponsesTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user")
+        self.superuser = User.objects.create_superuser(
+            username="superuser", email="s@s.fr", password="superuser"
+        )
+
+        self.author = Author.objects.create(
+            lastname="lastname", firstname="firstname", email="1@1.fr"
+        )
+        self.project = Project.objects.create(name="test_project")
+        self.project.authors.add(self.author)
+
+        self.series = ProjectSeries.objects.create(
+            series="public_series",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+            is_public=True,
+        )
+        self.restricted_series = ProjectSeries.objects.create(
+            series="restricted_series",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+        )
+        self.add_artifact("0")
+
+    def add_artifact(self, md5hash):
+        artifact = Artifact.objects.create(
+            project=self.project, md5hash=md5hash, artifactfile="file" + md5hash
+        )
+        artifact.project_series.add(self.series)
+        return artifact
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def get_streamed_artifacts(self, response):
+        content = b"".join(response.streaming_content).decode("utf-8")
+        return json.loads(content)["artifacts"]
+
+    def test_series_artifacts_api(self):
+        url = reverse("api_get_artifacts", args=[self.project.id, self.series.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        last_modified = response["Last-Modified"]
+
+        # the artifacts are not read for answering
+        with self.assertNumQueries(3):
+            self.assertNotModified(url, etag)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        # the ETag depends on the parameters, not on their order
+        response = self.client.get(url + "?fields=file&documentation=0")
+        parameters_etag = response["ETag"]
+        self.assertNotEqual(parameters_etag, etag)
+        response = self.client.get(
+            url + "?fields=file&documentation=1", HTTP_IF_NONE_MATCH=parameters_etag
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            url + "?documentation=0&fields=file", HTTP_IF_NONE_MATCH=parameters_etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+        # the artifacts filtered by branch follow the revisions of the branch
+        revision = Revision.objects.create(revision="rev", project=self.project)
+        Artifact.objects.filter(md5hash="0").update(revision=revision)
+        branch = Branch.objects.create(name="master")
+        response = self.client.get(url + "?branch=master")
+        self.assertEqual(self.get_streamed_artifacts(response), {})
+        branch.revisions.add(revision)
+        response = self.client.get(
+            url + "?branch=master", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(self.get_streamed_artifacts(response)),
+            [str(Artifact.objects.get(md5hash="0").pk)],
+        )
+
+        # removing an artifact and adding another one changes the version
+        self.series.artifacts.clear()
+        self.add_artifact("1")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn(b"file1", b"".join(response.streaming_content))
+
+        # the access rights are checked before the validators
+        url = reverse(
+            "api_get_artifacts", args=[self.project.id, self.restricted_series.id]
+        )
+        response = self.client.get(url)
+        self.assertNotEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_project_revision_ids_api(self):
+        url = reverse("api_get_ids", args=[self.project.name, self.series.series])
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotModified(url, response["ETag"])
+
+    def test_series_page(self):
+        url = reverse("project_series", args=[self.project.id, self.series.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertFalse(response.has_header("Last-Modified"))
+        self.assertNotModified(url, etag)
+
+        # the page depends on the user
+        self.client.force_login(self.superuser)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertNotModified(url, etag)
+
+        # the series and its project changed
+        self.series.description_mk = "new description"
+        self.series.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        self.project.name = "new_name"
+        self.project.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "new_name")
+
+    def test_series_page_branch(self):
+        """The pages filtered by branch follow the revisions of the branches"""
+        revision = Revision.objects.create(revision="rev", project=self.project)
+        Artifact.objects.filter(md5hash="0").update(revision=revision)
+        branch = Branch.objects.create(name="master")
+
+        url = (
+            reverse("project_series", args=[self.project.id, self.series.id])
+            + "?branch=master"
+        )
+        response = self.client.get(url)
+        self.assertNotContains(response, "file0")
+        etag = response["ETag"]
+
+        branch.revisions.add(revision)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "file0")
+        etag = response["ETag"]
+
+        revision.branches.remove(branch)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotContains(response, "file0")
+        etag = response["ETag"]
+
+        branch.revisions.add(revision)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        etag = response["ETag"]
+        branch.revisions.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotContains(response, "file0")
+        etag = response["ETag"]
+
+        branch.revisions.add(revision)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        etag = response["ETag"]
+        branch.name = "develop"
+        branch.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotContains(response, "file0")
+
+    def test_project_page(self):
+        url = reverse("project", args=[self.project.id])
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertNotContains(response, "restricted_series")
+        etag = response["ETag"]
+        self.assertNotModified(url, etag)
+
+        # series visible to the user
+        self.restricted_series.view_users.add(self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "restricted_series")
+        etag = response["ETag"]
+
+        # content of a series
+        self.add_artifact("1")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        # author of the project
+        self.author.firstname = "new_firstname"
+        self.author.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "new_firstname")
+        etag = response["ETag"]
+
+        self.project.authors.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotContains(response, "new_firstname")
+        etag = response["ETag"]
+
+        # copyright and administrators of the project
+        copyright = Copyright.objects.create(name="license", content="", url="")
+        holder = CopyrightHolder.objects.create(name="holder")
+        self.project.copyright = copyright
+        self.project.save()
+        self.project.copyright_holder.add(holder)
+        self.project.administrators.add(self.superuser)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "holder")
+        etag = response["ETag"]
+
+        copyright.name = "new_license"
+        copyright.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "new_license")
+        etag = response["ETag"]
+
+        holder.name = "new_holder"
+        holder.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "new_holder")
+        etag = response["ETag"]
+
+        holder.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotContains(response, "new_holder")
+        etag = response["ETag"]
+
+        # the logins of the administrators do not change the page
+        self.superuser.last_login = self.superuser.date_joined
+        self.superuser.save(update_fields=["last_login"])
+        self.assertNotModified(url, etag)
+
+        self.superuser.username = "new_administrator"
+        self.superuser.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "new_administrator")
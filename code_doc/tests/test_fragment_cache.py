@@ -0,0 +1,158 @@
+"""Tests on the cache of the rendered fragments of the pages"""
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, transaction
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.urlresolvers import reverse
+
+from ..models.projects import Project, ProjectSeries
+from ..models.authors import Author
+from ..models.artifacts import Artifact
+from ..utils import cache, fragment_cache
+
+import datetime
+
+
+@override_settings(CODEDOC_FRAGMENT_CACHE="default")
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        cache.reset_statistics()
+
+        self.viewer = User.objects.create_user(username="viewer")
+        self.other = User.objects.create_user(username="other")
+        self.superuser = User.objects.create_superuser(
+            username="superuser", email="s@s.fr", password="superuser"
+        )
+
+        self.author = Author.objects.create(
+            lastname="lastname", firstname="firstname", email="1@1.fr"
+        )
+        self.project = Project.objects.create(
+            name="test_project", description_mk="first description"
+        )
+        self.project.authors.add(self.author)
+
+        self.public_series = ProjectSeries.objects.create(
+            series="public_series",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+            is_public=True,
+        )
+        self.restricted_series = ProjectSeries.objects.create(
+            series="restricted_series",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+        )
+        self.restricted_series.view_users.add(self.viewer)
+
+        self.url = reverse("project", args=[self.project.id])
+
+    def get_number_of_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response
+
+    def test_project_page(self):
+        """The fragments of the project page are reused and invalidated by the
+        changes of the project"""
+        nb_queries_miss, response = self.get_number_of_queries(self.url)
+        self.assertContains(response, "first description")
+        self.assertEqual(cache.get_hit_ratio("fragments"), 0)
+
+        nb_queries_hit, response = self.get_number_of_queries(self.url)
+        self.assertContains(response, "first description")
+        self.assertContains(response, "public_series")
+        self.assertLess(nb_queries_hit, nb_queries_miss)
+        self.assertEqual(cache.get_hit_ratio("fragments"), 0.5)
+
+        self.project.description_mk = "second description"
+        self.project.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, "second description")
+
+        # the series table follows the artifacts of the series
+        artifact = Artifact.objects.create(
+            project=self.project, md5hash="0", artifactfile="blabla"
+        )
+        self.assertContains(self.client.get(self.url), "<td>0</td>")
+        artifact.project_series.add(self.public_series)
+        self.assertContains(self.client.get(self.url), "<td>1</td>")
+
+        # author displayed on the page
+        self.author.firstname = "new_firstname"
+        self.author.save()
+        self.assertContains(self.client.get(self.url), "new_firstname")
+
+    def test_project_page_access_rights(self):
+        """The series table is not shared between the users having different rights"""
+        self.assertNotContains(self.client.get(self.url), "restricted_series")
+
+        self.client.force_login(self.superuser)
+        self.assertContains(self.client.get(self.url), "restricted_series")
+
+        self.client.force_login(self.viewer)
+        self.assertContains(self.client.get(self.url), "restricted_series")
+
+        self.client.force_login(self.other)
+        self.assertNotContains(self.client.get(self.url), "restricted_series")
+
+        # change of the rights of the user
+        self.restricted_series.view_users.add(self.other)
+        self.assertContains(self.client.get(self.url), "restricted_series")
+
+        self.restricted_series.view_users.remove(self.other)
+        self.assertNotContains(self.client.get(self.url), "restricted_series")
+
+    def test_index_and_authors(self):
+        """The index and author pages follow the projects and authors"""
+        index_url = reverse("index")
+        self.assertContains(self.client.get(index_url), "test_project")
+        self.assertNotContains(self.client.get(index_url), "new_project")
+
+        new_project = Project.objects.create(name="new_project")
+        self.assertContains(self.client.get(index_url), "new_project")
+
+        author_url = reverse("author", args=[self.author.id])
+        self.assertContains(self.client.get(author_url), "test_project")
+        self.assertNotContains(self.client.get(author_url), "new_project")
+        new_project.authors.add(self.author)
+        self.assertContains(self.client.get(author_url), "new_project")
+
+        authors_url = reverse("authors_list")
+        self.assertContains(self.client.get(authors_url), "firstname")
+        self.author.firstname = "new_firstname"
+        self.author.save()
+        self.assertContains(self.client.get(authors_url), "new_firstname")
+
+    @override_settings(CODEDOC_FRAGMENT_CACHE=None)
+    def test_disabled(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertIsNone(cache.get_hit_ratio("fragments"))
+
+
+@override_settings(CODEDOC_FRAGMENT_CACHE="default")
+class FragmentCacheTransactionTest(TransactionTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.project = Project.objects.create(
+            name="test_project", description_mk="first description"
+        )
+
+    def test_invalidation_in_transaction(self):
+        """A fragment rendered from the previous state while the change of the
+        project is not committed is not reused"""
+        with transaction.atomic():
+            self.project.description_mk = "second description"
+            self.project.save()
+
+            # concurrent request reading the committed project
+            key = fragment_cache.get_fragment_key("project", [self.project], None)
+            fragment_cache.set_fragment(key, "first description")
+
+        key = fragment_cache.get_fragment_key("project", [self.project], None)
+        self.assertIsNone(fragment_cache.get_fragment(key))
@@ -0,0 +1,129 @@
+"""Tests the media consistency scanner command"""
+
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from ..models.projects import Project, ProjectSeries
+from ..models.artifacts import Artifact
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+
+from io import StringIO
+
+
+class MediaConsistencyTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.project = Project.objects.create(name="test_project")
+        self.series = ProjectSeries.objects.create(
+            series="1234", project=self.project, release_date=datetime.datetime.now()
+        )
+
+        self.artifact = Artifact.objects.create(
+            project=self.project,
+            artifactfile=SimpleUploadedFile("kept.txt", b"kept content"),
+        )
+        self.artifact.project_series.add(self.series)
+
+        self.missing = Artifact.objects.create(
+            project=self.project,
+            artifactfile=SimpleUploadedFile("missing.txt", b"missing content"),
+        )
+        self.missing.project_series.add(self.series)
+        os.remove(self.missing.artifactfile.path)
+
+        project_directory = os.path.join(self.media_root, "artifacts", "test_project")
+        os.makedirs(os.path.join(project_directory, "orphan_md5"))
+        with open(
+            os.path.join(project_directory, "orphan_md5", "orphan.txt"), "w"
+        ) as f:
+            f.write("orphan")
+
+        os.makedirs(os.path.join(project_directory, "deflate_md5", "deflate", "html"))
+        os.makedirs(os.path.join(project_directory, "empty_md5"))
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def run_command(self, *args, **options):
+        out = StringIO()
+        call_command("check_media_consistency", *args, stdout=out, **options)
+        return out.getvalue()
+
+    def test_report(self):
+        """The scanner reports the inconsistencies without modifying anything"""
+        output = self.run_command()
+
+        self.assertIn("[missing_files] %s" % self.missing.artifactfile.name, output)
+        self.assertIn(
+            "[orphan_files] %s"
+            % os.path.join("artifacts", "test_project", "orphan_md5", "orphan.txt"),
+            output,
+        )
+        self.assertIn(
+            "[orphan_deflate_directories] %s"
+            % os.path.join("artifacts", "test_project", "deflate_md5", "deflate"),
+            output,
+        )
+        self.assertIn(
+            "[empty_directories] %s"
+            % os.path.join("artifacts", "test_project", "empty_md5"),
+            output,
+        )
+        self.assertNotIn(self.artifact.artifactfile.name, output)
+
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(self.media_root, "artifacts", "test_project", "orphan_md5")
+            )
+        )
+        self.assertEqual(Artifact.objects.count(), 2)
+
+    def test_fix(self):
+        """The fixing mode removes the orphans and keeps the referenced files"""
+        self.run_command(fix=True, delete_missing=True)
+
+        project_directory = os.path.join(self.media_root, "artifacts", "test_project")
+        self.assertEqual(
+            sorted(os.listdir(project_directory)),
+            [os.path.basename(os.path.dirname(self.artifact.artifactfile.path))],
+        )
+        self.assertTrue(os.path.exists(self.artifact.artifactfile.path))
+        self.assertEqual(list(Artifact.objects.all()), [self.artifact])
+
+        output = self.run_command()
+        self.assertNotIn("[", output)
+
+    def test_resume_from_checkpoint(self):
+        """The scan skips the directories already processed in the checkpoint"""
+        checkpoint = os.path.join(self.media_root, "checkpoint.json")
+        with open(checkpoint, "w") as f:
+            json.dump(
+                {
+                    "phase": "filesystem",
+                    "last_pk": self.missing.pk,
+                    "done_directories": ["test_project"],
+                    "stats": {
+                        "missing_files": 1,
+                        "orphan_files": 0,
+                        "orphan_deflate_directories": 0,
+                        "orphan_directories": 0,
+                        "empty_directories": 0,
+                    },
+                },
+                f,
+            )
+
+        output = self.run_command(checkpoint=checkpoint)
+        self.assertNotIn("orphan.txt", output)
+        self.assertIn("missing_files: 1", output)
+        self.assertFalse(os.path.exists(checkpoint))
@@ -0,0 +1,222 @@
+from django.test import TestCase
+from django.test import Client
+from django.core.paginator import InvalidPage
+from django.core.urlresolvers import reverse
+from django.utils import timezone
+
+from ..models.projects import Project, ProjectSeries
+from ..models.artifacts import Artifact
+from ..models.revisions import Revision, Branch
+from ..utils.pagination import KeysetPaginator, iterate_by_chunks
+
+import datetime
+import json
+
+
+class KeysetPaginationTest(TestCase):
+    """Tests the keyset pagination of the artifacts and revisions tables"""
+
+    def setUp(self):
+        self.client = Client()
+
+        self.project = Project.objects.create(name="test_project")
+        self.series = ProjectSeries.objects.create(
+            series="12345",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+            is_public=True,
+        )
+        self.branch = Branch.objects.create(name="master")
+
+        # artifacts sharing the same upload dates, and artifacts without upload date
+        now = timezone.now()
+        self.artifacts = []
+        for index in range(11):
+            revision = Revision.objects.create(
+                revision="rev%d" % index, project=self.project
+            )
+            if index % 2 == 0:
+                revision.branches.add(self.branch)
+
+            artifact = Artifact.objects.create(
+                project=self.project,
+                revision=revision,
+                md5hash="%d" % index,
+                artifactfile="blabla",
+                upload_date=None
+                if index < 2
+                else now - datetime.timedelta(days=index // 3),
+            )
+            artifact.project_series.add(self.series)
+            self.artifacts.append(artifact)
+
+        Artifact.objects.filter(pk=self.artifacts[3].pk).update(is_documentation=True)
+
+    def get_all_pages(self, paginator):
+        """Walks the pages forward and then backward, returns the objects of the pages"""
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(after=pages[-1].next_cursor))
+
+        backward = [pages[-1]]
+        while backward[-1].has_previous():
+            backward.append(paginator.page(before=backward[-1].previous_cursor))
+        self.assertEqual(
+            [list(page) for page in reversed(backward)], [list(page) for page in pages]
+        )
+
+        return [list(page) for page in pages]
+
+    def test_paginator(self):
+        """The pages follow the order of the queryset, including the NULL values"""
+        queryset = Artifact.objects.all()
+        for ordering in (("-upload_date", "-pk"), ("upload_date", "pk")):
+            expected = list(queryset.order_by(*ordering))
+            if ordering[0].startswith("-"):
+                # NULL values are the smallest
+                expected = [art for art in expected if art.upload_date is not None] + [
+                    art for art in expected if art.upload_date is None
+                ]
+            else:
+                expected = [art for art in expected if art.upload_date is None] + [
+                    art for art in expected if art.upload_date is not None
+                ]
+
+            pages = self.get_all_pages(KeysetPaginator(queryset, ordering, 3))
+            self.assertEqual([len(page) for page in pages], [3, 3, 3, 2])
+            self.assertEqual(sum(pages, []), expected)
+
+    def test_paginator_number_of_queries(self):
+        paginator = KeysetPaginator(Artifact.objects.all(), ("-upload_date", "-pk"), 3)
+        page = paginator.page()
+        with self.assertNumQueries(1):
+            page = paginator.page(after=page.next_cursor)
+        self.assertEqual(len(page), 3)
+
+    def test_paginator_invalid(self):
+        with self.assertRaises(ValueError):
+            KeysetPaginator(Artifact.objects.all(), ("upload_date",), 3)
+
+        paginator = KeysetPaginator(Artifact.objects.all(), ("upload_date", "pk"), 3)
+        for cursor in ("not a cursor", "WzFd", "WyJub3QgYSBkYXRlIiwgMV0="):
+            with self.assertRaises(InvalidPage):
+                paginator.page(after=cursor)
+
+        with self.assertRaises(InvalidPage):
+            paginator.page(after=paginator.page().next_cursor, before="WzFd")
+
+    def test_series_details_pagination(self):
+        """The tables of the series details page are paginated and filtered"""
+        url = reverse("project_series", args=[self.project.id, self.series.id])
+
+        from ..views.series_views import SeriesDetailsView
+
+        original_paginate_by = SeriesDetailsView.paginate_by
+        SeriesDetailsView.paginate_by = 4
+        try:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context["nb_artifacts"], 11)
+            self.assertEqual(response.context["nb_revisions"], 11)
+            artifacts = list(response.context["artifacts"])
+            self.assertEqual(len(artifacts), 4)
+            self.assertIsNone(response.context["artifacts"].previous_url)
+
+            # next page of the artifacts
+            response = self.client.get(url + response.context["artifacts"].next_url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context["artifacts"]), 4)
+            self.assertTrue(set(response.context["artifacts"]).isdisjoint(artifacts))
+            self.assertIsNotNone(response.context["artifacts"].previous_url)
+
+            # filters
+            response = self.client.get(url, {"branch": "master"})
+            self.assertEqual(len(response.context["artifacts"]), 4)
+            self.assertEqual(
+                response.context["artifacts"].next_url.count("branch=master"), 1
+            )
+            self.assertEqual(len(response.context["revisions"]), 4)
+
+            response = self.client.get(url, {"documentation": "1"})
+            self.assertEqual(list(response.context["artifacts"]), [self.artifacts[3]])
+
+            response = self.client.get(url, {"revision": "rev5", "sort": "oldest"})
+            self.assertEqual(list(response.context["artifacts"]), [self.artifacts[5]])
+            self.assertEqual(len(response.context["revisions"]), 1)
+
+            # invalid cursor
+            response = self.client.get(url, {"artifacts_after": "not a cursor"})
+            self.assertEqual(response.status_code, 404)
+        finally:
+            SeriesDetailsView.paginate_by = original_paginate_by
+
+    def test_iterate_by_chunks(self):
+        queryset = Artifact.objects.filter(project=self.project)
+        expected = list(queryset.order_by("pk").values_list("pk", "md5hash"))
+        for chunk_size in (1, 3, 11, 20):
+            # one query per chunk, and one for detecting the end if the last chunk is
+            # full
+            with self.assertNumQueries(11 // chunk_size + 1):
+                rows = list(iterate_by_chunks(queryset, ["md5hash"], chunk_size))
+            self.assertEqual(rows, expected)
+
+    def test_series_artifacts_api(self):
+        """The artifacts of the API are streamed, with the selected fields and
+        filters"""
+        from ..views.series_views import APIGetSeriesArtifacts
+
+        url = reverse("api_get_artifacts", args=[self.project.id, self.series.id])
+
+        def get_artifacts(**parameters):
+            response = self.client.get(url, parameters)
+            self.assertEqual(response.status_code, 200)
+            return json.loads(b"".join(response.streaming_content).decode("utf-8"))[
+                "artifacts"
+            ]
+
+        original_chunk_size = APIGetSeriesArtifacts.chunk_size
+        APIGetSeriesArtifacts.chunk_size = 4
+        try:
+            artifacts = get_artifacts()
+            self.assertEqual(
+                artifacts,
+                dict(
+                    (str(art.pk), {"file": "blabla", "md5": art.md5hash})
+                    for art in self.artifacts
+                ),
+            )
+
+            artifacts = get_artifacts(fields="md5,revision,upload_date")
+            self.assertEqual(
+                artifacts[str(self.artifacts[0].pk)],
+                {"md5": "0", "revision": "rev0", "upload_date": None},
+            )
+            self.assertEqual(
+                artifacts[str(self.artifacts[5].pk)]["upload_date"][:19],
+                self.artifacts[5].upload_date.isoformat()[:19],
+            )
+
+            self.assertEqual(len(get_artifacts(branch="master")), 6)
+            self.assertEqual(
+                list(get_artifacts(revision="rev5")), [str(self.artifacts[5].pk)]
+            )
+            self.assertEqual(
+                len(
+                    get_artifacts(
+                        since=self.artifacts[5].upload_date.strftime(
+                            "%Y-%m-%dT%H:%M:%S"
+                        )
+                    )
+                ),
+                # uploaded during the last day, the artifacts without upload date are
+                # excluded
+                4,
+            )
+
+            # invalid parameters
+            for parameters in ({"fields": "md5,password"}, {"since": "yesterday"}):
+                response = self.client.get(url, parameters)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.has_header("ETag"))
+        finally:
+            APIGetSeriesArtifacts.chunk_size = original_chunk_size
@@ -0,0 +1,240 @@
+"""Regression tests on the number of queries needed by the permission checks"""
+
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import User, Group, AnonymousUser
+
+from ..models.projects import Project, ProjectSeries
+from ..models.authors import Author
+from ..models.revisions import Revision
+from ..models.artifacts import Artifact
+
+from contextlib import contextmanager
+import datetime
+
+
+class PermissionQueriesTest(TestCase):
+    def setUp(self):
+        self.administrator = User.objects.create_user(username="administrator")
+        self.viewer = User.objects.create_user(username="viewer")
+        self.member = User.objects.create_user(username="member")
+        self.other = User.objects.create_user(username="other")
+        self.superuser = User.objects.create_superuser(
+            username="superuser", email="s@s.fr", password="superuser"
+        )
+
+        self.group = Group.objects.create(name="group")
+        self.member.groups.add(self.group)
+
+        self.project = Project.objects.create(name="test_project")
+        self.project.administrators.add(self.administrator)
+        self.other_project = Project.objects.create(name="other_project")
+
+        self.author = Author.objects.create(
+            lastname="1", firstname="1f", email="1@1.fr", django_user=self.viewer
+        )
+
+        self.series = []
+        for index in range(3):
+            series = ProjectSeries.objects.create(
+                series="%d" % index,
+                project=self.project,
+                release_date=datetime.datetime.now(),
+            )
+            self.series.append(series)
+        self.series[0].is_public = True
+        self.series[0].save()
+        self.series[1].view_users.add(self.viewer)
+        self.series[1].perms_groups_artifacts_add.add(self.group)
+        self.series[2].perms_groups_artifacts_del.add(self.group)
+        self.series.append(
+            ProjectSeries.objects.create(
+                series="other",
+                project=self.other_project,
+                release_date=datetime.datetime.now(),
+            )
+        )
+
+        self.revisions = []
+        for series in self.series:
+            revision = Revision.objects.create(
+                revision="revision %d" % series.pk, project=series.project
+            )
+            artifact = Artifact.objects.create(
+                project=series.project,
+                revision=revision,
+                md5hash="%d" % series.pk,
+                artifactfile="blabla",
+            )
+            artifact.project_series.add(series)
+            self.revisions.append(revision)
+
+        self.users = [
+            AnonymousUser(),
+            self.administrator,
+            self.viewer,
+            self.member,
+            self.other,
+            self.superuser,
+        ]
+
+    @contextmanager
+    def assertAtMostOneQuery(self):
+        with CaptureQueriesContext(connection) as queries:
+            yield
+        self.assertLessEqual(len(queries), 1, [query["sql"] for query in queries])
+
+    def check_permissions(self, objects, permissions, batch_methods):
+        """Checks that each decision needs at most one query and that the batch variants
+        give the same result with at most one query"""
+        for user in self.users:
+            for permission, batch_method in zip(permissions, batch_methods):
+                expected = set()
+                for obj in objects:
+                    with self.assertAtMostOneQuery():
+                        if user.has_perm("code_doc." + permission, obj):
+                            expected.add(obj)
+
+                if batch_method is None:
+                    continue
+                queryset = type(objects[0]).objects.filter(
+                    pk__in=[obj.pk for obj in objects]
+                )
+                with self.assertAtMostOneQuery():
+                    result = set(getattr(queryset, batch_method)(user))
+                self.assertEqual(
+                    result, expected, "%s / %s" % (user.username, permission)
+                )
+
+    def test_project_permissions(self):
+        """Permissions on the projects"""
+        self.check_permissions(
+            [self.project, self.other_project],
+            [
+                "project_administrate",
+                "project_series_add",
+                "project_series_delete",
+                "project_artifact_add",
+            ],
+            ["administrated_by", "administrated_by", "administrated_by", None],
+        )
+
+        # the view permission does not need any query
+        with self.assertNumQueries(0):
+            self.assertTrue(self.other.has_perm("code_doc.project_view", self.project))
+
+    def test_series_permissions(self):
+        """Permissions on the series"""
+        self.check_permissions(
+            self.series,
+            [
+                "series_view",
+                "series_edit",
+                "series_artifact_add",
+                "series_artifact_delete",
+            ],
+            [
+                "visible_to",
+                "editable_by",
+                "artifact_addable_by",
+                "artifact_deletable_by",
+            ],
+        )
+
+    def test_revision_permissions(self):
+        """Permissions on the revisions"""
+        self.check_permissions(self.revisions, ["revision_view"], ["visible_to"])
+        self.assertEqual(
+            set(Revision.objects.visible_to(self.viewer)), set(self.revisions[:2])
+        )
+
+    def test_author_permissions(self):
+        """Permissions on the authors, the check does not need any query"""
+        other_author = Author.objects.create(
+            lastname="2", firstname="2f", email="2@2.fr"
+        )
+        for user in self.users:
+            for author in (self.author, other_author):
+                with self.assertNumQueries(0):
+                    decision = user.has_perm("code_doc.author_edit", author)
+                self.assertEqual(
+                    decision, user.is_superuser or author.django_user == user
+                )
+
+            with self.assertAtMostOneQuery():
+                editable = set(
+                    Author.objects.filter(
+                        pk__in=[self.author.pk, other_author.pk]
+                    ).editable_by(user)
+                )
+            self.assertEqual(
+                editable,
+                set(
+                    author
+                    for author in (self.author, other_author)
+                    if user.has_perm("code_doc.author_edit", author)
+                ),
+            )
+
+    def test_permissions_for(self):
+        """The permission matrix needs one query per type of object and permission"""
+        from django.template import Context, Template
+        from ..permissions import cache
+        from ..permissions.backend import CodedocPermissionBackend
+        from ..permissions.bulk import permissions_for
+
+        objects = self.series + self.revisions + [self.project, self.author]
+        perms = [
+            "code_doc.series_view",
+            "code_doc.series_artifact_add",
+            "code_doc.revision_view",
+            "code_doc.project_series_add",
+            "code_doc.author_edit",
+        ]
+
+        handlers = CodedocPermissionBackend.objects_permission_handlers
+        for user in self.users:
+            with CaptureQueriesContext(connection) as queries:
+                matrix = permissions_for(user, objects, perms)
+            self.assertLessEqual(len(queries), len(perms))
+
+            for obj in objects:
+                for perm in perms:
+                    if perm in handlers[type(obj)]:
+                        self.assertEqual(
+                            matrix.get(obj, perm), user.has_perm(perm, obj)
+                        )
+                    else:
+                        self.assertIsNone(matrix.get(obj, perm))
+
+        # the template tags read the matrix
+        matrix = permissions_for(
+            self.member, self.series, ["code_doc.series_artifact_add"]
+        )
+        template = Template(
+            "{% load button_add_with_permission %}"
+            "{% for series in all_series %}"
+            "{% button_add_artifact_with_permission user series %}"
+            "{% endfor %}"
+        )
+        context = Context(
+            {"all_series": self.series, "user": self.member, "permissions": matrix}
+        )
+        with self.assertNumQueries(0):
+            rendered = template.render(context)
+        self.assertEqual(rendered.count('disabled="disabled"'), len(self.series) - 1)
+
+        # the decisions populate the request cache
+        cache.activate()
+        try:
+            permissions_for(self.viewer, self.series, ["code_doc.series_view"])
+            with self.assertNumQueries(0):
+                self.assertTrue(
+                    self.viewer.has_perm("code_doc.series_view", self.series[1])
+                )
+                self.assertFalse(
+                    self.viewer.has_perm("code_doc.series_view", self.series[2])
+                )
+        finally:
+            cache.deactivate()
@@ -282,7 +282,7 @@ class ProjectSeriesArtifactTest(TestCase):
         )
         response = self.client.get(json_artifact_path)
 
-        dic_ids = json.loads(response.content)
+        dic_ids = json.loads(b"".join(response.streaming_content).decode("utf-8"))
         self.assertEquals(len(dic_ids), 1)
         self.assertEquals(len(dic_ids["artifacts"]), 1)
         self.assertIn(str(Artifact.objects.first().id), dic_ids["artifacts"])
@@ -220,8 +220,7 @@ class ProjectSeriesTest(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context["artifacts"]), 1)
-        self.assertEqual(len(response.context["revisions"]), 1)
-        self.assertIsNone(response.context["revisions"][0])
+        self.assertEqual(len(response.context["revisions"]), 0)
 
     def test_modal_add_user_view_access(self):
         """Test the access to the ModalAddUserView."""
@@ -102,6 +102,190 @@ class ProjectTest(TestCase):
 
         self.assertEqual(self.project.get_number_of_files(), 2)
 
+    def test_project_content_counters(self):
+        """The counters of the projects and series follow their content, and are
+        repaired by the recount command"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.core.management import call_command
+        from django.test import override_settings
+        from django.utils import timezone
+        from io import StringIO
+        import shutil
+        import tempfile
+
+        def counters(obj):
+            obj.refresh_from_db()
+            values = [obj.nb_artifacts, obj.nb_revisions, obj.total_size]
+            if isinstance(obj, Project):
+                values.append(obj.nb_series)
+            return values
+
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(MEDIA_ROOT=media_root):
+                series1 = ProjectSeries.objects.create(
+                    series="1", project=self.project, release_date=timezone.now()
+                )
+                series2 = ProjectSeries.objects.create(
+                    series="2", project=self.project, release_date=timezone.now()
+                )
+                revision = Revision.objects.create(revision="1", project=self.project)
+                self.assertEqual(counters(self.project), [0, 1, 0, 2])
+
+                outdated_series = ProjectSeries.objects.get(pk=series1.pk)
+
+                upload_date = timezone.now() - datetime.timedelta(days=1)
+                artifacts = []
+                for index, size in enumerate((10, 20)):
+                    artifact = Artifact.objects.create(
+                        project=self.project,
+                        revision=revision,
+                        md5hash=str(index),
+                        artifactfile=SimpleUploadedFile("file%d" % index, b"a" * size),
+                        upload_date=upload_date + datetime.timedelta(hours=index),
+                    )
+                    self.assertEqual(artifact.file_size, size)
+                    artifacts.append(artifact)
+
+                self.assertEqual(counters(self.project), [2, 1, 30, 2])
+                self.assertEqual(self.project.last_upload, artifacts[1].upload_date)
+
+                series1.artifacts.add(*artifacts)
+                artifacts[0].project_series.add(series2)
+                self.assertEqual(counters(series1), [2, 1, 30])
+                self.assertEqual(counters(series2), [1, 1, 10])
+
+                # saving outdated instances does not overwrite the counters
+                outdated_series.description_mk = "description"
+                outdated_series.save()
+                Project.objects.get(pk=self.project.pk).save()
+                self.project.save()
+                self.assertEqual(counters(series1), [2, 1, 30])
+                self.assertEqual(series1.description_mk, "description")
+                self.assertEqual(counters(self.project), [2, 1, 30, 2])
+                self.assertEqual(series1.last_upload, artifacts[1].upload_date)
+
+                # the clone does not send the m2m signals
+                clone = series1.clone("3")
+                self.assertEqual(counters(clone), [2, 1, 30])
+                self.assertEqual(counters(self.project), [2, 1, 30, 3])
+
+                series1.artifacts.remove(artifacts[1])
+                self.assertEqual(counters(series1), [1, 1, 10])
+                self.assertEqual(series1.last_upload, artifacts[0].upload_date)
+
+                artifacts[0].delete()
+                self.assertEqual(counters(series1), [0, 0, 0])
+                self.assertIsNone(series1.last_upload)
+                self.assertEqual(counters(series2), [0, 0, 0])
+                self.assertEqual(counters(self.project), [1, 1, 20, 3])
+
+                clone.delete()
+                self.assertEqual(counters(self.project)[3], 2)
+
+                # repairing the counters
+                Project.objects.update(nb_artifacts=10, total_size=0)
+                ProjectSeries.objects.update(nb_artifacts=10)
+                out = StringIO()
+                call_command("recount", stdout=out)
+                self.assertIn("1 project(s) and 2 series recounted", out.getvalue())
+                self.assertEqual(counters(self.project), [1, 1, 20, 2])
+                self.assertEqual(counters(series1), [0, 0, 0])
+
+                response = self.client.get(reverse("project_list"))
+                self.assertContains(response, "1 files (20")
+                self.assertContains(response, "2 series")
+        finally:
+            shutil.rmtree(media_root)
+
+    def test_project_content_counters_deltas(self):
+        """The deltas added to the counters give the same values as a recount, also
+        for the artifacts deleted together"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import override_settings
+        from django.utils import timezone
+        import shutil
+        import tempfile
+
+        def counters(queryset):
+            return list(
+                queryset.order_by("pk").values_list(
+                    "nb_artifacts", "nb_revisions", "total_size", "last_upload"
+                )
+            )
+
+        def check_counters():
+            projects = Project.objects.all()
+            series = ProjectSeries.objects.all()
+            values = counters(projects), counters(series)
+            projects.update_counters()
+            series.update_counters()
+            self.assertEqual((counters(projects), counters(series)), values)
+
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(MEDIA_ROOT=media_root):
+                series1, series2 = [
+                    ProjectSeries.objects.create(
+                        series=name, project=self.project, release_date=timezone.now()
+                    )
+                    for name in ("1", "2")
+                ]
+                revision1, revision2 = [
+                    Revision.objects.create(revision=name, project=self.project)
+                    for name in ("1", "2")
+                ]
+                upload_date = timezone.now() - datetime.timedelta(days=1)
+                artifacts = [
+                    Artifact.objects.create(
+                        project=self.project,
+                        revision=revision,
+                        md5hash=str(index),
+                        artifactfile=SimpleUploadedFile("file%d" % index, b"a" * index),
+                        upload_date=upload_date + datetime.timedelta(hours=index),
+                    )
+                    for index, revision in enumerate(
+                        (revision1, revision1, revision1, revision2, None)
+                    )
+                ]
+                check_counters()
+
+                series1.artifacts.add(*artifacts)
+                artifacts[0].project_series.add(series2)
+                series2.artifacts.add(artifacts[1], artifacts[3])
+                check_counters()
+
+                # the revision stays in the series until its last artifact is removed,
+                # the artifacts not in the series are ignored
+                artifacts[2].project_series.remove(series1)
+                check_counters()
+                series1.artifacts.remove(*artifacts[:3])
+                artifacts[4].project_series.clear()
+                check_counters()
+
+                # changes of the counted values of an artifact
+                artifacts[3].revision = revision1
+                artifacts[3].save()
+                check_counters()
+                artifacts[3].upload_date = upload_date
+                artifacts[3].save()
+                check_counters()
+
+                # the artifacts of the revision are deleted together
+                series1.artifacts.add(artifacts[0], artifacts[1])
+                revision1.delete()
+                check_counters()
+                self.assertEqual(
+                    counters(ProjectSeries.objects.all()),
+                    [(0, 0, 0, None), (0, 0, 0, None)],
+                )
+
+                series2.artifacts.add(artifacts[4])
+                series2.artifacts.clear()
+                check_counters()
+        finally:
+            shutil.rmtree(media_root)
+
     def test_project_get_repositories(self):
         """Checks that the details of the repositories appear on the project detail page"""
         project2 = Project.objects.create(name="test_project2")
@@ -122,6 +306,93 @@ class ProjectTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, repository, 2)
 
+    def test_project_icon_thumbnails(self):
+        """The dimensions of the icon are stored and its thumbnails generated on upload,
+        the icon is not read when displayed"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.template import Context, Template
+        from django.test import override_settings
+        from ..utils.thumbnails import get_thumbnail_path
+        from PIL import Image
+        import io
+        import shutil
+        import tempfile
+
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(MEDIA_ROOT=media_root):
+                content = io.BytesIO()
+                Image.new("RGB", (200, 100)).save(content, format="PNG")
+                self.project.icon = SimpleUploadedFile("icon.png", content.getvalue())
+                self.project.save()
+
+                icon_name = self.project.icon.name
+                self.assertEqual(
+                    (self.project.icon_width, self.project.icon_height), (200, 100)
+                )
+                for size in (32, 64, 128):
+                    thumbnail = Image.open(get_thumbnail_path(icon_name, size))
+                    self.assertEqual(thumbnail.size, (size, size // 2))
+
+                project = Project.objects.get(pk=self.project.pk)
+                template = Template(
+                    "{% load project_image %}{% project_image project 50 %}"
+                )
+                with self.assertNumQueries(0):
+                    rendered = template.render(Context({"project": project}))
+                self.assertIn(get_thumbnail_path(icon_name, 64, True), rendered)
+                self.assertIn('width="50" height="25"', rendered)
+                # the image has not been opened for reading its dimensions
+                self.assertFalse(hasattr(project.icon, "_dimensions_cache"))
+
+                # removing the icon removes the thumbnails
+                project.icon = None
+                project.save()
+                self.assertIsNone(project.icon_width)
+                self.assertFalse(os.path.exists(get_thumbnail_path(icon_name, 64)))
+        finally:
+            shutil.rmtree(media_root)
+
+    def test_project_description_cache(self):
+        """The rendered descriptions are cached, and populated on save"""
+        from django.template import Context, Template
+        from django.test import override_settings
+        from ..utils import cache
+        from ..utils.markdown_rendering import clear_local_cache, render_markdown
+        import markdown
+
+        description = "# Title\n\n```\nsome code\n```\n"
+        expected = markdown.markdown(
+            description, extensions=["codehilite", "toc", "fenced_code", "admonition"]
+        )
+
+        clear_local_cache()
+        cache.reset_statistics()
+
+        self.project.description_mk = description
+        self.project.save()
+        self.assertEqual(cache.get_statistics()["markdown"], {"hits": 0, "misses": 1})
+
+        template = Template("{% load markdown_filter %}{{ text|markd|safe }}")
+        self.assertEqual(template.render(Context({"text": description})), expected)
+        self.assertEqual(cache.get_statistics()["markdown"], {"hits": 1, "misses": 1})
+
+        # from the shared cache
+        clear_local_cache()
+        self.assertEqual(render_markdown(description), expected)
+        self.assertEqual(cache.get_statistics()["markdown"], {"hits": 2, "misses": 1})
+
+        # the key depends on the extensions
+        self.assertNotEqual(render_markdown(description, ("fenced_code",)), expected)
+        self.assertEqual(cache.get_statistics()["markdown"], {"hits": 2, "misses": 2})
+
+        with override_settings(CODEDOC_MARKDOWN_CACHE=None):
+            clear_local_cache()
+            self.assertEqual(render_markdown(description), expected)
+            self.assertEqual(
+                cache.get_statistics()["markdown"], {"hits": 2, "misses": 3}
+            )
+
 
 class ProjectViewTest(TestCase):
     def setUp(self):
@@ -240,6 +511,242 @@ class ProjectViewTest(TestCase):
         self.assertNotContains(response, artifact0.get_documentation_url())
         self.assertNotContains(response, artifact1.filename())
 
+    def test_series_visible_to(self):
+        """Checks that the series visibility filter follows the view permission rule"""
+        from django.contrib.auth.models import AnonymousUser, Group
+
+        group = Group.objects.create(name="group")
+        viewer = User.objects.create_user(username="viewer")
+        group_member = User.objects.create_user(username="group_member")
+        group_member.groups.add(group)
+        inactive = User.objects.create_user(username="inactive", is_active=False)
+        superuser = User.objects.create_superuser(
+            username="admin", email="a@a.fr", password="admin"
+        )
+
+        def create_series(name, **kwargs):
+            return ProjectSeries.objects.create(
+                series=name,
+                project=self.project,
+                release_date=datetime.datetime.now(),
+                **kwargs
+            )
+
+        public = create_series("public", is_public=True)
+        no_acl = create_series("no_acl")
+        view_user = create_series("view_user")
+        view_user.view_users.add(viewer, inactive)
+        view_group = create_series("view_group")
+        view_group.view_groups.add(group)
+        add_user = create_series("add_user")
+        add_user.perms_users_artifacts_add.add(viewer)
+        add_group = create_series("add_group")
+        add_group.perms_groups_artifacts_add.add(group)
+        delete_user = create_series("delete_user")
+        delete_user.perms_users_artifacts_del.add(viewer)
+
+        project2 = Project.objects.create(name="test_project2")
+        ProjectSeries.objects.create(
+            series="other", project=project2, release_date=datetime.datetime.now()
+        )
+
+        all_series = [
+            public,
+            no_acl,
+            view_user,
+            view_group,
+            add_user,
+            add_group,
+            delete_user,
+        ]
+        for user in (
+            AnonymousUser(),
+            self.first_user,
+            viewer,
+            group_member,
+            inactive,
+            superuser,
+        ):
+            with self.assertNumQueries(1):
+                visible = set(self.project.series.visible_to(user))
+            self.assertEqual(
+                visible,
+                set(s for s in all_series if s.has_user_series_view_permission(user)),
+            )
+
+        self.assertEqual(
+            set(ProjectSeries.objects.visible_to(viewer)), {public, view_user, add_user}
+        )
+        self.assertEqual(
+            set(ProjectSeries.objects.visible_to(group_member)),
+            {public, view_group, add_group},
+        )
+        self.assertEqual(set(ProjectSeries.objects.visible_to(inactive)), {public})
+
+    def test_series_access_table(self):
+        """Checks that the materialized access rights follow the permission changes"""
+        from django.contrib.auth.models import Group
+        from django.core.management import call_command
+        from ..models.projects import SeriesAccess
+
+        from io import StringIO
+
+        group = Group.objects.create(name="group")
+        member = User.objects.create_user(username="member")
+        member.groups.add(group)
+
+        series = ProjectSeries.objects.create(
+            series="series", project=self.project, release_date=datetime.datetime.now()
+        )
+
+        def get_access():
+            return set(
+                SeriesAccess.objects.filter(series=series).values_list(
+                    "user", "can_view", "can_add", "can_delete"
+                )
+            )
+
+        def check_rebuild():
+            current = set(
+                SeriesAccess.objects.values_list(
+                    "user", "series", "can_view", "can_add", "can_delete"
+                )
+            )
+            out = StringIO()
+            call_command("rebuild_series_access", stdout=out)
+            self.assertIn("%d access right(s) computed" % len(current), out.getvalue())
+            self.assertEqual(
+                current,
+                set(
+                    SeriesAccess.objects.values_list(
+                        "user", "series", "can_view", "can_add", "can_delete"
+                    )
+                ),
+            )
+
+        # the administrators of the project have all the rights
+        self.assertEqual(get_access(), {(self.first_user.pk, True, True, True)})
+
+        series.perms_groups_artifacts_add.add(group)
+        series.perms_users_artifacts_del.add(member)
+        self.assertEqual(
+            get_access(),
+            {(self.first_user.pk, True, True, True), (member.pk, True, True, True)},
+        )
+        check_rebuild()
+
+        # removing the user from the group
+        group.user_set.clear()
+        self.assertEqual(
+            get_access(),
+            {(self.first_user.pk, True, True, True), (member.pk, False, False, True)},
+        )
+
+        member.groups.add(group)
+        self.assertTrue(member.has_perm("code_doc.series_artifact_add", series))
+
+        # the saves keeping the status of the user do not recompute the rights
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            member.last_login = member.date_joined
+            member.save(update_fields=["last_login"])
+            member.first_name = "Member"
+            member.save()
+        self.assertFalse(
+            [
+                query
+                for query in context.captured_queries
+                if "seriesaccess" in query["sql"]
+            ]
+        )
+
+        # the permissions of the series do not apply to inactive users
+        member.is_active = False
+        member.save()
+        self.assertEqual(get_access(), {(self.first_user.pk, True, True, True)})
+        self.assertFalse(member.has_perm("code_doc.series_view", series))
+
+        member.is_active = True
+        member.save()
+        group.delete()
+        self.assertEqual(
+            get_access(),
+            {(self.first_user.pk, True, True, True), (member.pk, False, False, True)},
+        )
+
+        self.project.administrators.clear()
+        self.assertEqual(get_access(), {(member.pk, False, False, True)})
+
+        cloned = series.clone("cloned")
+        self.assertTrue(member.has_perm("code_doc.series_artifact_delete", cloned))
+        check_rebuild()
+
+        series.delete()
+        self.assertEqual(get_access(), set())
+
+    def test_series_last_updates(self):
+        """Checks the last update and last documentation of the series, computed with a
+        number of queries independent of the number of series"""
+        from django.utils import timezone
+        from ..models.projects import get_series_last_updates
+
+        now = timezone.now()
+
+        def create_series(name, nb_artifacts):
+            series = ProjectSeries.objects.create(
+                series=name,
+                project=self.project,
+                release_date=datetime.datetime.now(),
+                is_public=True,
+            )
+            for i in range(nb_artifacts):
+                artifact = Artifact.objects.create(
+                    project=self.project,
+                    md5hash="%s%d" % (name, i),
+                    artifactfile="blabla",
+                )
+                artifact.project_series.add(series)
+                # documentation on the even artifacts, without deflating anything
+                Artifact.objects.filter(pk=artifact.pk).update(
+                    upload_date=now - datetime.timedelta(days=nb_artifacts - i),
+                    is_documentation=(i % 2 == 0),
+                )
+            return series
+
+        def get_last_updates():
+            with self.assertNumQueries(2):
+                return get_series_last_updates(
+                    list(self.project.series.order_by("pk").with_last_update())
+                )
+
+        empty = create_series("empty", 0)
+        single = create_series("single", 1)
+        several = create_series("several", 4)
+
+        last_update = get_last_updates()
+        self.assertEqual(list(last_update), [empty, single, several])
+        self.assertEqual(last_update[empty], {})
+        self.assertEqual(
+            last_update[single],
+            {
+                "last_update": now - datetime.timedelta(days=1),
+                "last_doc": Artifact.objects.get(md5hash="single0"),
+            },
+        )
+        self.assertEqual(
+            last_update[several],
+            {
+                "last_update": now - datetime.timedelta(days=1),
+                "last_doc": Artifact.objects.get(md5hash="several2"),
+            },
+        )
+
+        for index in range(5):
+            create_series("other%d" % index, 2)
+        self.assertEqual(len(get_last_updates()), 8)
+
 
 class ProjectRepositoryTest(TestCase):
     def test_repository_unique_constraint(self):
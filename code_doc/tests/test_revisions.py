@@ -12,6 +12,7 @@ from django.test import Client
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from django.utils import timezone
 
 from ..models.projects import Project, ProjectSeries
 from ..models.artifacts import Artifact
@@ -452,6 +453,235 @@ class RevisionTest(TestCase):
         with self.assertRaises(Artifact.DoesNotExist):
             Artifact.objects.get(md5hash="324")
 
+    def test_revision_counters(self):
+        """Tests that the counters of the revisions follow the artifacts and their series"""
+        stable_series = ProjectSeries.objects.create(
+            series="stable", project=self.project, release_date=datetime.datetime.now()
+        )
+
+        art1 = Artifact.objects.create(
+            project=self.project,
+            revision=self.revision1,
+            md5hash="1",
+            artifactfile=self.test_file,
+        )
+        art2 = Artifact.objects.create(
+            project=self.project,
+            revision=self.revision1,
+            md5hash="2",
+            artifactfile=self.test_file,
+        )
+        self.revision1.refresh_from_db()
+        self.assertEqual(self.revision1.nb_artifacts, 2)
+        self.assertEqual(self.revision1.nb_series_references, 0)
+        self.assertEqual(self.revision1.get_all_referencing_series(), [])
+
+        art1.project_series.add(self.new_series, stable_series)
+        self.new_series.artifacts.add(art2)
+        self.revision1.refresh_from_db()
+        self.assertEqual(self.revision1.nb_series_references, 3)
+        self.assertEqual(
+            set(self.revision1.get_all_referencing_series()),
+            set([self.new_series, stable_series]),
+        )
+
+        # removing an artifact that is not in the series does not change anything
+        stable_series.artifacts.remove(art2)
+        self.revision1.refresh_from_db()
+        self.assertEqual(self.revision1.nb_series_references, 3)
+
+        # deleting a series removes its links
+        stable_series.delete()
+        self.revision1.refresh_from_db()
+        self.assertEqual(self.revision1.nb_series_references, 2)
+
+        # moving an artifact to another revision
+        art2.revision = self.revision2
+        art2.save()
+        self.revision1.refresh_from_db()
+        self.revision2.refresh_from_db()
+        self.assertEqual(self.revision1.nb_artifacts, 1)
+        self.assertEqual(self.revision1.nb_series_references, 1)
+        self.assertEqual(self.revision2.nb_artifacts, 1)
+        self.assertEqual(self.revision2.nb_series_references, 1)
+
+        art2.delete()
+        self.revision2.refresh_from_db()
+        self.assertEqual(self.revision2.nb_artifacts, 0)
+        self.assertEqual(self.revision2.nb_series_references, 0)
+
+    def test_revision_counters_repair(self):
+        """Tests the repair of the counters of the revisions"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        art1 = Artifact.objects.create(
+            project=self.project,
+            revision=self.revision1,
+            md5hash="1",
+            artifactfile=self.test_file,
+        )
+        art1.project_series.add(self.new_series)
+
+        Revision.objects.update(nb_artifacts=10, nb_series_references=0)
+
+        out = StringIO()
+        call_command("recount", stdout=out)
+        self.assertIn("3 revision(s) repaired", out.getvalue())
+
+        self.revision1.refresh_from_db()
+        self.assertEqual(self.revision1.nb_artifacts, 1)
+        self.assertEqual(self.revision1.nb_series_references, 1)
+        self.assertEqual(Revision.objects.recount(), 0)
+
+    def test_batched_series_addition_and_removal(self):
+        """Tests that the number of queries for adding/removing artifacts to a series does
+        not depend on the number of artifacts"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def get_query_counts(nb_artifacts, prefix):
+            series = ProjectSeries.objects.create(
+                series=prefix,
+                project=self.project,
+                release_date=datetime.datetime.now(),
+            )
+            artifacts = [
+                Artifact.objects.create(
+                    project=self.project,
+                    revision=self.revision1,
+                    md5hash="%s%d" % (prefix, i),
+                    artifactfile=self.test_file,
+                )
+                for i in range(nb_artifacts)
+            ]
+            # keeps the revision and the artifacts referenced
+            self.new_series.artifacts.add(*artifacts)
+
+            with CaptureQueriesContext(connection) as add_queries:
+                series.artifacts.add(*artifacts)
+            self.assertEqual(series.artifacts.count(), nb_artifacts)
+
+            with CaptureQueriesContext(connection) as remove_queries:
+                series.artifacts.remove(*artifacts[1:])
+            self.assertEqual(series.artifacts.count(), 1)
+
+            return len(add_queries), len(remove_queries)
+
+        self.assertEqual(get_query_counts(3, "small"), get_query_counts(30, "large"))
+
+    def test_bulk_promotion(self):
+        """Tests the promotion of all the artifacts of a series to another series"""
+        from django.db import IntegrityError
+
+        artifacts = []
+        for index, revision in enumerate(
+            (self.revision1, self.revision2, self.revision3)
+        ):
+            for i in range(2):
+                artifact = Artifact.objects.create(
+                    project=self.project,
+                    revision=revision,
+                    md5hash="%d%d" % (index, i),
+                    artifactfile=self.test_file,
+                )
+                artifacts.append(artifact)
+        self.new_series.artifacts.add(*artifacts)
+
+        stable_series = ProjectSeries.objects.create(
+            series="stable", project=self.project, release_date=datetime.datetime.now()
+        )
+
+        # only one revision
+        self.assertEqual(stable_series.promote_artifacts(self.new_series, "1"), 2)
+        self.assertEqual(
+            set(stable_series.artifacts.all()),
+            set(Artifact.objects.filter(revision=self.revision1)),
+        )
+
+        # only the revisions of the master branch, revision1 is already promoted
+        self.assertEqual(
+            stable_series.promote_artifacts(self.new_series, branch="master"), 4
+        )
+        self.assertEqual(stable_series.artifacts.count(), 6)
+        self.assertEqual(stable_series.promote_artifacts(self.new_series), 0)
+
+        self.revision1.refresh_from_db()
+        self.assertEqual(self.revision1.nb_series_references, 4)
+
+        # promotion to a series of another project is not allowed
+        project2 = Project.objects.create(name="project2")
+        series_p2 = ProjectSeries.objects.create(
+            series="12345", project=project2, release_date=datetime.datetime.now()
+        )
+        with self.assertRaises(IntegrityError):
+            series_p2.promote_artifacts(self.new_series)
+
+    def test_bulk_promotion_revision_limit(self):
+        """Tests that the revision limit of the target series applies to the promoted artifacts"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        for index, revision in enumerate(
+            (self.revision1, self.revision2, self.revision3)
+        ):
+            artifact = Artifact.objects.create(
+                project=self.project,
+                revision=revision,
+                md5hash="%d" % index,
+                artifactfile=self.test_file,
+            )
+            self.new_series.artifacts.add(artifact)
+
+        stable_series = ProjectSeries.objects.create(
+            series="stable",
+            project=self.project,
+            release_date=datetime.datetime.now(),
+            nb_revisions_to_keep=2,
+        )
+
+        out = StringIO()
+        call_command("promote_series", "test_project", "12345", "stable", stdout=out)
+        self.assertIn("3 artifact(s) promoted", out.getvalue())
+
+        self.assertEqual(
+            set(stable_series.get_all_revisions()),
+            set([self.revision2, self.revision3]),
+        )
+        # the source series is not affected
+        self.assertEqual(self.new_series.artifacts.count(), 3)
+
+    def test_bulk_promotion_view(self):
+        """Tests the promotion view and its permissions"""
+        user = User.objects.create_user(username="toto", password="titi")
+
+        artifact = Artifact.objects.create(
+            project=self.project,
+            revision=self.revision1,
+            md5hash="1",
+            artifactfile=self.test_file,
+        )
+        self.new_series.artifacts.add(artifact)
+
+        stable_series = ProjectSeries.objects.create(
+            series="stable", project=self.project, release_date=datetime.datetime.now()
+        )
+        path = reverse(
+            "project_series_promote", args=[self.project.id, stable_series.id]
+        )
+
+        self.assertTrue(self.client.login(username="toto", password="titi"))
+        response = self.client.post(path, {"source_series": self.new_series.id})
+        self.assertEqual(response.status_code, 401)
+
+        self.project.administrators.add(user)
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(path, {"source_series": self.new_series.id})
+        self.assertRedirects(response, stable_series.get_absolute_url())
+        self.assertIn(artifact, stable_series.artifacts.all())
+
     # @todo(Stephan):
     # These commented out tests need to be restructured once we can enforce
     # that only the latest N Revisions are kept.
@@ -954,6 +1184,130 @@ class RevisionTest(TestCase):
         self.assertEqual(other_series.artifacts.count(), 1)
         self.assertEqual(self.new_series.artifacts.count(), 1)
 
+    def test_series_clone(self):
+        """Tests that a cloned series shares the artifacts and copies the permissions"""
+        from django.contrib.auth.models import Group
+
+        user = User.objects.create_user(username="toto", password="titi")
+        group = Group.objects.create(name="group")
+        self.new_series.is_public = True
+        self.new_series.nb_revisions_to_keep = 3
+        self.new_series.save()
+        self.new_series.view_users.add(user)
+        self.new_series.perms_groups_artifacts_add.add(group)
+        self.new_series.perms_users_artifacts_del.add(user)
+
+        artifacts = [
+            Artifact.objects.create(
+                project=self.project,
+                revision=revision,
+                md5hash="%d" % index,
+                artifactfile=self.test_file,
+            )
+            for index, revision in enumerate((self.revision1, self.revision2, None))
+        ]
+        self.new_series.artifacts.add(*artifacts)
+
+        cloned = self.new_series.clone("cloned")
+
+        self.assertEqual(cloned.project, self.project)
+        self.assertTrue(cloned.is_public)
+        self.assertEqual(cloned.nb_revisions_to_keep, 3)
+        self.assertEqual(list(cloned.view_users.all()), [user])
+        self.assertEqual(list(cloned.view_groups.all()), [])
+        self.assertEqual(list(cloned.perms_groups_artifacts_add.all()), [group])
+        self.assertEqual(list(cloned.perms_users_artifacts_del.all()), [user])
+
+        # the artifacts are shared
+        self.assertEqual(set(cloned.artifacts.all()), set(artifacts))
+        self.assertEqual(Artifact.objects.count(), 3)
+        self.assertEqual(
+            set(artifacts[0].project_series.all()), {self.new_series, cloned}
+        )
+
+        self.revision1.refresh_from_db()
+        self.assertEqual(self.revision1.nb_series_references, 2)
+        self.assertEqual(Revision.objects.recount(), 0)
+
+        # removing the artifacts from the source does not delete them
+        self.new_series.artifacts.clear()
+        self.assertEqual(Artifact.objects.count(), 3)
+        self.assertTrue(Revision.objects.filter(pk=self.revision1.pk).exists())
+
+    def test_series_clone_number_of_queries(self):
+        """Tests that the number of queries for cloning a series does not depend on the
+        number of artifacts"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def get_query_count(nb_artifacts, prefix):
+            series = ProjectSeries.objects.create(
+                series=prefix,
+                project=self.project,
+                release_date=datetime.datetime.now(),
+            )
+            series.artifacts.add(
+                *[
+                    Artifact.objects.create(
+                        project=self.project,
+                        revision=self.revision1,
+                        md5hash="%s%d" % (prefix, i),
+                        artifactfile=self.test_file,
+                    )
+                    for i in range(nb_artifacts)
+                ]
+            )
+
+            with CaptureQueriesContext(connection) as queries:
+                cloned = series.clone(prefix + "_cloned")
+            self.assertEqual(cloned.artifacts.count(), nb_artifacts)
+            return len(queries)
+
+        self.assertEqual(get_query_count(3, "small"), get_query_count(30, "large"))
+
+    def test_series_details_number_of_queries(self):
+        """Tests that the number of queries of the series details page does not depend
+        on the number of artifacts and revisions"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.new_series.is_public = True
+        self.new_series.save()
+        uploader = User.objects.create_user(username="uploader", password="uploader")
+        url = reverse("project_series", args=[self.project.id, self.new_series.id])
+
+        def get_query_count(nb_revisions, prefix):
+            for index in range(nb_revisions):
+                revision = Revision.objects.create(
+                    revision="%s%d" % (prefix, index), project=self.project
+                )
+                for md5 in ("a", "b"):
+                    artifact = Artifact.objects.create(
+                        project=self.project,
+                        revision=revision,
+                        md5hash="%s%d%s" % (prefix, index, md5),
+                        artifactfile="blabla",
+                        uploaded_by=uploader,
+                        upload_date=timezone.now(),
+                    )
+                    artifact.project_series.add(self.new_series)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, uploader.username)
+            return response, len(queries)
+
+        response, small_query_count = get_query_count(2, "small")
+        self.assertEqual(len(response.context["revisions"]), 2)
+
+        response, large_query_count = get_query_count(10, "large")
+        self.assertEqual(small_query_count, large_query_count)
+        self.assertEqual(len(response.context["artifacts"]), 24)
+        self.assertEqual(len(response.context["revisions"]), 12)
+        for revision in response.context["revisions"]:
+            self.assertEqual(revision.artifacts_count, 2)
+
 
 class RevisionViewTest(TestCase):
     """ Tests for the revision view. """
@@ -1175,3 +1529,59 @@ class RevisionViewTest(TestCase):
 
         self.assertContains(response, self.series1.series)
         self.assertContains(response, self.series2.series)
+
+    def test_project_revision_view_number_of_queries(self):
+        """Tests that the number of queries of the revision page does not depend on the
+        number of artifacts and series of the revision"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def get_response(nb_artifacts, nb_series, prefix):
+            revision = Revision.objects.create(revision=prefix, project=self.project)
+            all_series = [
+                ProjectSeries.objects.create(
+                    series="%s%d" % (prefix, index),
+                    project=self.project,
+                    release_date=datetime.datetime.now(),
+                    is_public=index > 0,
+                )
+                for index in range(nb_series)
+            ]
+            artifacts = [
+                Artifact.objects.create(
+                    project=self.project,
+                    revision=revision,
+                    md5hash="%s%d" % (prefix, index),
+                    artifactfile="blabla",
+                    uploaded_by=self.first_user,
+                    upload_date=timezone.now(),
+                )
+                for index in range(nb_artifacts)
+            ]
+
+            # each artifact is in two consecutive series, the first series being private
+            for index, series in enumerate(all_series):
+                series.artifacts.add(
+                    *[
+                        artifact
+                        for artifact_index, artifact in enumerate(artifacts)
+                        if artifact_index % nb_series
+                        in (index, (index + 1) % nb_series)
+                    ]
+                )
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    reverse(self.path, args=[self.project.id, revision.id])
+                )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context["series"]), nb_series - 1)
+            self.assertEqual(response.context["nb_artifacts"], nb_artifacts)
+            for artifact in response.context["artifacts"]:
+                self.assertNotIn(all_series[0], artifact.visible_series)
+                self.assertIn(len(artifact.visible_series), (1, 2))
+            for series in response.context["series"]:
+                self.assertEqual(series.artifacts_count, series.artifacts.count())
+            return len(queries)
+
+        self.assertEqual(get_response(10, 3, "small"), get_response(300, 30, "large"))
@@ -0,0 +1,99 @@
+"""Tests on the search of the users and groups for the autocompletion"""
+
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import User, Group
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+
+from ..models.search import UserSearchToken, GroupSearchToken
+from ..utils import cache
+
+from io import StringIO
+
+
+@override_settings(CODEDOC_SEARCH_CACHE="default")
+class SearchTest(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        cache.reset_statistics()
+
+        self.john = User.objects.create_user(
+            username="john.doe", first_name="John", last_name="Doe"
+        )
+        self.jo = User.objects.create_user(username="jo")
+        self.mary = User.objects.create_user(
+            username="mary", first_name="Mary", last_name="Johnson"
+        )
+        self.developers = Group.objects.create(name="developers")
+        self.devops = Group.objects.create(name="Dev-Ops")
+
+    def get_values(self, url_name, term):
+        response = self.client.get(
+            reverse(url_name), {"term": term}, HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data[-1], {"success": True})
+        return [entry["value"] for entry in data[:-1]]
+
+    def test_users(self):
+        """The users are searched on the prefixes of their names, ranked on the
+        matching names"""
+        self.assertEqual(
+            self.get_values("api_usernames", "jo"), ["jo", "john.doe", "mary"]
+        )
+        self.assertEqual(self.get_values("api_usernames", "JOHN"), ["john.doe", "mary"])
+        self.assertEqual(self.get_values("api_usernames", "doe"), ["john.doe"])
+        self.assertEqual(self.get_values("api_usernames", "john d"), ["john.doe"])
+        self.assertEqual(self.get_values("api_usernames", "ohn"), [])
+        self.assertEqual(self.get_values("api_usernames", " "), [])
+
+        with self.settings(CODEDOC_SEARCH_CACHE=None):
+            self.assertEqual(
+                UserSearchToken.objects.search("jo", 2), ["jo", "john.doe"]
+            )
+
+    def test_groups(self):
+        self.assertEqual(
+            self.get_values("api_groupnames", "dev"), ["Dev-Ops", "developers"]
+        )
+        self.assertEqual(self.get_values("api_groupnames", "ops"), ["Dev-Ops"])
+
+    def test_maintenance(self):
+        """The tokens and the cached results follow the changes of the users"""
+        self.assertEqual(self.get_values("api_usernames", "smith"), [])
+        self.assertEqual(self.get_values("api_usernames", "smith"), [])
+        self.assertEqual(cache.get_hit_ratio("search"), 0.5)
+
+        self.jo.last_name = "Smith"
+        self.jo.save()
+        self.assertEqual(self.get_values("api_usernames", "smith"), ["jo"])
+
+        # the tokens are not recomputed when saving the other fields
+        self.jo.last_login = self.jo.date_joined
+        with CaptureQueriesContext(connection) as context:
+            self.jo.save(update_fields=["last_login"])
+        self.assertFalse(
+            [
+                query
+                for query in context.captured_queries
+                if "searchtoken" in query["sql"]
+            ]
+        )
+
+        self.jo.delete()
+        self.assertEqual(self.get_values("api_usernames", "smith"), [])
+
+        self.devops.name = "operations"
+        self.devops.save()
+        self.assertEqual(self.get_values("api_groupnames", "dev"), ["developers"])
+
+        # rebuild of the tables
+        UserSearchToken.objects.all().delete()
+        GroupSearchToken.objects.all().delete()
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.get_values("api_usernames", "john"), ["john.doe", "mary"])
+        self.assertEqual(self.get_values("api_groupnames", "op"), ["operations"])
@@ -183,3 +183,54 @@ class UserAuthorLinkTest(TestCase):
 
         # None of the previous creations should have created an Author
         self.assertEqual(old_author_count, new_author_count)
+
+    def test_author_avatars(self):
+        """The avatar details are stored on the authors, rendering the avatars of loaded
+        authors does not need any query nor image reading"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.template import Context, Template
+        from django.test import override_settings
+        from ..models.authors import get_avatar_color, get_gravatar_hash
+        from ..utils.thumbnails import get_thumbnail_path
+        from PIL import Image
+        import io
+        import os
+        import shutil
+        import tempfile
+
+        gravatar_author = Author.objects.create(
+            lastname="1", firstname="1f", email="1@1.fr", gravatar_email=" Me@1.fr "
+        )
+        self.assertEqual(gravatar_author.avatar_color, get_avatar_color("1f1"))
+        self.assertEqual(gravatar_author.gravatar_hash, get_gravatar_hash("me@1.fr"))
+
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(MEDIA_ROOT=media_root):
+                content = io.BytesIO()
+                Image.new("RGB", (100, 100)).save(content, format="PNG")
+                image_author = Author.objects.create(
+                    lastname="2",
+                    firstname="2f",
+                    email="2@2.fr",
+                    image=SimpleUploadedFile("image.png", content.getvalue()),
+                )
+                image_name = image_author.image.name
+                self.assertTrue(os.path.exists(get_thumbnail_path(image_name, 32)))
+
+                authors = list(Author.objects.order_by("pk"))
+                template = Template(
+                    "{% load author_image %}"
+                    "{% for author in authors %}{% author_image author 32 %}{% endfor %}"
+                )
+                with self.assertNumQueries(0):
+                    rendered = template.render(Context({"authors": authors}))
+
+                self.assertIn(get_thumbnail_path(image_name, 32, True), rendered)
+                self.assertIn(gravatar_author.gravatar_hash, rendered)
+                # the author of the user has neither image nor gravatar
+                self.assertIn(self.user.author.avatar_color, rendered)
+                for author in authors:
+                    self.assertFalse(hasattr(author.image, "_dimensions_cache"))
+        finally:
+            shutil.rmtree(media_root)
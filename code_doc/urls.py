@@ -7,6 +7,7 @@ from .views import (
     author_views,
     artifact_views,
     revision_views,
+    api_views,
 )
 from code_doc.views import series_views
 
@@ -49,6 +50,12 @@ urlpatterns = [
         series_views.SeriesUpdateView.as_view(),
         name="project_series_edit",
     ),
+    # promoting the artifacts of another series to a particular series
+    url(
+        r"^series/(?P<project_id>\d+)/(?P<series_id>\d+)/promote/$",
+        series_views.SeriesPromoteView.as_view(),
+        name="project_series_promote",
+    ),
     # adding a revision to the project
     url(
         r"^series/(?P<project_id>\d+)/add/$",
@@ -89,6 +96,17 @@ urlpatterns = [
         artifact_views.ArtifactRemoveView.as_view(),
         name="project_artifacts_remove",
     ),
+    # files of the artifacts, served after the permission checks
+    url(
+        r"^artifacts/(?P<project_id>\d+)/(?P<series_id>\d+)/download/(?P<artifact_id>\d+)/$",
+        artifact_views.ArtifactDownloadView.as_view(),
+        name="project_artifacts_download",
+    ),
+    url(
+        r"^artifacts/(?P<project_id>\d+)/(?P<series_id>\d+)/doc/(?P<artifact_id>\d+)/(?P<path>.*)$",
+        artifact_views.ArtifactDocumentationView.as_view(),
+        name="project_artifacts_documentation",
+    ),
     url(
         r"^artifacts/api/(?P<project_id>\d+)/(?P<series_id>\w+)/$",
         series_views.APIGetSeriesArtifacts.as_view(),
@@ -100,6 +118,57 @@ urlpatterns = [
         series_views.SeriesDetailsViewShortcut.as_view(),
         name="project_shortcuts",
     ),
+    # REST API, before the revision ids API whose pattern would match its urls
+    url(
+        r"^api/v1/projects/$",
+        api_views.APIProjectListView.as_view(),
+        name="api_v1_project_list",
+    ),
+    url(
+        r"^api/v1/projects/(?P<object_id>\d+)/$",
+        api_views.APIProjectDetailView.as_view(),
+        name="api_v1_project",
+    ),
+    url(
+        r"^api/v1/series/$",
+        api_views.APISeriesListView.as_view(),
+        name="api_v1_series_list",
+    ),
+    url(
+        r"^api/v1/series/(?P<object_id>\d+)/$",
+        api_views.APISeriesDetailView.as_view(),
+        name="api_v1_series",
+    ),
+    url(
+        r"^api/v1/revisions/$",
+        api_views.APIRevisionListView.as_view(),
+        name="api_v1_revision_list",
+    ),
+    url(
+        r"^api/v1/revisions/(?P<object_id>\d+)/$",
+        api_views.APIRevisionDetailView.as_view(),
+        name="api_v1_revision",
+    ),
+    url(
+        r"^api/v1/branches/$",
+        api_views.APIBranchListView.as_view(),
+        name="api_v1_branch_list",
+    ),
+    url(
+        r"^api/v1/branches/(?P<object_id>\d+)/$",
+        api_views.APIBranchDetailView.as_view(),
+        name="api_v1_branch",
+    ),
+    url(
+        r"^api/v1/artifacts/$",
+        api_views.APIArtifactListView.as_view(),
+        name="api_v1_artifact_list",
+    ),
+    url(
+        r"^api/v1/artifacts/(?P<object_id>\d+)/$",
+        api_views.APIArtifactDetailView.as_view(),
+        name="api_v1_artifact",
+    ),
     url(
         r"^api/(?P<project_name>[\d\w\s-]+)/(?P<series_number>[\d\w\s-]+)/$",
         project_views.GetProjectRevisionIds.as_view(),
@@ -0,0 +1,121 @@
+"""Helpers for the caches shared between the processes of the server.
+
+The caches are optional: each of them is configured by a setting containing the alias
+of a cache of ``CACHES`` (any backend, locmem/file/database do not need an external
+service), the cache being disabled if the setting is not defined or ``None``.
+
+The entries are invalidated with *version counters*: the key of an entry contains the
+versions of the objects it depends on (eg. the series and the user of a permission),
+and changing an object bumps its version, which makes the entries stored before
+unreachable. No expiration time is needed for correctness, the stale entries are
+eventually evicted by the cache backend.
+
+The versions changed inside a transaction are bumped again when it is committed: until
+then, the concurrent requests still read the previous state from the database, and
+would store it under the new versions.
+
+The hits and misses of the caches are counted per process, see
+:py:func:`get_statistics` and :py:func:`get_hit_ratio`.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+import threading
+import time
+
+_statistics_lock = threading.Lock()
+_statistics = {}
+
+
+def get_shared_cache(setting_name):
+    """Returns the cache configured by the setting, None if disabled"""
+    alias = getattr(settings, setting_name, None)
+    if alias is None:
+        return None
+    return caches[alias]
+
+
+def _get_version_key(scope, pk):
+    return "code_doc:version:%s:%s" % (scope, pk)
+
+
+def _get_initial_version():
+    # a version lost (eviction, restart of the cache) should not be reset to a value
+    # used by the entries stored before
+    return int(time.time() * 1000000)
+
+
+def get_versions(cache, scopes):
+    """Returns the current versions of the objects
+
+    :param cache: the shared cache
+    :param scopes: a list of ``(scope, pk)`` identifying the objects, eg.
+      ``("series", 12)``
+    :returns: the list of versions, in the order of scopes
+    """
+    keys = [_get_version_key(scope, pk) for scope, pk in scopes]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _get_initial_version(), None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def _bump_versions(cache, scopes):
+    for scope, pk in scopes:
+        key = _get_version_key(scope, pk)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # not in the cache
+            cache.set(key, _get_initial_version(), None)
+
+
+def bump_versions(setting_name, scopes):
+    """Invalidates the entries depending on the objects, now and when the current
+    transaction (if any) is committed
+
+    :param setting_name: the setting configuring the shared cache
+    :param scopes: an iterable of ``(scope, pk)`` identifying the objects
+    """
+    cache = get_shared_cache(setting_name)
+    if cache is None:
+        return
+
+    scopes = list(scopes)
+    _bump_versions(cache, scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_versions(cache, scopes))
+
+
+def record_access(name, hit):
+    """Counts a hit or a miss of the cache name"""
+    with _statistics_lock:
+        counters = _statistics.setdefault(name, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+
+def get_statistics():
+    """Returns the hits and misses of the caches of this process, as a dictionary
+    ``{cache name: {"hits": int, "misses": int}}``"""
+    with _statistics_lock:
+        return dict((name, dict(counters)) for name, counters in _statistics.items())
+
+
+def get_hit_ratio(name):
+    """Returns the ratio of hits of the cache name in this process, None if the cache
+    has not been accessed"""
+    counters = get_statistics().get(name)
+    if not counters or not (counters["hits"] + counters["misses"]):
+        return None
+    return float(counters["hits"]) / (counters["hits"] + counters["misses"])
+
+
+def reset_statistics():
+    with _statistics_lock:
+        _statistics.clear()
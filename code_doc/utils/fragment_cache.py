@@ -0,0 +1,113 @@
+"""Cache of the rendered fragments of the templates.
+
+A fragment (see the ``cachedfragment`` template tag) is stored in the shared cache
+configured by the ``CODEDOC_FRAGMENT_CACHE`` setting, with a key made of
+
+* the versions of the objects the fragment depends on: a model instance, or a model
+  name (eg. ``"project"``) for a fragment depending on all the objects of the model,
+* the *facet* of the user (anonymous, authenticated or superuser), the fragments being
+  rendered the same way for all the users of a facet. The fragments depending on the
+  access rights of each user are stored per user instead.
+
+The versions are bumped by the signal handlers when the objects change (see
+:py:mod:`code_doc.signals.cache_handlers`), the entries stored before becoming
+unreachable. Inside a transaction, they are bumped again when it is committed: a
+concurrent request rendering the fragment from the previous state in the meantime
+stores it under a version that is then dropped. The hits and misses are counted
+under the name ``"fragments"``.
+"""
+
+from . import cache as shared_cache
+
+import hashlib
+
+#: the setting containing the alias of the shared cache of the fragments
+FRAGMENT_CACHE_SETTING = "CODEDOC_FRAGMENT_CACHE"
+
+# the scopes of the versions of the fragments are distinct from the ones of the
+# permissions, the two caches may be configured with the same alias
+_SCOPE_PREFIX = "fragment:"
+
+#: the scope value of the versions covering all the objects of a model
+ALL_OBJECTS = "all"
+
+
+def is_enabled():
+    """Returns True if the fragments are cached"""
+    return shared_cache.get_shared_cache(FRAGMENT_CACHE_SETTING) is not None
+
+
+def get_user_facet(user):
+    """Returns the facet of the user for the cached fragments"""
+    if user is None or not user.is_authenticated():
+        return "anonymous"
+    if user.is_superuser:
+        return "superuser"
+    return "authenticated"
+
+
+def get_scope(dependency):
+    """Returns the ``(scope, pk)`` of the version of dependency, a model instance or
+    a model name"""
+    if isinstance(dependency, str):
+        return (_SCOPE_PREFIX + dependency, ALL_OBJECTS)
+    return (_SCOPE_PREFIX + dependency._meta.model_name, dependency.pk)
+
+
+def get_fragment_key(name, dependencies, user, vary_on=(), per_user=False):
+    """Returns the key of the fragment in the shared cache, None if the cache is disabled
+
+    :param name: the name of the fragment
+    :param dependencies: the model instances or model names the fragment depends on
+    :param user: the user for which the fragment is rendered
+    :param vary_on: additional values the fragment depends on (eg. a page number)
+    :param per_user: True if the fragment depends on the access rights of the user,
+      the fragments of the authenticated users are then stored for each user
+    """
+    cache = shared_cache.get_shared_cache(FRAGMENT_CACHE_SETTING)
+    if cache is None:
+        return None
+
+    facet = get_user_facet(user)
+    scopes = [get_scope(dependency) for dependency in dependencies]
+    if per_user and facet == "authenticated":
+        facet = "user%d" % user.pk
+        scopes.append((_SCOPE_PREFIX + "user", user.pk))
+
+    versions = shared_cache.get_versions(cache, scopes)
+
+    hashed = hashlib.sha1()
+    for scope, version in zip(scopes, versions):
+        hashed.update(("%s:%s:%s\0" % (scope[0], scope[1], version)).encode("utf-8"))
+    for value in vary_on:
+        hashed.update(("%s\0" % value).encode("utf-8"))
+
+    return "code_doc:fragment:%s:%s:%s" % (name, facet, hashed.hexdigest())
+
+
+def get_fragment(key):
+    """Returns the rendered fragment, None if not in the cache"""
+    content = shared_cache.get_shared_cache(FRAGMENT_CACHE_SETTING).get(key)
+    shared_cache.record_access("fragments", content is not None)
+    return content
+
+
+def set_fragment(key, content):
+    shared_cache.get_shared_cache(FRAGMENT_CACHE_SETTING).set(key, content, None)
+
+
+def invalidate(dependencies):
+    """Invalidates the fragments depending on the objects, now and when the current
+    transaction is committed
+
+    :param dependencies: an iterable of ``(model name, pk)``, the fragments depending on
+      all the objects of the models being invalidated as well
+    """
+    scopes = set()
+    for model_name, pk in dependencies:
+        if pk is None:
+            continue
+        scopes.add((_SCOPE_PREFIX + model_name, pk))
+        scopes.add((_SCOPE_PREFIX + model_name, ALL_OBJECTS))
+
+    shared_cache.bump_versions(FRAGMENT_CACHE_SETTING, sorted(scopes, key=str))
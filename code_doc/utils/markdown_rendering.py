@@ -0,0 +1,106 @@
+"""Rendering of the Markdown descriptions, with a cache of the rendered HTML.
+
+The rendering (in particular the highlighting of the code blocks by Pygments) is
+expensive and the descriptions rarely change: the HTML is cached, keyed by a hash of the
+text and of the extensions, in two layers
+
+* a LRU cache in the memory of the process,
+* the cache shared between the processes configured by the ``CODEDOC_MARKDOWN_CACHE``
+  setting (see :py:mod:`code_doc.utils.cache`), if any.
+
+The key depending on the content only, the entries never need to be invalidated. The
+cache is populated when the descriptions are saved, and on a miss when rendered.
+"""
+
+from . import cache as shared_cache
+
+import collections
+import hashlib
+import logging
+import threading
+
+import markdown
+
+logger = logging.getLogger(__name__)
+
+#: the setting containing the alias of the shared cache of the rendered Markdown
+MARKDOWN_CACHE_SETTING = "CODEDOC_MARKDOWN_CACHE"
+
+#: the extensions used for rendering the descriptions
+MARKDOWN_EXTENSIONS = ("codehilite", "toc", "fenced_code", "admonition")
+
+#: the maximal number of entries of the in-process cache
+LOCAL_CACHE_SIZE = 256
+
+# changing the rendering should change this version, the entries of the shared cache
+# do not expire
+_CACHE_KEY_VERSION = 1
+
+
+class _LRUCache(object):
+    """A thread safe LRU dictionary"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.pop(key, None)
+            if value is not None:
+                self.entries[key] = value
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = value
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_local_cache = _LRUCache(LOCAL_CACHE_SIZE)
+
+
+def get_cache_key(text, extensions=MARKDOWN_EXTENSIONS):
+    """Returns the key of the HTML rendering text with extensions"""
+    hashed = hashlib.sha1()
+    hashed.update(",".join(extensions).encode("utf-8"))
+    hashed.update(b"\0")
+    hashed.update(text.encode("utf-8"))
+    return "code_doc:markdown:%d:%s" % (_CACHE_KEY_VERSION, hashed.hexdigest())
+
+
+def render_markdown(text, extensions=MARKDOWN_EXTENSIONS):
+    """Returns the HTML rendering of the Markdown text, from the cache if available"""
+    if text is None:
+        return text
+
+    key = get_cache_key(text, extensions)
+    html = _local_cache.get(key)
+    if html is not None:
+        shared_cache.record_access("markdown", True)
+        return html
+
+    cache = shared_cache.get_shared_cache(MARKDOWN_CACHE_SETTING)
+    if cache is not None:
+        html = cache.get(key)
+
+    shared_cache.record_access("markdown", html is not None)
+    if html is None:
+        html = markdown.markdown(text, extensions=list(extensions), safe_mode=False)
+        if cache is not None:
+            cache.set(key, html, None)
+
+    _local_cache.set(key, html)
+    return html
+
+
+def clear_local_cache():
+    """Empties the in-process cache"""
+    _local_cache.clear()
@@ -0,0 +1,221 @@
+"""Keyset (cursor) pagination of querysets.
+
+Contrary to the paginator of Django, the keyset pagination does not use ``OFFSET``: a
+page is selected by the values of the ordering fields of the last (or first) object of
+the adjacent page, the *cursor*, eg. ``WHERE (upload_date, id) < (<date>, <id>) ORDER
+BY upload_date DESC, id DESC LIMIT <page size>``. The cost of a page is bounded by its
+size whatever its position, and the pages do not shift when objects are added.
+
+The last ordering field should be unique (usually ``pk``) for the order to be total.
+The ``NULL`` values of the ordering fields are considered smaller than any other value.
+
+:py:func:`iterate_by_chunks` walks a whole queryset the same way, for streaming large
+results without loading them in memory.
+"""
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+
+import base64
+import json
+
+
+class KeysetPage(object):
+    """A page of objects returned by :py:meth:`KeysetPaginator.page`"""
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        #: the cursor of the next page, None if this is the last page
+        self.next_cursor = next_cursor
+        #: the cursor of the previous page, None if this is the first page
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return "<KeysetPage of %d objects>" % len(self)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator(object):
+    """Paginates a queryset on the values of its ordering fields
+
+    :param queryset: the queryset to paginate, possibly a ``values()`` queryset
+      including the ordering fields
+    :param ordering: the names of the ordering fields, prefixed with ``-`` for a
+      descending order, eg. ``("-upload_date", "-pk")``. The fields should be fields of
+      the model of the queryset, the last one being unique.
+    :param per_page: the maximal number of objects per page
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+        if not ordering:
+            raise ValueError("The keyset pagination needs at least one ordering field")
+
+        meta = queryset.model._meta
+        self.ordering = []
+        for name in ordering:
+            descending = name.startswith("-")
+            name = name.lstrip("-")
+            field = meta.pk if name == "pk" else meta.get_field(name)
+            self.ordering.append((name, field, descending))
+
+        last_field = self.ordering[-1][1]
+        if not (last_field.unique or last_field.primary_key):
+            raise ValueError(
+                "The last ordering field of the keyset pagination should be unique"
+            )
+
+    def _order(self, queryset, reverse):
+        expressions = []
+        for name, _, descending in self.ordering:
+            if descending != reverse:
+                expressions.append(F(name).desc(nulls_last=True))
+            else:
+                expressions.append(F(name).asc(nulls_first=True))
+        return queryset.order_by(*expressions)
+
+    def _filter_after(self, queryset, key, reverse):
+        """Keeps the objects after key in the order of the pagination (reversed if
+        reverse is True)"""
+        conditions = []
+        equal = Q()
+        for (name, field, descending), value in zip(self.ordering, key):
+            if descending != reverse:
+                if value is None:
+                    after = None
+                else:
+                    after = Q(**{name + "__lt": value})
+                    if field.null:
+                        after |= Q(**{name + "__isnull": True})
+            else:
+                if value is None:
+                    after = Q(**{name + "__isnull": False})
+                else:
+                    after = Q(**{name + "__gt": value})
+
+            if after is not None:
+                conditions.append(equal & after)
+
+            if value is None:
+                equal &= Q(**{name + "__isnull": True})
+            else:
+                equal &= Q(**{name: value})
+
+        if not conditions:
+            return queryset.none()
+
+        condition = conditions[0]
+        for current in conditions[1:]:
+            condition |= current
+        return queryset.filter(condition)
+
+    def _encode_cursor(self, obj):
+        values = []
+        for name, field, _ in self.ordering:
+            if isinstance(obj, dict):
+                value = obj[name]
+            else:
+                value = getattr(obj, field.attname)
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            values.append(value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode(
+            "ascii"
+        )
+
+    def _decode_cursor(self, cursor):
+        try:
+            values = json.loads(
+                base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            )
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError("wrong number of values")
+
+            return [
+                None if value is None else field.to_python(value)
+                for value, (_, field, _) in zip(values, self.ordering)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise InvalidPage("Invalid cursor %r" % cursor)
+
+    def page(self, after=None, before=None):
+        """Returns the page following the cursor after, or preceding the cursor before,
+        the first page if none of them is given
+
+        :raises InvalidPage: if the cursor is not valid
+        """
+        if after is not None and before is not None:
+            raise InvalidPage("The cursors after and before are mutually exclusive")
+
+        reverse = before is not None
+        cursor = before if reverse else after
+
+        queryset = self._order(self.queryset, reverse)
+        if cursor is not None:
+            queryset = self._filter_after(
+                queryset, self._decode_cursor(cursor), reverse
+            )
+
+        # one more object tells if there is a page after this one
+        object_list = list(queryset[: self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[: self.per_page]
+
+        if reverse:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, after is not None
+
+        next_cursor = None
+        previous_cursor = None
+        if object_list:
+            if has_next:
+                next_cursor = self._encode_cursor(object_list[-1])
+            if has_previous:
+                previous_cursor = self._encode_cursor(object_list[0])
+
+        return KeysetPage(object_list, self, next_cursor, previous_cursor)
+
+
+def iterate_by_chunks(queryset, fields, chunk_size):
+    """Iterates over the values of the fields of the objects of the queryset, in the
+    order of their primary key, reading at most chunk_size objects per query
+
+    :returns: an iterator over the tuples ``(pk, value of field, ...)``
+
+    Contrary to ``QuerySet.iterator``, the memory does not depend on the size of the
+    queryset whatever the database backend (some of them read all the rows at once).
+    """
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list("pk", *fields)[:chunk_size])
+        for row in rows:
+            yield row
+
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
@@ -0,0 +1,110 @@
+"""Prefix search of the users and groups, for the autocompletion of the forms.
+
+The searched values (eg. the username, first and last names of a user) are split in
+lower case *tokens* stored in an indexed table (see :py:class:`UserSearchToken
+<code_doc.models.search.UserSearchToken>`), maintained by the signals of the users and
+groups. A term matches the objects having, for each of its words, a token starting
+with the word. The prefixes are searched with ranges of tokens (``token >= word AND
+token < successor of word``), which use the index with all the database backends
+contrary to ``LIKE``.
+
+The results of the recent terms are kept in the cache configured by the setting
+``CODEDOC_SEARCH_CACHE`` for ``CODEDOC_SEARCH_CACHE_TIMEOUT`` seconds, and
+invalidated when a user or group changes.
+"""
+
+from django.conf import settings
+
+from . import cache
+
+import hashlib
+import re
+
+SEARCH_CACHE_SETTING = "CODEDOC_SEARCH_CACHE"
+
+#: the maximal length of the tokens, the longer ones are truncated
+MAX_TOKEN_LENGTH = 100
+
+_word_separators = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def get_words(value):
+    """Returns the lower case words of value"""
+    return [word for word in _word_separators.split(value.lower()) if word]
+
+
+def get_search_tokens(value):
+    """Returns the tokens of a searched value: the whole value and its words, in lower
+    case"""
+    value = value.strip().lower()
+    if not value:
+        return set()
+    tokens = set(get_words(value))
+    tokens.add(value)
+    return set(token[:MAX_TOKEN_LENGTH] for token in tokens)
+
+
+def compute_search_tokens(owners, searched_fields):
+    """Returns the tokens of the owners
+
+    :param owners: a queryset of the owners of the tokens (eg. the users)
+    :param searched_fields: the searched fields of the owners and their weights, as a
+      list of ``(field name, weight)``
+    :returns: a dictionary ``{(owner id, token): weight}``, the weight of a token
+      being the lowest of the fields containing it
+    """
+    fields = [field for field, _ in searched_fields]
+    weights = dict(searched_fields)
+
+    tokens = {}
+    for row in owners.values_list("pk", *fields):
+        for field, value in zip(fields, row[1:]):
+            for token in get_search_tokens(value or ""):
+                key = (row[0], token)
+                tokens[key] = min(tokens.get(key, weights[field]), weights[field])
+    return tokens
+
+
+def get_prefix_range(prefix):
+    """Returns the bounds ``(lower, upper)`` of the strings starting with prefix, the
+    upper bound being excluded"""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _get_key(scope, version, term, limit):
+    hashed = hashlib.md5(term.encode("utf-8")).hexdigest()
+    return "code_doc:search:%s:%s:%s:%d" % (scope, version, hashed, limit)
+
+
+def search(model, term, limit):
+    """Returns the names of the objects matching term, the best matches first
+
+    :param model: the model of the tokens, eg. :py:class:`UserSearchToken
+      <code_doc.models.search.UserSearchToken>`
+    :param term: the searched term
+    :param limit: the maximal number of results
+    """
+    term = " ".join(get_words(term))
+    if not term:
+        return []
+
+    scope = model._meta.model_name
+    shared_cache = cache.get_shared_cache(SEARCH_CACHE_SETTING)
+    if shared_cache is None:
+        return model.objects.search(term, limit)
+
+    (version,) = cache.get_versions(shared_cache, [("search", scope)])
+    key = _get_key(scope, version, term, limit)
+    results = shared_cache.get(key)
+    cache.record_access("search", results is not None)
+    if results is None:
+        results = model.objects.search(term, limit)
+        shared_cache.set(
+            key, results, getattr(settings, "CODEDOC_SEARCH_CACHE_TIMEOUT", 60)
+        )
+    return results
+
+
+def invalidate(model):
+    """Invalidates the cached results of the searches of the model of tokens"""
+    cache.bump_versions(SEARCH_CACHE_SETTING, [("search", model._meta.model_name)])
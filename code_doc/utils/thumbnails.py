@@ -0,0 +1,84 @@
+"""Pre-sized thumbnails of the images (project icons, author images).
+
+The thumbnails are generated once, when the image is uploaded, and stored under
+``MEDIA_ROOT/thumbnails/<size>/<name of the image>``. The templates then pick the
+smallest thumbnail at least as large as the displayed size (see
+:py:func:`get_thumbnail_name`), without opening the image.
+
+The thumbnails of the images uploaded before can be generated with the
+``generate_thumbnails`` management command.
+"""
+
+from django.conf import settings
+
+from PIL import Image
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+#: the folder of MEDIA_ROOT containing the thumbnails
+THUMBNAILS_DIRECTORY = "thumbnails"
+
+#: the sizes of the thumbnails (largest dimension, in pixels)
+THUMBNAIL_SIZES = (32, 64, 128)
+
+
+def get_thumbnail_path(name, size, without_media_root=False):
+    """Returns the location of the thumbnail of the image name for size"""
+    path = os.path.join(THUMBNAILS_DIRECTORY, str(size), name)
+    if without_media_root:
+        return path
+    return os.path.join(settings.MEDIA_ROOT, path)
+
+
+def get_thumbnail_name(name, size):
+    """Returns the image to display for the image name at size, relative to the
+    media root: the smallest thumbnail that is at least as large as size, or the image
+    itself if there is no such thumbnail (eg. not generated yet)"""
+    if size is None:
+        return name
+
+    for thumbnail_size in THUMBNAIL_SIZES:
+        if thumbnail_size >= int(size):
+            if os.path.exists(get_thumbnail_path(name, thumbnail_size)):
+                return get_thumbnail_path(name, thumbnail_size, without_media_root=True)
+            break
+
+    return name
+
+
+def generate_thumbnails(name):
+    """Generates the thumbnails of the image name (relative to the media root)
+
+    :returns: True if the thumbnails have been generated, False if the image cannot be
+      read
+    """
+    try:
+        image = Image.open(os.path.join(settings.MEDIA_ROOT, name))
+        image.load()
+    except (IOError, OSError) as e:
+        logger.error("[thumbnails] cannot read the image %s: %s", name, e)
+        return False
+
+    for size in THUMBNAIL_SIZES:
+        path = get_thumbnail_path(name, size)
+        directory = os.path.dirname(path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size), Image.LANCZOS)
+        thumbnail.save(path, format=image.format)
+
+    logger.debug("[thumbnails] thumbnails of %s generated", name)
+    return True
+
+
+def delete_thumbnails(name):
+    """Removes the thumbnails of the image name"""
+    for size in THUMBNAIL_SIZES:
+        path = get_thumbnail_path(name, size)
+        if os.path.exists(path):
+            os.remove(path)
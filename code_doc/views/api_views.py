@@ -0,0 +1,208 @@
+"""Read-only REST API over the projects, series, revisions, branches and artifacts.
+
+Each resource has a list (eg. ``api/v1/series/``) and a detail (eg.
+``api/v1/series/<id>/``) endpoint, both answering compact JSON objects made of the
+fields selected by the parameter ``fields`` (see :py:class:`APIFieldsForm
+<code_doc.forms.APIFieldsForm>`). The lists are paginated on the id of the objects
+with a :py:class:`KeysetPaginator <code_doc.utils.pagination.KeysetPaginator>`::
+
+  {"results": [{"id": 1, ...}, ...], "next": <url or null>, "previous": <url or null>}
+
+The objects are filtered on the permissions of the user in the query reading them
+(``visible_to`` methods of the querysets), a page being read with a single query
+whatever its position in the list.
+"""
+
+from django.core.paginator import InvalidPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views.generic.base import View
+
+from ..forms import (
+    ProjectAPIForm,
+    SeriesAPIForm,
+    RevisionAPIForm,
+    BranchAPIForm,
+    ArtifactAPIForm,
+)
+from ..models.projects import Project, ProjectSeries
+from ..models.revisions import Revision, Branch
+from ..models.artifacts import Artifact
+from ..utils.pagination import KeysetPaginator
+
+
+class APIViewBase(View):
+    """Base of the views of the REST API"""
+
+    #: the model of the objects of the resource
+    model = None
+
+    #: the form of the parameters, a subclass of :py:class:`APIListForm
+    #: <code_doc.forms.APIListForm>`
+    form_class = None
+
+    def get_queryset(self):
+        """Returns the objects visible to the user"""
+        return self.model.objects.visible_to(self.request.user)
+
+    def get_form(self):
+        form = self.form_class(self.request.GET)
+        form.is_valid()
+        return form
+
+    def get_values(self, queryset, form):
+        """Returns the values queryset of the fields selected by the form, with the
+        id of the objects, and a function converting its rows to the returned
+        objects"""
+        names, model_fields = form.get_api_fields()
+        values = queryset.values(
+            "id", *[field for field in model_fields if field != "id"]
+        )
+
+        def to_result(row):
+            return dict((name, row[field]) for name, field in zip(names, model_fields))
+
+        return values, to_result
+
+    def render_json(self, data, status=200):
+        return JsonResponse(
+            data,
+            status=status,
+            encoder=DjangoJSONEncoder,
+            json_dumps_params={"separators": (",", ":")},
+        )
+
+    def render_errors(self, errors):
+        return self.render_json({"errors": errors}, status=400)
+
+
+class APIListView(APIViewBase):
+    """A page of the list of the objects of a resource, the parameter ``limit``
+    giving the size of the page and ``after``/``before`` the cursors of the adjacent
+    pages"""
+
+    # the default and maximal number of objects per page
+    paginate_by = 100
+    max_paginate_by = 1000
+
+    def _get_page_url(self, parameter, cursor, opposite_parameter):
+        if cursor is None:
+            return None
+
+        query = self.request.GET.copy()
+        query.pop(opposite_parameter, None)
+        query[parameter] = cursor
+        return self.request.build_absolute_uri("?" + query.urlencode())
+
+    def get(self, request, *args, **kwargs):
+        form = self.get_form()
+        if form.errors:
+            return self.render_errors(form.errors)
+
+        values, to_result = self.get_values(
+            form.filter_queryset(self.get_queryset()), form
+        )
+
+        per_page = min(
+            form.cleaned_data.get("limit") or self.paginate_by, self.max_paginate_by
+        )
+        paginator = KeysetPaginator(values, ("id",), per_page)
+        try:
+            page = paginator.page(
+                after=form.cleaned_data.get("after") or None,
+                before=form.cleaned_data.get("before") or None,
+            )
+        except InvalidPage as e:
+            return self.render_errors({"__all__": [str(e)]})
+
+        return self.render_json(
+            {
+                "results": [to_result(row) for row in page],
+                "next": self._get_page_url("after", page.next_cursor, "before"),
+                "previous": self._get_page_url("before", page.previous_cursor, "after"),
+            }
+        )
+
+
+class APIDetailView(APIViewBase):
+    """The object of a resource, 404 if the user is not allowed to view it"""
+
+    def get(self, request, *args, **kwargs):
+        form = self.get_form()
+        if form.errors:
+            return self.render_errors(form.errors)
+
+        values, to_result = self.get_values(
+            self.get_queryset().filter(pk=kwargs["object_id"]), form
+        )
+        rows = list(values)
+        if not rows:
+            return self.render_json(
+                {"errors": {"__all__": ["Object not found"]}}, status=404
+            )
+        return self.render_json(to_result(rows[0]))
+
+
+class APIProjectMixin(object):
+    model = Project
+    form_class = ProjectAPIForm
+
+
+class APISeriesMixin(object):
+    model = ProjectSeries
+    form_class = SeriesAPIForm
+
+
+class APIRevisionMixin(object):
+    model = Revision
+    form_class = RevisionAPIForm
+
+
+class APIBranchMixin(object):
+    model = Branch
+    form_class = BranchAPIForm
+
+
+class APIArtifactMixin(object):
+    model = Artifact
+    form_class = ArtifactAPIForm
+
+
+class APIProjectListView(APIProjectMixin, APIListView):
+    pass
+
+
+class APIProjectDetailView(APIProjectMixin, APIDetailView):
+    pass
+
+
+class APISeriesListView(APISeriesMixin, APIListView):
+    pass
+
+
+class APISeriesDetailView(APISeriesMixin, APIDetailView):
+    pass
+
+
+class APIRevisionListView(APIRevisionMixin, APIListView):
+    pass
+
+
+class APIRevisionDetailView(APIRevisionMixin, APIDetailView):
+    pass
+
+
+class APIBranchListView(APIBranchMixin, APIListView):
+    pass
+
+
+class APIBranchDetailView(APIBranchMixin, APIDetailView):
+    pass
+
+
+class APIArtifactListView(APIArtifactMixin, APIListView):
+    pass
+
+
+class APIArtifactDetailView(APIArtifactMixin, APIDetailView):
+    pass
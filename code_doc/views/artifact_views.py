@@ -1,15 +1,19 @@
-from django.http import HttpResponse
+from django.http import HttpResponse, Http404
 from django.db import transaction, IntegrityError
+from django.views.generic.base import View
 from django.views.generic.edit import CreateView, DeleteView
+from django.core.exceptions import SuspiciousFileOperation
 from django.core.urlresolvers import reverse
+from django.utils._os import safe_join
 
 import logging
 
 from ..models.projects import Project, ProjectSeries
 from ..models.revisions import Branch, Revision
-from ..models.artifacts import Artifact
+from ..models.artifacts import Artifact, get_deflation_directory
 from ..forms import ArtifactEditionForm
 from .permission_helpers import PermissionOnObjectViewMixin
+from .sendfile_helpers import sendfile
 
 # logger for this file
 logger = logging.getLogger(__name__)
@@ -152,3 +156,48 @@ class ArtifactRemoveView(ArtifactAccessViewBase, DeleteView):
     permissions_on_object = ("code_doc.series_artifact_remove",)
     template_name = "code_doc/artifacts/artifact_remove.html"
     pk_url_kwarg = "artifact_id"
+
+
+class ArtifactFileViewBase(ArtifactAccessViewBase, View):
+    """Base of the views sending the files of an artifact to the users allowed to view
+    the series of the url, see :py:func:`sendfile
+    <code_doc.views.sendfile_helpers.sendfile>`"""
+
+    permissions_on_object = ("code_doc.series_view",)
+    pk_url_kwarg = "artifact_id"
+
+    def get_queryset(self):
+        # the artifact should belong to the series on which the permission is checked
+        return Artifact.objects.filter(
+            project=self.kwargs["project_id"], project_series=self.kwargs["series_id"]
+        )
+
+
+class ArtifactDownloadView(ArtifactFileViewBase):
+    """Downloads the file of an artifact"""
+
+    def get(self, request, *args, **kwargs):
+        artifact = self.get_object()
+        return sendfile(
+            request, artifact.full_path_name(), attachment_filename=artifact.filename()
+        )
+
+
+class ArtifactDocumentationView(ArtifactFileViewBase):
+    """Displays a file of the deflated documentation of an artifact, its entry file if
+    no path is given"""
+
+    def get(self, request, *args, **kwargs):
+        artifact = self.get_object()
+        if not artifact.is_documentation:
+            raise Http404
+
+        path = kwargs["path"] or artifact.documentation_entry_file
+        if not path:
+            raise Http404
+        try:
+            # the path should not leave the documentation of the artifact
+            full_path = safe_join(get_deflation_directory(artifact), path)
+        except SuspiciousFileOperation:
+            raise Http404
+        return sendfile(request, full_path)
@@ -13,6 +13,7 @@ import logging
 from ..models.projects import Project
 from ..models.authors import Author
 from ..forms import AuthorForm
+from ..permissions.bulk import permissions_for
 from .permission_helpers import PermissionOnObjectViewMixin
 
 # logger for this file
@@ -47,6 +48,9 @@ def detail_author(request, author_id):
             "author": author,
             "user": request.user,
             "coauthor_list": coauthor_list,
+            "permissions": permissions_for(
+                request.user, [author], ["code_doc.author_edit"]
+            ),
         },
     )
 
@@ -0,0 +1,73 @@
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from calendar import timegm
+import hashlib
+
+
+def conditional_response(request, render, etag_parts=None, last_modified=None):
+    """Returns a 304 (not modified) response if the validators match the conditional
+    headers of the request (``If-None-Match``, ``If-Modified-Since``), the response
+    returned by render otherwise. The validators are set on the successful responses.
+
+    :param render: a callable returning the full response
+    :param etag_parts: the values identifying the version of the response, hashed
+      into the ETag
+    :param last_modified: the modification date of the response, should only be given
+      if the response does not depend on the user
+    """
+    etag = None
+    if etag_parts is not None:
+        hashed = hashlib.md5(":".join(str(part) for part in etag_parts).encode("utf-8"))
+        etag = quote_etag(hashed.hexdigest())
+
+    timestamp = None
+    if last_modified is not None:
+        timestamp = timegm(last_modified.utctimetuple())
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+        if not 200 <= response.status_code < 300:
+            # the errors are not cached by the clients
+            return response
+
+    if etag is not None and not response.has_header("ETag"):
+        response["ETag"] = etag
+    if timestamp is not None and not response.has_header("Last-Modified"):
+        response["Last-Modified"] = http_date(timestamp)
+    return response
+
+
+class ConditionalResponseMixin(object):
+    """Answers the conditional requests of a detail view before building its context.
+
+    The validators are computed from the object of the view, read with a single query
+    by ``get_object``, see :py:meth:`get_etag_parts` and :py:meth:`get_last_modified`.
+    """
+
+    def get_etag_parts(self):
+        """Returns the values identifying the version of the response, None for no
+        ETag"""
+        return None
+
+    def get_last_modified(self):
+        """Returns the modification date of the response, None for no Last-Modified"""
+        return None
+
+    def get_user_etag_parts(self):
+        """Returns the values identifying the user, for the pages depending on the
+        user (eg. the navigation bar)"""
+        user = self.request.user
+        return (user.pk, user.is_superuser) if user.is_authenticated() else (None,)
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+
+        def render():
+            context = self.get_context_data(object=self.object)
+            return self.render_to_response(context)
+
+        return conditional_response(
+            request, render, self.get_etag_parts(), self.get_last_modified()
+        )
@@ -7,52 +7,41 @@ from django.views.generic import TemplateView
 from django.contrib.auth.models import User, Group
 from django.views.generic.edit import FormView
 from django.core.urlresolvers import reverse
-from django.db.models import Q
+from django.db.models import Count
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.shortcuts import get_object_or_404
+from django.utils.functional import SimpleLazyObject
 
 import os
 import logging
 
 from ..models.projects import Project, ProjectSeries
 from ..models.models import Topic
+from ..models.search import UserSearchToken, GroupSearchToken
+from ..utils import search
 from ..forms import ModalAddUserForm, ModalAddGroupForm
 
 logger = logging.getLogger(__name__)
 
 
-def index(request):
-    """Front page"""
-
-    nb_columns = 4
-    max_in_column = 3  # 5 project max in a column
-
-    projects_list = Project.objects.order_by("name")
-    topics_list = (
-        Topic.objects.filter(project__in=projects_list).distinct().order_by("name")
-    )
-
-    context = {"projects_list": projects_list, "topics_list": topics_list}
-
-    context["size_row"] = 12 // nb_columns
-
-    current_project_list = [i for i in projects_list]  # copy
-    list_project_per_column = []
+def _split_in_lines(objects, nb_columns, max_in_column):
+    """Distributes the objects in nb_columns columns of at most max_in_column objects,
+    and returns the lines of the columns (the missing elements being None)"""
+    current_list = list(objects)  # copy
+    list_per_column = []
 
     for i in range(nb_columns):
-        current_max_len = min(max_in_column, len(current_project_list))
-        current_chunk = (
-            current_project_list[:current_max_len] if current_max_len else []
-        )
-        current_project_list = current_project_list[current_max_len:]
-        list_project_per_column.append(current_chunk)
+        current_max_len = min(max_in_column, len(current_list))
+        current_chunk = current_list[:current_max_len] if current_max_len else []
+        current_list = current_list[current_max_len:]
+        list_per_column.append(current_chunk)
 
     # transpose the list
-    list_project_per_line = []
+    list_per_line = []
     for current_line_index in range(max_in_column):
         current_line = []
         has_some = False
-        for current_column in list_project_per_column:
+        for current_column in list_per_column:
             element_to_add = (
                 current_column[current_line_index]
                 if len(current_column) > current_line_index
@@ -64,40 +53,39 @@ def index(request):
         if not has_some:
             break
 
-        list_project_per_line.append(current_line)
+        list_per_line.append(current_line)
 
-    context["list_project_per_line"] = list_project_per_line
+    return list_per_line
 
-    # same for topics
-    current_topic_list = [i for i in topics_list]  # copy
-    list_topics_per_column = []
 
-    for i in range(nb_columns):
-        current_max_len = min(max_in_column, len(current_topic_list))
-        current_chunk = current_topic_list[:current_max_len] if current_max_len else []
-        current_topic_list = current_topic_list[current_max_len:]
-        list_topics_per_column.append(current_chunk)
+def index(request):
+    """Front page
 
-    # transpose the list
-    list_topic_per_line = []
-    for current_line_index in range(max_in_column):
-        current_line = []
-        has_some = False
-        for current_column in list_topics_per_column:
-            element_to_add = (
-                current_column[current_line_index]
-                if len(current_column) > current_line_index
-                else None
-            )
-            has_some |= element_to_add is not None
-            current_line.append(element_to_add)
+    The lists are evaluated when rendered, they are not queried if the fragments of
+    the page are in the cache."""
 
-        if not has_some:
-            break
+    nb_columns = 4
+    max_in_column = 3  # 5 project max in a column
 
-        list_topic_per_line.append(current_line)
+    projects_list = Project.objects.order_by("name")
+    topics_list = (
+        Topic.objects.annotate(nb_projects=Count("project"))
+        .filter(nb_projects__gt=0)
+        .order_by("name")
+    )
 
-    context["list_topic_per_line"] = list_topic_per_line
+    context = {"projects_list": projects_list, "topics_list": topics_list}
+
+    context["size_row"] = 12 // nb_columns
+
+    context["list_project_per_line"] = SimpleLazyObject(
+        lambda: _split_in_lines(projects_list, nb_columns, max_in_column)
+    )
+
+    # same for topics
+    context["list_topic_per_line"] = SimpleLazyObject(
+        lambda: _split_in_lines(topics_list, nb_columns, max_in_column)
+    )
 
     return render(request, "code_doc/index.html", context)
 
@@ -127,7 +115,13 @@ def script(request):
 
 
 class JSONResponseUsernamesView(TemplateView):
-    """ View returning usernames in JSON format."""
+    """ View returning usernames in JSON format.
+
+    The users are searched on the prefixes of their username, first and last names,
+    see :py:mod:`code_doc.utils.search`."""
+
+    # the maximal number of returned users
+    max_results = 20
 
     def render_to_json_response(self, context):
         """
@@ -144,12 +138,8 @@ class JSONResponseUsernamesView(TemplateView):
 
         if request.is_ajax():
             q = request.GET.get("term", "")
-            query_all_users = User.objects.filter(
-                Q(username__contains=q.strip())
-                | Q(first_name__contains=q.strip())
-                | Q(last_name__contains=q.strip())
-            ).values_list("username")
-            context = [{"value": name} for name in query_all_users]
+            usernames = search.search(UserSearchToken, q, self.max_results)
+            context = [{"value": name} for name in usernames]
             success = True
 
         context.append({"success": success})
@@ -157,7 +147,13 @@ class JSONResponseUsernamesView(TemplateView):
 
 
 class JSONResponseGroupnamesView(TemplateView):
-    """ View returning group names in JSON format."""
+    """ View returning group names in JSON format.
+
+    The groups are searched on the prefixes of their name, see
+    :py:mod:`code_doc.utils.search`."""
+
+    # the maximal number of returned groups
+    max_results = 20
 
     def render_to_json_response(self, context):
         """
@@ -174,10 +170,8 @@ class JSONResponseGroupnamesView(TemplateView):
 
         if request.is_ajax():
             q = request.GET.get("term", "")
-            query_all_groups = Group.objects.filter(
-                name__contains=q.strip()
-            ).values_list("name")
-            context = [{"value": name} for name in query_all_groups]
+            group_names = search.search(GroupSearchToken, q, self.max_results)
+            context = [{"value": name} for name in group_names]
             success = True
 
         context.append({"success": success})
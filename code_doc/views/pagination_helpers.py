@@ -0,0 +1,49 @@
+from django.core.paginator import InvalidPage
+from django.http import Http404
+
+from ..utils.pagination import KeysetPaginator
+
+
+class KeysetPaginationMixin(object):
+    """Paginates the tables of a view with a :py:class:`KeysetPaginator
+    <code_doc.utils.pagination.KeysetPaginator>`.
+
+    A view may contain several tables, each of them being identified by a prefix: the
+    cursors of a table are read from the parameters ``<prefix>_after`` and
+    ``<prefix>_before`` of the query string.
+    """
+
+    # the maximal number of rows of a table
+    paginate_by = 50
+
+    def _get_page_url(self, parameter, cursor, opposite_parameter):
+        if cursor is None:
+            return None
+
+        query = self.request.GET.copy()
+        query.pop(opposite_parameter, None)
+        query[parameter] = cursor
+        return "?" + query.urlencode()
+
+    def paginate_keyset(self, queryset, ordering, prefix):
+        """Returns the page of the table prefix, with the links ``next_url`` and
+        ``previous_url`` to the adjacent pages (None if there is no such page)"""
+        after_parameter = prefix + "_after"
+        before_parameter = prefix + "_before"
+
+        paginator = KeysetPaginator(queryset, ordering, self.paginate_by)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get(after_parameter),
+                before=self.request.GET.get(before_parameter),
+            )
+        except InvalidPage as e:
+            raise Http404("Invalid page: %s" % e)
+
+        page.next_url = self._get_page_url(
+            after_parameter, page.next_cursor, before_parameter
+        )
+        page.previous_url = self._get_page_url(
+            before_parameter, page.previous_cursor, after_parameter
+        )
+        return page
@@ -1,8 +1,10 @@
 from django.shortcuts import get_object_or_404
 
 from django.http import HttpResponse
+from django.db.models import Count
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
 
 from django.views.generic.detail import DetailView
 from django.views.generic import ListView, View
@@ -10,13 +12,14 @@ from django.views.generic import ListView, View
 import logging
 import json
 
-from ..models.projects import Project, ProjectSeries
-from ..models.artifacts import Artifact
+from ..models.projects import Project, ProjectSeries, get_series_last_updates
+from ..permissions.bulk import permissions_for
+from .conditional_helpers import ConditionalResponseMixin, conditional_response
 
 logger = logging.getLogger(__name__)
 
 
-class ProjectView(DetailView):
+class ProjectView(ConditionalResponseMixin, DetailView):
     """Detailed view of a specific project. The view contains all revisions.
 
     .. note:: no specific permission is associated to a project. All project can be seen from anyone.
@@ -28,35 +31,38 @@ class ProjectView(DetailView):
     pk_url_kwarg = "project_id"
     template_name = "code_doc/project/project_details.html"
 
+    def get_permissions(self):
+        if not hasattr(self, "_permissions"):
+            self._permissions = permissions_for(
+                self.request.user, [self.object], ["code_doc.project_series_add"]
+            )
+        return self._permissions
+
+    def get_etag_parts(self):
+        """The page depends on the project, the series visible to the user and the
+        rights of the user"""
+        project = self.object
+        visible_series = project.series.visible_to(self.request.user).order_by("pk")
+        return (
+            (project.pk, project.version)
+            + self.get_user_etag_parts()
+            + tuple(visible_series.values_list("pk", "version"))
+            + (self.get_permissions().get(project, "code_doc.project_series_add"),)
+        )
+
     def get_context_data(self, **kwargs):
         context = super(ProjectView, self).get_context_data(**kwargs)
         project = self.object
 
         context["authors"] = project.authors.all()
         context["topics"] = project.topics.all()
-        context["series"] = [
-            v
-            for v in project.series.all()
-            if self.request.user.has_perm("code_doc.series_view", v)
-        ]
-
-        last_update = {}
-        for v in context["series"]:
-            assert self.request.user.has_perm("code_doc.series_view", v)
-            # if not self.request.user.has_perm('code_doc.series_view', v):
-            #  continue
-            last_update[v] = {}
-            current_update = v.artifacts.order_by("upload_date").last()
-            if current_update is not None:
-                last_update[v]["last_update"] = current_update.upload_date
-
-            last_doc = Artifact.objects.filter(
-                project_series=v, is_documentation=True
-            ).order_by("upload_date")
-            if last_doc.exists():
-                last_update[v]["last_doc"] = last_doc.last()
-
-        context["last_update"] = last_update
+        # evaluated when rendered, not queried if the fragment is in the cache
+        series = project.series.visible_to(self.request.user).with_last_update()
+        context["series"] = series
+        context["last_update"] = SimpleLazyObject(
+            lambda: get_series_last_updates(list(series))
+        )
+        context["permissions"] = self.get_permissions()
         return context
 
 
@@ -69,7 +75,8 @@ class ProjectListView(ListView):
 
     def get_queryset(self):
         # @todo should be narrowed to unrestricted ones?
-        return Project.objects.all()
+        # the numbers of files and series are read from the counters of the projects
+        return Project.objects.annotate(nb_topics=Count("topics"))
 
 
 class GetProjectRevisionIds(View):
@@ -85,6 +92,10 @@ class GetProjectRevisionIds(View):
         logger.debug("[GetProjectRevisionIds.get]")
         project = get_object_or_404(Project, name=project_name)
         series = get_object_or_404(ProjectSeries, series=series_number, project=project)
-        return self.render_to_json_response(
-            {"project_id": project.id, "series_id": series.id}
+        return conditional_response(
+            request,
+            lambda: self.render_to_json_response(
+                {"project_id": project.id, "series_id": series.id}
+            ),
+            etag_parts=(project.id, series.id),
         )
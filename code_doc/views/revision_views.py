@@ -1,13 +1,15 @@
 from django.views.generic.detail import DetailView
-from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
 
 import logging
 
-from ..models.projects import Project
+from ..models.projects import Project, ProjectSeries, get_series_last_updates
 from ..models.revisions import Revision
 from ..models.artifacts import Artifact
 
+from ..forms import ArtifactFilterForm
 from .permission_helpers import PermissionOnObjectViewMixin
+from .pagination_helpers import KeysetPaginationMixin
 
 logger = logging.getLogger(__name__)
 
@@ -53,8 +55,12 @@ class RevisionAccessViewBase(PermissionOnObjectViewMixin):
         return self.get_revision_from_request(request, *args, **kwargs)
 
 
-class RevisionDetailsView(RevisionAccessViewBase, DetailView):
-    """Detailed view of a specific Revision. The view contains all artifacts. """
+class RevisionDetailsView(RevisionAccessViewBase, KeysetPaginationMixin, DetailView):
+    """Detailed view of a specific Revision. The view contains all artifacts.
+
+    The artifacts are paginated (prefix ``artifacts``), and can be filtered and sorted
+    with the parameters of :py:class:`ArtifactFilterForm <code_doc.forms.ArtifactFilterForm>`.
+    """
 
     model = Revision
     pk_url_kwarg = "revision_id"
@@ -63,40 +69,60 @@ class RevisionDetailsView(RevisionAccessViewBase, DetailView):
     # We should have admin privileges on the object in order to be able to see anything
     permissions_on_object = ("code_doc.revision_view",)
 
+    def get_queryset(self):
+        return super(RevisionDetailsView, self).get_queryset().select_related("project")
+
     def get_context_data(self, **kwargs):
+        """Method used for populating the template context
+
+        The number of queries does not depend on the number of artifacts and series of
+        the revision: the visible series are fetched with their number of artifacts and
+        last update, and the visible series of the artifacts are prefetched.
+        """
         context = super(RevisionDetailsView, self).get_context_data(**kwargs)
 
         revision_object = self.object
 
         # Check that we are passing the correct project_id
-        project = get_object_or_404(Project, pk=self.kwargs["project_id"])
-        assert project.id == revision_object.project.id
+        assert int(self.kwargs["project_id"]) == revision_object.project_id
 
         context["project"] = revision_object.project
-        context["series"] = [
-            v
-            for v in revision_object.get_all_referencing_series()
-            if self.request.user.has_perm("code_doc.series_view", v)
-        ]
+        context["series"] = list(
+            ProjectSeries.objects.filter(
+                pk__in=ProjectSeries.artifacts.through.objects.filter(
+                    artifact__revision=revision_object
+                ).values("projectseries")
+            )
+            .visible_to(self.request.user)
+            .with_last_update()
+            .with_artifacts_count()
+        )
+        series_pks = [series.pk for series in context["series"]]
 
         # We have access to the artifact only if we have permissions to see at least one of its series
-        context["artifacts"] = []
-        for art in revision_object.artifacts.all():
-            all_series = Artifact.get_project_series(art)
-            if not set(all_series).isdisjoint(context["series"]):
-                context["artifacts"].append(art)
-
-        last_update = {}
-        for v in context["series"]:
-            assert self.request.user.has_perm("code_doc.series_view", v)
-            last_update[v] = {}
-            current_update = v.artifacts.order_by("upload_date").last()
-            if current_update is not None:
-                last_update[v]["last_update"] = current_update.upload_date
-
-            last_doc = v.artifacts.filter(is_documentation=True).order_by("upload_date")
-            if last_doc.exists():
-                last_update[v]["last_doc"] = last_doc.last()
-
-        context["last_update"] = last_update
+        artifacts = (
+            revision_object.artifacts.filter(
+                pk__in=Artifact.project_series.through.objects.filter(
+                    projectseries__in=series_pks
+                ).values("artifact")
+            )
+            .select_related("uploaded_by")
+            .prefetch_related(
+                Prefetch(
+                    "project_series",
+                    queryset=ProjectSeries.objects.filter(pk__in=series_pks),
+                    to_attr="visible_series",
+                )
+            )
+        )
+        filter_form = ArtifactFilterForm(self.request.GET)
+        context["filter_form"] = filter_form
+        context["nb_artifacts"] = artifacts.count()
+        context["artifacts"] = self.paginate_keyset(
+            filter_form.filter_artifacts(artifacts),
+            filter_form.get_ordering("upload_date"),
+            "artifacts",
+        )
+
+        context["last_update"] = get_series_last_updates(context["series"])
         return context
@@ -0,0 +1,109 @@
+"""Serving of the files of ``MEDIA_ROOT`` after the checks of the views.
+
+The setting ``CODEDOC_SENDFILE_BACKEND`` selects how the file is sent:
+
+* ``"x-accel-redirect"``: the response only contains the header
+  ``X-Accel-Redirect``, the location ``CODEDOC_SENDFILE_URL`` followed by the path of
+  the file relative to ``MEDIA_ROOT``, and nginx sends the file. The location should
+  be ``internal`` and aliased to ``MEDIA_ROOT``.
+* ``"x-sendfile"``: the response contains the header ``X-Sendfile`` with the full path
+  of the file, and Apache (``mod_xsendfile``) or lighttpd sends the file.
+* ``None``: the file is streamed by Django with a ``FileResponse``, that the WSGI
+  servers providing ``wsgi.file_wrapper`` (eg. gunicorn, uWSGI) send with
+  ``os.sendfile`` without copying it through Python.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import urlquote
+
+from .conditional_helpers import conditional_response
+
+import datetime
+import mimetypes
+import os
+import unicodedata
+
+
+def _get_response(path, size, content_type):
+    backend = getattr(settings, "CODEDOC_SENDFILE_BACKEND", None)
+
+    if backend is None:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+        response["Content-Length"] = size
+        return response
+
+    # the body and its length are set by the front-end server
+    response = HttpResponse(content_type=content_type)
+    if backend == "x-accel-redirect":
+        relative_path = os.path.relpath(path, os.path.abspath(settings.MEDIA_ROOT))
+        response["X-Accel-Redirect"] = urlquote(
+            settings.CODEDOC_SENDFILE_URL + relative_path.replace(os.sep, "/")
+        )
+    elif backend == "x-sendfile":
+        response["X-Sendfile"] = path
+    else:
+        raise ImproperlyConfigured(
+            "Unknown CODEDOC_SENDFILE_BACKEND %r, should be one of "
+            '"x-accel-redirect", "x-sendfile" or None' % backend
+        )
+    return response
+
+
+def _get_content_disposition(filename):
+    """Returns the header of a downloaded file: the name in ASCII for the old clients,
+    and the name in UTF-8 (RFC 5987)"""
+    ascii_filename = (
+        unicodedata.normalize("NFKD", filename)
+        .encode("ascii", "ignore")
+        .decode("ascii")
+    )
+    ascii_filename = ascii_filename.replace('"', "").replace("\\", "")
+    return "attachment; filename=\"%s\"; filename*=UTF-8''%s" % (
+        ascii_filename,
+        urlquote(filename, safe=""),
+    )
+
+
+def sendfile(request, path, attachment_filename=None):
+    """Returns the response sending the file, see the module documentation
+
+    :param path: the full path of the file, inside ``MEDIA_ROOT``
+    :param attachment_filename: the name of the downloaded file, None for displaying
+      the file in the browser
+    :raises Http404: if the file does not exist
+
+    The conditional requests are answered from the modification date of the file, the
+    access rights should be checked before.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise Http404("File not found")
+    if not os.path.isfile(path):
+        raise Http404("File not found")
+
+    content_type, encoding = mimetypes.guess_type(path)
+    if content_type is None or encoding is not None:
+        # the compressed files (eg. .tar.gz) are sent as they are stored
+        content_type = "application/octet-stream"
+
+    def render():
+        response = _get_response(path, stat.st_size, content_type)
+        if attachment_filename is not None:
+            response["Content-Disposition"] = _get_content_disposition(
+                attachment_filename
+            )
+        return response
+
+    response = conditional_response(
+        request,
+        render,
+        last_modified=datetime.datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+    )
+    # the files are not public, they should not be stored by the shared caches
+    patch_cache_control(response, private=True)
+    return response
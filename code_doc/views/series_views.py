@@ -1,19 +1,37 @@
 from django.shortcuts import get_object_or_404
-from django.http import Http404, HttpResponse
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
+from django.db.models import Count
 
 from django.views.generic.base import RedirectView
-from django.views.generic.edit import CreateView, UpdateView
+from django.views.generic.edit import CreateView, UpdateView, FormView
 from django.views.generic.detail import DetailView
 from django.contrib.auth.models import User
 
 from django.core.urlresolvers import reverse
 
 import logging
-import json
 
 from ..models.projects import Project, ProjectSeries
-from ..forms import SeriesEditionForm
+from ..models.revisions import Revision
+from ..forms import (
+    SeriesEditionForm,
+    SeriesPromotionForm,
+    ArtifactFilterForm,
+    SeriesArtifactsAPIForm,
+)
+from ..permissions.bulk import permissions_for
 from .permission_helpers import PermissionOnObjectViewMixin
+from .pagination_helpers import KeysetPaginationMixin
+from ..utils.pagination import iterate_by_chunks
+from .conditional_helpers import ConditionalResponseMixin
 
 logger = logging.getLogger(__name__)
 
@@ -201,11 +219,72 @@ class SeriesUpdateView(SeriesEditViewBase, UpdateView):
     permissions_on_object = ("code_doc.series_edit",)
 
 
-class SeriesDetailsView(SerieAccessViewBase, DetailView):
+class SeriesPromoteView(SerieAccessViewBase, FormView):
+    """Promotes the artifacts of another series of the project to a specific series.
+
+    .. note:: the user should have the 'series_artifact_add' permission on the target
+              series and the 'series_view' permission on the source series.
+
+    """
+
+    template_name = "code_doc/series/series_promote.html"
+    permissions_on_object = ("code_doc.series_artifact_add",)
+
+    form_class = SeriesPromotionForm
+
+    def get_object(self, queryset=None):
+        return self.get_serie_from_request(self.request, *self.args, **self.kwargs)
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super(SeriesPromoteView, self).get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super(SeriesPromoteView, self).post(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super(SeriesPromoteView, self).get_form_kwargs()
+        kwargs["series"] = self.object
+        kwargs["user"] = self.request.user
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super(SeriesPromoteView, self).get_context_data(**kwargs)
+        context["series"] = self.object
+        context["project"] = self.object.project
+        return context
+
+    def form_valid(self, form):
+        try:
+            nb_promoted = self.object.promote_artifacts(
+                form.cleaned_data["source_series"],
+                revision=form.cleaned_data["revision"],
+                branch=form.cleaned_data["branch"],
+            )
+        except IntegrityError as e:
+            logger.error("[SeriesPromoteView] error during the promotion %s", e)
+            return HttpResponse("Conflict", status=409)
+
+        logger.info(
+            "[SeriesPromoteView] %d artifacts promoted to %s", nb_promoted, self.object
+        )
+        return HttpResponseRedirect(self.object.get_absolute_url())
+
+
+class SeriesDetailsView(
+    SerieAccessViewBase, ConditionalResponseMixin, KeysetPaginationMixin, DetailView
+):
     """Details the content of a specific series. Contains all the artifacts
 
     .. note:: the user should have the 'series_view' permission on the series object
 
+    The artifacts and the revisions are paginated (prefixes ``artifacts`` and
+    ``revisions``), and can be filtered and sorted with the parameters of
+    :py:class:`ArtifactFilterForm <code_doc.forms.ArtifactFilterForm>`.
+
+    The page is not rendered again if the series, its project and the rights of the
+    user did not change (ETag).
     """
 
     # part of the url giving the proper object
@@ -216,22 +295,75 @@ class SeriesDetailsView(SerieAccessViewBase, DetailView):
     # we should have admin privileges on the object in order to be able to add anything
     permissions_on_object = ("code_doc.series_view",)
 
+    # the permissions of the user displayed on the page
+    displayed_permissions = (
+        "code_doc.series_edit",
+        "code_doc.series_artifact_add",
+        "code_doc.series_artifact_delete",
+    )
+
+    def get_queryset(self):
+        return super(SeriesDetailsView, self).get_queryset().select_related("project")
+
+    def get_permissions(self):
+        if not hasattr(self, "_permissions"):
+            self._permissions = permissions_for(
+                self.request.user, [self.object], self.displayed_permissions
+            )
+        return self._permissions
+
+    def get_etag_parts(self):
+        series_object = self.object
+        permissions = self.get_permissions()
+        return (
+            (series_object.pk, series_object.version, series_object.project.version)
+            + self.get_user_etag_parts()
+            + tuple(
+                permissions.get(series_object, perm)
+                for perm in self.displayed_permissions
+            )
+        )
+
     def get_context_data(self, **kwargs):
-        """Method used for populating the template context"""
+        """Method used for populating the template context
+
+        The number of queries does not depend on the number of artifacts and
+        revisions of the series: the revisions and uploaders of the artifacts are
+        fetched with the artifacts, and the revisions are annotated with their
+        number of artifacts.
+        """
 
         context = super(SeriesDetailsView, self).get_context_data(**kwargs)
         series_object = self.object
 
-        assert (
-            Project.objects.get(pk=self.kwargs["project_id"]).id
-            == series_object.project.id
+        assert int(self.kwargs["project_id"]) == series_object.project_id
+
+        filter_form = ArtifactFilterForm(self.request.GET)
+        all_revisions = Revision.objects.filter(
+            pk__in=series_object.artifacts.values("revision")
         )
 
         # We need this to distinguish between adding and editing a series
         context["series"] = series_object
         context["project"] = series_object.project
-        context["artifacts"] = series_object.artifacts.all()
-        context["revisions"] = list(set([art.revision for art in context["artifacts"]]))
+        context["filter_form"] = filter_form
+        context["nb_artifacts"] = series_object.artifacts.count()
+        context["nb_revisions"] = all_revisions.count()
+        context["artifacts"] = self.paginate_keyset(
+            filter_form.filter_artifacts(
+                series_object.artifacts.select_related("revision", "uploaded_by")
+            ),
+            filter_form.get_ordering("upload_date"),
+            "artifacts",
+        )
+        context["revisions"] = self.paginate_keyset(
+            filter_form.filter_revisions(all_revisions).annotate(
+                artifacts_count=Count("artifacts")
+            ),
+            filter_form.get_ordering("commit_time"),
+            "revisions",
+        )
+        context["permissions"] = self.get_permissions()
         return context
 
 
@@ -251,14 +383,61 @@ class SeriesDetailsViewShortcut(RedirectView):
         return reverse("project_series", args=[project.id, series.id])
 
 
-class APIGetSeriesArtifacts(SeriesDetailsView, DetailView):
-    """An API view returning a json dictionary containing all artifacts of a specific series"""
+class APIGetSeriesArtifacts(SerieAccessViewBase, ConditionalResponseMixin, DetailView):
+    """An API view returning a json dictionary containing all artifacts of a specific series
+
+    The response is ``{"artifacts": {<id>: {"file": <name>, "md5": <hash>}}}``. The
+    parameters of :py:class:`SeriesArtifactsAPIForm
+    <code_doc.forms.SeriesArtifactsAPIForm>` select other fields (``fields``) and
+    filter the artifacts (``revision``, ``branch``, ``documentation``, ``since``).
+
+    The JSON is streamed while the artifacts are read by chunks, the memory does not
+    depend on the number of artifacts. The validators (ETag, Last-Modified) are the
+    version and the modification date of the series, the ETag including the parameters
+    as well. The version of the series also follows the revisions of the branches, for
+    the ``branch`` filter. The artifacts are not read if the client has the current
+    version.
+    """
+
+    pk_url_kwarg = "series_id"
+    permissions_on_object = ("code_doc.series_view",)
+
+    # the number of artifacts read per query
+    chunk_size = 1000
+
+    def get_etag_parts(self):
+        # the ETag is shared by the urls differing by the order of the parameters only
+        return (self.object.pk, self.object.version) + tuple(
+            sorted(self.request.GET.lists())
+        )
+
+    def get_last_modified(self):
+        return self.object.last_modified
+
+    def get_context_data(self, **kwargs):
+        return {"form": SeriesArtifactsAPIForm(self.request.GET)}
+
+    def stream_artifacts(self, form):
+        names, model_fields = form.get_api_fields()
+        artifacts = form.filter_artifacts(self.object.artifacts.all())
+
+        encoder = DjangoJSONEncoder()
+        yield '{"artifacts": {'
+        separator = ""
+        for row in iterate_by_chunks(artifacts, model_fields, self.chunk_size):
+            yield '%s"%d": %s' % (
+                separator,
+                row[0],
+                encoder.encode(dict(zip(names, row[1:]))),
+            )
+            separator = ", "
+        yield "}}"
 
     def render_to_response(self, context, **response_kwargs):
-        artifacts = context["artifacts"]
-        ldict = {}
-        for art in artifacts:
-            ldict[art.id] = {"file": art.artifactfile.name, "md5": art.md5hash}
-        data = json.dumps({"artifacts": ldict})
-        response_kwargs["content_type"] = "application/json"
-        return HttpResponse(data, **response_kwargs)
+        form = context["form"]
+        if form.errors:
+            return JsonResponse({"errors": form.errors}, status=400)
+
+        return StreamingHttpResponse(
+            self.stream_artifacts(form), content_type="application/json"
+        )
@@ -86,6 +86,7 @@ MIDDLEWARE_CLASSES = (
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "code_doc.permissions.middleware.PermissionCacheMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 )
@@ -201,6 +202,39 @@ DATABASES = {
 
 # AUTH_USER_MODEL = 'code_doc.Author'
 
+# Caches
+# https://docs.djangoproject.com/en/1.11/topics/cache/
+# a file or database cache can be shared between the processes of the server without
+# any external service
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# alias of the cache storing the permissions across the requests, None for disabling
+CODEDOC_PERMISSION_CACHE = None
+
+# alias of the cache storing the rendered Markdown descriptions, None for disabling
+CODEDOC_MARKDOWN_CACHE = "default"
+
+# alias of the cache storing the rendered fragments of the pages, None for disabling.
+# The invalidation relies on the cache being shared by all the processes of the server
+CODEDOC_FRAGMENT_CACHE = None
+
+# alias of the cache storing the results of the user and group searches, None for
+# disabling, and their lifetime in seconds
+CODEDOC_SEARCH_CACHE = "default"
+CODEDOC_SEARCH_CACHE_TIMEOUT = 60
+
+# sending of the artifacts and documentations after the permission checks:
+# "x-accel-redirect" (nginx, the internal location CODEDOC_SENDFILE_URL being aliased
+# to MEDIA_ROOT), "x-sendfile" (Apache mod_xsendfile, lighttpd), or None for sending
+# them from Django.
+# The front-end server should not serve the whole MEDIA_ROOT under MEDIA_URL: the
+# artifacts (artifacts/) and their deflated documentation would be downloaded without
+# the permission checks. Only the public images, MEDIA_URL + "project_icons/",
+# "author_images/" and "thumbnails/", should be aliased to their directories.
+CODEDOC_SENDFILE_BACKEND = None
+CODEDOC_SENDFILE_URL = "/protected/"
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.6/topics/i18n/
 
@@ -4,6 +4,10 @@ from django.conf import settings
 
 from django.contrib import admin
 
+from code_doc.utils.thumbnails import THUMBNAILS_DIRECTORY
+
+import os
+
 admin.autodiscover()
 
 urlpatterns = [
@@ -13,4 +17,11 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+    # only the public images are served from MEDIA_ROOT, the artifacts and their
+    # deflated documentation are sent by the views after the permission checks
+    for directory in ("project_icons", "author_images", THUMBNAILS_DIRECTORY):
+        urlpatterns += static(
+            settings.MEDIA_URL + directory + "/",
+            document_root=os.path.join(settings.MEDIA_ROOT, directory),
+        )